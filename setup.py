@@ -13,9 +13,9 @@ setup(
         "numpy",
         "pyserial",
         "pyttsx3",
-        "tensorflow",
         "tflite-runtime",
         "openai",
+        "requests",
         "pydantic",
         "RPi.GPIO"
     ],
@@ -1,9 +1,10 @@
 import openai
+import threading
 from ..config.config import Config
 from ..utils.logger import Logger
+from ..utils.imaging import encode_jpeg_base64
+from ..utils.telemetry import telemetry
 import time
-import cv2
-import base64
 
 class ReassuringMessages:
     """
@@ -13,22 +14,28 @@ class ReassuringMessages:
     so the reassuring message can reference the actual environment.
     """
 
+    FALLBACK_MESSAGE = "Please try to stay calm. Everything will be okay. I see a safe environment around you."
+    FALLBACK_MESSAGE_NO_IMAGE = "Try to remain calm. Everything will be alright."
+
     def __init__(self):
         self.logger = Logger("ReassuringMessages")
         openai.api_key = Config.OPENAI_API_KEY
+        if Config.OPENAI_API_BASE:
+            openai.api_base = Config.OPENAI_API_BASE
         self.max_retries = 3
         self.retry_delay = 2.0
+        # API requests made by the current thread, retries included (read by ScenePrefetcher).
+        self.attempts = threading.local()
 
     def encode_image(self, frame):
         """
         Encodes the given frame as a base64 JPEG.
         If encoding fails, returns an empty string.
         """
-        ret, buffer = cv2.imencode('.jpg', frame)
-        if not ret:
+        image_data = encode_jpeg_base64(frame)
+        if not image_data:
             self.logger.warn("Failed to encode frame for reassurance message. Returning empty image data.")
-            return ""
-        return base64.b64encode(buffer).decode('utf-8')
+        return image_data
 
     def generate_message(self, frame) -> str:
         """
@@ -69,7 +76,9 @@ class ReassuringMessages:
         ]
 
         for attempt in range(self.max_retries):
+            start = time.perf_counter()
             try:
+                self.attempts.count = getattr(self.attempts, "count", 0) + 1
                 response = openai.ChatCompletion.create(
                     model=Config.OPENAI_MODEL,
                     messages=prompt,
@@ -79,16 +88,20 @@ class ReassuringMessages:
                 )
                 message = response.choices[0].message.content.strip()
                 self.logger.debug(f"Personalized reassuring message retrieved: {message}")
+                telemetry.record("api", client="reassure", outcome="ok", attempt=attempt + 1, seconds=time.perf_counter() - start)
                 return message
             except openai.error.OpenAIError as e:
                 self.logger.warn(f"OpenAI API error while fetching personalized reassuring message (attempt {attempt+1}): {e}")
+                outcome = "rate_limited" if isinstance(e, openai.error.RateLimitError) else "error"
+                telemetry.record("api", client="reassure", outcome=outcome, attempt=attempt + 1, seconds=time.perf_counter() - start)
                 time.sleep(self.retry_delay)
             except Exception as ex:
                 self.logger.error(f"Unexpected error fetching personalized reassuring message: {ex}")
+                telemetry.record("api", client="reassure", outcome="error", attempt=attempt + 1, seconds=time.perf_counter() - start)
                 time.sleep(self.retry_delay)
 
         self.logger.error("Max retries exceeded while fetching personalized reassuring message, returning a default fallback.")
-        return "Please try to stay calm. Everything will be okay. I see a safe environment around you."
+        return self.FALLBACK_MESSAGE
 
     def _fetch_reassurance_without_image(self) -> str:
         """
@@ -106,7 +119,9 @@ class ReassuringMessages:
         ]
 
         for attempt in range(self.max_retries):
+            start = time.perf_counter()
             try:
+                self.attempts.count = getattr(self.attempts, "count", 0) + 1
                 response = openai.ChatCompletion.create(
                     model=Config.OPENAI_MODEL,
                     messages=prompt,
@@ -116,13 +131,17 @@ class ReassuringMessages:
                 )
                 message = response.choices[0].message.content.strip()
                 self.logger.debug(f"Reassuring message (no image): {message}")
+                telemetry.record("api", client="reassure_text", outcome="ok", attempt=attempt + 1, seconds=time.perf_counter() - start)
                 return message
             except openai.error.OpenAIError as e:
                 self.logger.warn(f"OpenAI API error while fetching reassurance (no image) (attempt {attempt+1}): {e}")
+                outcome = "rate_limited" if isinstance(e, openai.error.RateLimitError) else "error"
+                telemetry.record("api", client="reassure_text", outcome=outcome, attempt=attempt + 1, seconds=time.perf_counter() - start)
                 time.sleep(self.retry_delay)
             except Exception as ex:
                 self.logger.error(f"Unexpected error fetching reassurance without image: {ex}")
+                telemetry.record("api", client="reassure_text", outcome="error", attempt=attempt + 1, seconds=time.perf_counter() - start)
                 time.sleep(self.retry_delay)
 
         self.logger.error("Max retries exceeded while fetching reassurance without image, returning a default fallback.")
-        return "Try to remain calm. Everything will be alright."
\ No newline at end of file
+        return self.FALLBACK_MESSAGE_NO_IMAGE
\ No newline at end of file
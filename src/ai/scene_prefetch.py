@@ -0,0 +1,281 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional
+
+import cv2
+import numpy as np
+
+from ..config.config import Config
+from ..utils.logger import Logger
+
+
+class PrefetchedScene:
+    """
+    A scene description (and optionally a reassurance) fetched in the background.
+    """
+
+    def __init__(self, signature: np.ndarray, labels: frozenset):
+        self.signature = signature
+        self.labels = labels
+        self.started_at = time.monotonic()
+        self.completed_at: Optional[float] = None
+        self.vision = None
+        self.vision_latency = 0.0
+        self.vision_used = False
+        self.reassurance: Optional[str] = None
+        self.reassurance_latency = 0.0
+        self.reassurance_used = False
+        self.waited = 0.0
+        self.done = threading.Event()
+
+
+class ScenePrefetcher:
+    """
+    Opt-in speculative prefetching of GPT-4o scene descriptions and reassurances.
+
+    When the local detector's label set or the coarse frame signature changes
+    significantly, a background thread calls OpenAIVision.analyze_frame (and, if
+    requested, ReassuringMessages.generate_message) so that a later button press
+    or distress trigger can be answered at once from a still-fresh result.
+    Prefetches are limited to PREFETCH_BUDGET_PER_HOUR API calls, client retries
+    included. A missing (failed or already used) reassurance is fetched again only
+    after PREFETCH_RETRY_BACKOFF seconds, doubled after each consecutive failure
+    up to PREFETCH_RETRY_MAX_BACKOFF.
+
+    Methods:
+        observe(frame, labels, want_reassurance):
+            Called every loop iteration; may start a background prefetch.
+        take_vision(frame) -> Optional[VisionOutput]:
+            Returns a fresh prefetched description matching the current scene, or None.
+        take_reassurance(frame) -> Optional[str]:
+            Same for the reassuring message, which is only handed out once.
+        stats() -> Dict[str, float]:
+            Hit rate, wasted-call rate and latency saved.
+    """
+
+    def __init__(self, vision_ai, re_msgs):
+        self.logger = Logger("ScenePrefetcher")
+        self.vision_ai = vision_ai
+        self.re_msgs = re_msgs
+        self.enabled = Config.PREFETCH_ENABLED
+        self.budget_per_hour = Config.PREFETCH_BUDGET_PER_HOUR
+        self.max_age = Config.PREFETCH_MAX_AGE
+        self.label_change = Config.PREFETCH_LABEL_CHANGE
+        self.frame_change = Config.PREFETCH_FRAME_CHANGE
+        self.inflight_wait = Config.PREFETCH_INFLIGHT_WAIT
+        self.retry_backoff = Config.PREFETCH_RETRY_BACKOFF
+        self.max_retry_backoff = Config.PREFETCH_RETRY_MAX_BACKOFF
+        self.reassurance_failures = 0
+        self.reassurance_retry_at = 0.0
+
+        self.lock = threading.Lock()
+        self.call_times: Deque[float] = deque()
+        self.current: Optional[PrefetchedScene] = None
+        self.last_labels: frozenset = frozenset()
+        self.counters = {
+            "prefetches": 0,
+            "api_calls": 0,
+            "hits": 0,
+            "misses": 0,
+            "wasted_calls": 0,
+            "budget_skips": 0,
+            "latency_saved": 0.0,
+        }
+
+    @staticmethod
+    def frame_signature(frame: np.ndarray) -> np.ndarray:
+        """
+        A 16x12 grayscale thumbnail used to detect scene changes cheaply.
+        """
+        small = cv2.resize(frame, (16, 12), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small.astype(np.float32)
+
+    def _frame_distance(self, a: np.ndarray, b: np.ndarray) -> float:
+        return float(np.mean(np.abs(a - b)))
+
+    @staticmethod
+    def _label_distance(a: frozenset, b: frozenset) -> float:
+        if not a and not b:
+            return 0.0
+        return 1.0 - len(a & b) / float(len(a | b))
+
+    def _budget_available(self, calls: int) -> bool:
+        cutoff = time.monotonic() - 3600.0
+        while self.call_times and self.call_times[0] < cutoff:
+            self.call_times.popleft()
+        return len(self.call_times) + calls <= self.budget_per_hour
+
+    def observe(self, frame: np.ndarray, labels: Optional[Iterable[str]] = None, want_reassurance: bool = False):
+        """
+        Checks whether the scene changed enough since the last prefetch and, if so
+        and the hourly budget allows, starts a background prefetch.
+        `labels` is the latest local detector label set, when available.
+        """
+        if not self.enabled or frame is None:
+            return
+
+        if labels is not None:
+            self.last_labels = frozenset(labels)
+        signature = self.frame_signature(frame)
+
+        with self.lock:
+            current = self.current
+            if current is not None and not current.done.is_set():
+                return  # one prefetch in flight at a time
+            want_reassurance = want_reassurance and time.monotonic() >= self.reassurance_retry_at
+            if current is not None:
+                changed = (
+                    self._label_distance(current.labels, self.last_labels) >= self.label_change
+                    or self._frame_distance(current.signature, signature) >= self.frame_change
+                    or (want_reassurance and (current.reassurance is None or current.reassurance_used))
+                )
+                if not changed:
+                    return
+
+            calls = 2 if want_reassurance else 1
+            if not self._budget_available(calls):
+                self.counters["budget_skips"] += 1
+                return
+
+            self._retire(current)
+            scene = PrefetchedScene(signature, self.last_labels)
+            self.current = scene
+            now = time.monotonic()
+            for _ in range(calls):
+                self.call_times.append(now)
+            self.counters["prefetches"] += 1
+            self.counters["api_calls"] += calls
+
+        frame_copy = frame.copy()
+        threading.Thread(target=self._prefetch, args=(scene, frame_copy, want_reassurance), daemon=True).start()
+
+    def _retire(self, scene: Optional[PrefetchedScene]):
+        # Results replaced before anyone used them count as wasted API calls.
+        if scene is None:
+            return
+        if scene.vision is not None and not scene.vision_used:
+            self.counters["wasted_calls"] += 1
+        if scene.reassurance is not None and not scene.reassurance_used:
+            self.counters["wasted_calls"] += 1
+
+    @staticmethod
+    def _attempts(client) -> int:
+        # API requests the client made from this thread (gateway clients do not count them).
+        return getattr(getattr(client, "attempts", None), "count", 0)
+
+    def _charge_retries(self, client, attempts_before: int):
+        # observe() reserved one call; charge the client's retries on top of it.
+        retries = self._attempts(client) - attempts_before - 1
+        if retries > 0:
+            with self.lock:
+                now = time.monotonic()
+                for _ in range(retries):
+                    self.call_times.append(now)
+                self.counters["api_calls"] += retries
+
+    def _prefetch(self, scene: PrefetchedScene, frame: np.ndarray, want_reassurance: bool):
+        self.logger.debug(f"Prefetching scene description (labels: {sorted(scene.labels)}).")
+        try:
+            start = time.monotonic()
+            attempts = self._attempts(self.vision_ai)
+            try:
+                scene.vision = self.vision_ai.analyze_frame(frame)
+            finally:
+                self._charge_retries(self.vision_ai, attempts)
+            scene.vision_latency = time.monotonic() - start
+            if want_reassurance:
+                start = time.monotonic()
+                attempts = self._attempts(self.re_msgs)
+                try:
+                    reassurance = self.re_msgs.generate_message(frame)
+                finally:
+                    self._charge_retries(self.re_msgs, attempts)
+                scene.reassurance_latency = time.monotonic() - start
+                # generate_message answers failures with canned text; that is not worth serving as a hit.
+                if reassurance not in (self.re_msgs.FALLBACK_MESSAGE, self.re_msgs.FALLBACK_MESSAGE_NO_IMAGE):
+                    scene.reassurance = reassurance
+        except Exception as e:
+            self.logger.error(f"Prefetch failed: {e}")
+        finally:
+            scene.completed_at = time.monotonic()
+            if want_reassurance:
+                self._schedule_reassurance_retry(scene)
+            scene.done.set()
+
+    def _schedule_reassurance_retry(self, scene: PrefetchedScene):
+        with self.lock:
+            if scene.reassurance is None:
+                self.reassurance_failures += 1
+                backoff = min(self.retry_backoff * 2 ** (self.reassurance_failures - 1), self.max_retry_backoff)
+                self.logger.debug(f"No reassurance prefetched, next attempt in {backoff:.0f}s.")
+            else:
+                self.reassurance_failures = 0
+                backoff = self.retry_backoff
+            self.reassurance_retry_at = scene.completed_at + backoff
+
+    def _fresh_scene(self, frame: np.ndarray) -> Optional[PrefetchedScene]:
+        with self.lock:
+            scene = self.current
+        if scene is None:
+            return None
+
+        waited = 0.0
+        if not scene.done.is_set():
+            start = time.monotonic()
+            scene.done.wait(self.inflight_wait)
+            waited = time.monotonic() - start
+            if not scene.done.is_set():
+                return None
+
+        if time.monotonic() - scene.started_at > self.max_age:
+            return None
+        if frame is not None and self._frame_distance(scene.signature, self.frame_signature(frame)) >= self.frame_change:
+            return None
+        scene.waited = waited
+        return scene
+
+    def take_vision(self, frame: np.ndarray):
+        """
+        Returns the prefetched VisionOutput if it is still fresh for the current frame, else None.
+        """
+        if not self.enabled:
+            return None
+        scene = self._fresh_scene(frame)
+        with self.lock:
+            if scene is None or scene.vision is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["hits"] += 1
+            self.counters["latency_saved"] += max(0.0, scene.vision_latency - scene.waited)
+            scene.vision_used = True
+        self.logger.debug("Answering from prefetched scene description.")
+        return scene.vision
+
+    def take_reassurance(self, frame: np.ndarray) -> Optional[str]:
+        """
+        Returns the prefetched reassurance if it is still fresh for the current frame, else None.
+        Each reassurance is handed out once, so it is not repeated while the user stays distressed.
+        """
+        if not self.enabled:
+            return None
+        scene = self._fresh_scene(frame)
+        with self.lock:
+            if scene is None or scene.reassurance is None or scene.reassurance_used:
+                self.counters["misses"] += 1
+                return None
+            self.counters["hits"] += 1
+            self.counters["latency_saved"] += max(0.0, scene.reassurance_latency - scene.waited)
+            scene.reassurance_used = True
+        self.logger.debug("Answering from prefetched reassurance.")
+        return scene.reassurance
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            counters = dict(self.counters)
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = counters["hits"] / float(lookups) if lookups else 0.0
+        counters["wasted_call_rate"] = counters["wasted_calls"] / float(counters["api_calls"]) if counters["api_calls"] else 0.0
+        return counters
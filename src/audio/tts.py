@@ -1,6 +1,9 @@
+import time
 import pyttsx3
 from ..config.config import Config
 from ..utils.logger import Logger
+from ..utils.telemetry import telemetry
+from typing import Optional
 
 class TextToSpeech:
     """
@@ -9,8 +12,14 @@ class TextToSpeech:
     If pyttsx3 initialization fails, tries a fallback (if any).
 
     Methods:
-        speak(text: str):
-            Speaks the given text.
+        speak(text: str, kind: str):
+            Speaks the given text. `kind` (e.g. "narration", "warning") labels
+            the utterance in telemetry.
+        repeat_last():
+            Speaks the last utterance again.
+
+    last_audio_start holds the time.monotonic() at which the engine started the
+    most recent utterance, for press-to-first-audio measurements.
     """
 
     def __init__(self):
@@ -19,6 +28,7 @@ class TextToSpeech:
             self.engine = pyttsx3.init()
             self.engine.setProperty('rate', Config.VOICE_RATE)
             self.engine.setProperty('volume', Config.VOICE_VOLUME)
+            self.engine.connect('started-utterance', self._on_started_utterance)
             # On some systems, you can choose voices:
             # voices = self.engine.getProperty('voices')
             # self.engine.setProperty('voice', voices[0].id)  # pick a voice
@@ -26,8 +36,13 @@ class TextToSpeech:
         except Exception as e:
             self.logger.error(f"Failed to initialize TTS engine: {e}")
             self.engine = None
+        self.last_utterance: Optional[str] = None
+        self.last_audio_start: Optional[float] = None
+
+    def _on_started_utterance(self, name):
+        self.last_audio_start = time.monotonic()
 
-    def speak(self, text: str):
+    def speak(self, text: str, kind: str = "speech"):
         """
         Speaks the given text aloud using TTS.
         Logs an error if TTS engine is not available.
@@ -40,8 +55,23 @@ class TextToSpeech:
             return
 
         self.logger.debug(f"Speaking: {text}")
+        if kind != "repeat":
+            self.last_utterance = text
+        start = time.time()
+        # Fallback in case the driver never reports the utterance start.
+        self.last_audio_start = time.monotonic()
         try:
             self.engine.say(text)
             self.engine.runAndWait()
         except Exception as e:
             self.logger.error(f"Error during TTS: {e}")
+        telemetry.record("speech", t=start, kind=kind, chars=len(text), seconds=time.time() - start)
+
+    def repeat_last(self):
+        """
+        Repeats the most recent utterance, or says that there is nothing to repeat.
+        """
+        if self.last_utterance:
+            self.speak(self.last_utterance, kind="repeat")
+        else:
+            self.speak("I haven't said anything yet.", kind="repeat")
@@ -1,4 +1,5 @@
 import os
+import socket
 
 class Config:
     """
@@ -15,11 +16,22 @@ class Config:
     CAMERA_WIDTH = int(os.getenv("CAMERA_WIDTH", "640"))
     CAMERA_HEIGHT = int(os.getenv("CAMERA_HEIGHT", "480"))
     CAMERA_FRAMERATE = int(os.getenv("CAMERA_FRAMERATE", "30"))
+    CAMERA_DEVICE = int(os.getenv("CAMERA_DEVICE", "0"))
+    CAMERA_FAKE = os.getenv("CAMERA_FAKE", "false").lower() == "true"  # synthetic V4L2-like source for off-device testing
+    CAMERA_FORMATS = [f.strip() for f in os.getenv("CAMERA_FORMATS", "YUYV,MJPG").split(",") if f.strip()]  # in order of preference
+    # Dual-stream capture: low-res continuous stream for the detector, high-res stills on demand
+    CAMERA_DUAL_STREAM = os.getenv("CAMERA_DUAL_STREAM", "false").lower() == "true"
+    CAMERA_DETECT_WIDTH = int(os.getenv("CAMERA_DETECT_WIDTH", "0"))  # 0: the detector's input size
+    CAMERA_DETECT_HEIGHT = int(os.getenv("CAMERA_DETECT_HEIGHT", "0"))
+    CAMERA_STILL_DEVICE = int(os.getenv("CAMERA_STILL_DEVICE", "-1"))  # -1 switches the main stream's resolution instead
+    CAMERA_STILL_FORMATS = [f.strip() for f in os.getenv("CAMERA_STILL_FORMATS", "MJPG,YUYV").split(",") if f.strip()]
+    CAMERA_STILL_WARMUP_FRAMES = int(os.getenv("CAMERA_STILL_WARMUP_FRAMES", "2"))
 
     # Model settings for local object detection
     MODEL_PATH = os.path.join(os.path.dirname(__file__), "../../models/object_detection/ssd_mobilenet_v2_coco_quant_postprocess_edgetpu.tflite")
     LABELS_PATH = os.path.join(os.path.dirname(__file__), "../../models/object_detection/labels.txt")
     MIN_CONFIDENCE = float(os.getenv("MIN_CONFIDENCE", "0.5"))
+    INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", "0"))  # 0 lets TFLite decide
 
     # Audio settings
     VOICE_RATE = int(os.getenv("VOICE_RATE", "150"))
@@ -39,13 +51,135 @@ class Config:
         raise EnvironmentError("Please set OPENAI_API_KEY env variable.")
     OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-2024-08-06")
     OPENAI_VISION_DETAIL = os.getenv("OPENAI_VISION_DETAIL", "high")
+    # Alternative OpenAI-compatible endpoint, e.g. the local stub server in src/tools/openai_stub.py
+    OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "")
 
     # Interval between automatic narrations in seconds
     NARRATION_INTERVAL = int(os.getenv("NARRATION_INTERVAL", "10"))
+    # Sleep between main loop iterations in seconds
+    LOOP_INTERVAL = float(os.getenv("LOOP_INTERVAL", "0.1"))
 
     # GPIO pin for button input
     BUTTON_GPIO_PIN = int(os.getenv("BUTTON_GPIO_PIN", "17"))
     BUTTON_DEBOUNCE_TIME = int(os.getenv("BUTTON_DEBOUNCE_TIME", "200"))  # ms
+    # Gestures: short press = local summary, long press = GPT-4o description, double press = repeat
+    BUTTON_GESTURES = os.getenv("BUTTON_GESTURES", "true").lower() == "true"
+    BUTTON_LONG_PRESS = float(os.getenv("BUTTON_LONG_PRESS", "0.8"))  # seconds held
+    BUTTON_DOUBLE_PRESS_WINDOW = float(os.getenv("BUTTON_DOUBLE_PRESS_WINDOW", "0.3"))  # seconds from release to second press
+    BUTTON_GESTURE_DEBOUNCE_MS = float(os.getenv("BUTTON_GESTURE_DEBOUNCE_MS", "30"))
+    GPIO_FAKE = os.getenv("GPIO_FAKE", "false").lower() == "true"
+    GPIO_FAKE_SCRIPT = os.getenv("GPIO_FAKE_SCRIPT", "")  # e.g. "2:short,6:long,10:double" (seconds after start)
 
     # Threshold for considering an object "too close"
     OBJECT_CLOSE_THRESHOLD = float(os.getenv("OBJECT_CLOSE_THRESHOLD", "0.1"))
+
+    # Best-frame selection for cloud uploads
+    FRAME_SELECTOR_WINDOW = float(os.getenv("FRAME_SELECTOR_WINDOW", "0.5"))  # seconds of history to choose from
+    FRAME_SELECTOR_MAX_FRAMES = int(os.getenv("FRAME_SELECTOR_MAX_FRAMES", "8"))
+    FRAME_SELECTOR_WAIT = float(os.getenv("FRAME_SELECTOR_WAIT", "0.0"))  # seconds to wait for a sharp frame
+    FRAME_SELECTOR_MIN_SHARPNESS = float(os.getenv("FRAME_SELECTOR_MIN_SHARPNESS", "60.0"))
+    FRAME_SELECTOR_SCALE_WIDTH = int(os.getenv("FRAME_SELECTOR_SCALE_WIDTH", "160"))
+
+    # On-device spectral analysis of the raw EEG wave
+    EEG_SPECTRAL_ENABLED = os.getenv("EEG_SPECTRAL_ENABLED", "true").lower() == "true"
+    EEG_RAW_SAMPLE_RATE = int(os.getenv("EEG_RAW_SAMPLE_RATE", "512"))  # Hz
+    EEG_SPECTRAL_WINDOW = float(os.getenv("EEG_SPECTRAL_WINDOW", "2.0"))  # seconds
+    EEG_SPECTRAL_SEGMENT = int(os.getenv("EEG_SPECTRAL_SEGMENT", "256"))  # samples per Welch segment
+    EEG_SPECTRAL_UPDATE_INTERVAL = float(os.getenv("EEG_SPECTRAL_UPDATE_INTERVAL", "0.25"))  # seconds
+    EEG_SPECTRAL_BANDS = os.getenv("EEG_SPECTRAL_BANDS", "")  # e.g. "theta:4-8,alpha:8-13,beta:13-30"
+    EEG_ARTIFACT_THRESHOLD = float(os.getenv("EEG_ARTIFACT_THRESHOLD", "1000"))  # raw units, peak-to-peak
+
+    # Signal-triggered diagnostics (SIGUSR1 stack dump, SIGUSR2 sampling profiler)
+    DIAGNOSTICS_ENABLED = os.getenv("DIAGNOSTICS_ENABLED", "true").lower() == "true"
+    DIAGNOSTICS_DIR = os.getenv("DIAGNOSTICS_DIR", "/tmp/blindsee-diagnostics")
+    PROFILER_INTERVAL = float(os.getenv("PROFILER_INTERVAL", "0.01"))  # seconds between samples
+    PROFILER_MAX_DURATION = float(os.getenv("PROFILER_MAX_DURATION", "60"))  # seconds
+
+    # Speculative background prefetch of GPT-4o answers on scene change (opt-in)
+    PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "false").lower() == "true"
+    PREFETCH_BUDGET_PER_HOUR = int(os.getenv("PREFETCH_BUDGET_PER_HOUR", "60"))  # API calls
+    PREFETCH_MAX_AGE = float(os.getenv("PREFETCH_MAX_AGE", "20"))  # seconds a prefetched answer stays usable
+    PREFETCH_LABEL_CHANGE = float(os.getenv("PREFETCH_LABEL_CHANGE", "0.5"))  # Jaccard distance of label sets
+    PREFETCH_FRAME_CHANGE = float(os.getenv("PREFETCH_FRAME_CHANGE", "25"))  # mean abs diff of 16x12 thumbnails
+    PREFETCH_INFLIGHT_WAIT = float(os.getenv("PREFETCH_INFLIGHT_WAIT", "5"))  # seconds to wait for a running prefetch
+    PREFETCH_RETRY_BACKOFF = float(os.getenv("PREFETCH_RETRY_BACKOFF", "30"))  # seconds before fetching another reassurance, doubled per failure
+    PREFETCH_RETRY_MAX_BACKOFF = float(os.getenv("PREFETCH_RETRY_MAX_BACKOFF", "600"))
+
+    # Region-of-interest / tiled inference for the walking corridor
+    INFERENCE_MODE = os.getenv("INFERENCE_MODE", "full")  # full, corridor or tiled
+    CORRIDOR_REGION = os.getenv("CORRIDOR_REGION", "0.15,0.25,1.0,0.75")  # ymin,xmin,ymax,xmax (normalized)
+    CORRIDOR_INCLUDE_FULL_FRAME = os.getenv("CORRIDOR_INCLUDE_FULL_FRAME", "true").lower() == "true"
+    TILE_ROWS = int(os.getenv("TILE_ROWS", "2"))
+    TILE_COLS = int(os.getenv("TILE_COLS", "2"))
+    TILE_OVERLAP = float(os.getenv("TILE_OVERLAP", "0.15"))  # fraction of a tile
+    TILE_NMS_IOU = float(os.getenv("TILE_NMS_IOU", "0.5"))
+    INFERENCE_LATENCY_TARGET_MS = float(os.getenv("INFERENCE_LATENCY_TARGET_MS", "400"))
+
+    # Two-stage detector cascade: cheap always-on proximity screening, full model on demand
+    CASCADE_ENABLED = os.getenv("CASCADE_ENABLED", "false").lower() == "true"
+    CASCADE_STAGE1_MODEL_PATH = os.getenv("CASCADE_STAGE1_MODEL_PATH", "")  # tiny TFLite detector; empty uses the edge heuristic
+    CASCADE_STAGE1_LABELS_PATH = os.getenv("CASCADE_STAGE1_LABELS_PATH", "")
+    CASCADE_STAGE1_MIN_CONFIDENCE = float(os.getenv("CASCADE_STAGE1_MIN_CONFIDENCE", "0.3"))
+    CASCADE_HEURISTIC_WIDTH = int(os.getenv("CASCADE_HEURISTIC_WIDTH", "80"))  # pixels
+    CASCADE_HEURISTIC_DENSITY = float(os.getenv("CASCADE_HEURISTIC_DENSITY", "0.25"))  # corridor edge density scoring 1.0
+    CASCADE_ESCALATE_SCORE = float(os.getenv("CASCADE_ESCALATE_SCORE", "0.4"))  # at or above: run the full model
+    CASCADE_WARN_SCORE = float(os.getenv("CASCADE_WARN_SCORE", "0.9"))  # at or above: a stage-one model warns without the full model
+    CASCADE_ESCALATION_COOLDOWN = float(os.getenv("CASCADE_ESCALATION_COOLDOWN", "1.0"))  # seconds
+    CASCADE_MAX_UNCHECKED = float(os.getenv("CASCADE_MAX_UNCHECKED", "2.0"))  # seconds without a full-model run, even when clear
+    CASCADE_LOW_TEXTURE_DENSITY = float(os.getenv("CASCADE_LOW_TEXTURE_DENSITY", "0.02"))  # below: plain surface, may be a close wall
+    PROXIMITY_WARNING_COOLDOWN = float(os.getenv("PROXIMITY_WARNING_COOLDOWN", "3.0"))  # seconds between spoken warnings
+
+    # Startup auto-tuning of inference threads, capture resolution and frame rate
+    AUTOTUNE = os.getenv("AUTOTUNE", "off").lower()  # off, auto (use cached profile if present) or force
+    AUTOTUNE_CACHE_PATH = os.getenv("AUTOTUNE_CACHE_PATH", os.path.expanduser("~/.cache/blindsee/autotune.json"))
+    AUTOTUNE_LATENCY_BUDGET_MS = float(os.getenv("AUTOTUNE_LATENCY_BUDGET_MS", "500"))  # frame-to-warning
+    AUTOTUNE_THREADS = [int(t) for t in os.getenv("AUTOTUNE_THREADS", "1,2,4").split(",") if t.strip()]
+    AUTOTUNE_RESOLUTIONS = os.getenv("AUTOTUNE_RESOLUTIONS", "320x240,640x480")
+    AUTOTUNE_ITERATIONS = int(os.getenv("AUTOTUNE_ITERATIONS", "10"))
+
+    # Thermal- and power-aware performance governor
+    GOVERNOR_ENABLED = os.getenv("GOVERNOR_ENABLED", "true").lower() == "true"
+    SYSFS_ROOT = os.getenv("SYSFS_ROOT", "/sys")  # point at a fake tree for testing
+    GOVERNOR_INTERVAL = float(os.getenv("GOVERNOR_INTERVAL", "2.0"))  # seconds between sensor reads
+    GOVERNOR_WARM_TEMP = float(os.getenv("GOVERNOR_WARM_TEMP", "65"))  # deg C
+    GOVERNOR_HOT_TEMP = float(os.getenv("GOVERNOR_HOT_TEMP", "75"))
+    GOVERNOR_CRITICAL_TEMP = float(os.getenv("GOVERNOR_CRITICAL_TEMP", "80"))
+    GOVERNOR_HYSTERESIS = float(os.getenv("GOVERNOR_HYSTERESIS", "3"))
+    GOVERNOR_FREQ_CAP_RATIO = float(os.getenv("GOVERNOR_FREQ_CAP_RATIO", "0.8"))  # a policy limit (scaling_max_freq) below this share of max freq counts as throttled
+    GOVERNOR_MAX_LOOP_INTERVAL = float(os.getenv("GOVERNOR_MAX_LOOP_INTERVAL", "0.3"))  # bounds proximity-warning latency
+    GOVERNOR_DECISION_HISTORY = int(os.getenv("GOVERNOR_DECISION_HISTORY", "50"))
+
+    # Memory budget mode for 1 GB devices: pooled frame buffers and capped caches
+    MEMORY_BUDGET_MODE = os.getenv("MEMORY_BUDGET_MODE", "false").lower() == "true"
+    MEMORY_POOL_MAX_MB = float(os.getenv("MEMORY_POOL_MAX_MB", "64"))
+    MEMORY_CAMERA_SLOTS = int(os.getenv("MEMORY_CAMERA_SLOTS", "6"))  # pooled camera frames in rotation
+    MEMORY_REPORT_INTERVAL = float(os.getenv("MEMORY_REPORT_INTERVAL", "300"))  # seconds between footprint logs, 0 disables
+    JPEG_QUALITY = int(os.getenv("JPEG_QUALITY", "95"))  # cloud uploads
+    CLOUD_IMAGE_MAX_WIDTH = int(os.getenv("CLOUD_IMAGE_MAX_WIDTH", "0"))  # downscale uploads wider than this, 0 disables
+
+    # Append-only columnar telemetry (detections, EEG, latencies, API outcomes, speech)
+    TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "false").lower() == "true"
+    TELEMETRY_DIR = os.getenv("TELEMETRY_DIR", os.path.expanduser("~/.local/share/blindsee/telemetry"))
+    TELEMETRY_CHUNK_ROWS = int(os.getenv("TELEMETRY_CHUNK_ROWS", "4096"))
+    TELEMETRY_FLUSH_INTERVAL = float(os.getenv("TELEMETRY_FLUSH_INTERVAL", "30"))  # seconds
+    TELEMETRY_MAX_MB = float(os.getenv("TELEMETRY_MAX_MB", "256"))  # oldest chunks are deleted beyond this
+    TELEMETRY_QUEUE_SIZE = int(os.getenv("TELEMETRY_QUEUE_SIZE", "10000"))  # records; extra records are dropped
+
+    # Multi-device gateway: batched detection and fair GPT-4o scheduling for a fleet of devices
+    GATEWAY_URL = os.getenv("GATEWAY_URL", "")  # e.g. http://192.168.1.10:8090; set to run this device as a thin client
+    GATEWAY_DEVICE_ID = os.getenv("GATEWAY_DEVICE_ID", socket.gethostname())
+    GATEWAY_TIMEOUT = float(os.getenv("GATEWAY_TIMEOUT", "5.0"))  # seconds for detection requests
+    GATEWAY_CLOUD_TIMEOUT = float(os.getenv("GATEWAY_CLOUD_TIMEOUT", "30.0"))  # seconds for GPT-4o requests
+    GATEWAY_FRAME_WIDTH = int(os.getenv("GATEWAY_FRAME_WIDTH", "320"))  # detection uploads are downscaled to this width
+    GATEWAY_JPEG_QUALITY = int(os.getenv("GATEWAY_JPEG_QUALITY", "80"))  # detection uploads
+    GATEWAY_EEG_INTERVAL = float(os.getenv("GATEWAY_EEG_INTERVAL", "2.0"))  # seconds between EEG summaries
+    GATEWAY_HOST = os.getenv("GATEWAY_HOST", "0.0.0.0")
+    GATEWAY_PORT = int(os.getenv("GATEWAY_PORT", "8090"))
+    GATEWAY_BATCH_SIZE = int(os.getenv("GATEWAY_BATCH_SIZE", "8"))  # frames per detector invoke
+    GATEWAY_BATCH_WAIT_MS = float(os.getenv("GATEWAY_BATCH_WAIT_MS", "15"))  # how long the first frame waits for others
+    GATEWAY_DEVICE_QUEUE = int(os.getenv("GATEWAY_DEVICE_QUEUE", "2"))  # pending frames per device; older ones are superseded
+    GATEWAY_GPT_WORKERS = int(os.getenv("GATEWAY_GPT_WORKERS", "4"))  # concurrent GPT-4o calls (and pooled connections)
+    GATEWAY_DEVICE_GPT_PER_MINUTE = float(os.getenv("GATEWAY_DEVICE_GPT_PER_MINUTE", "12"))
+    GATEWAY_DEVICE_GPT_BURST = int(os.getenv("GATEWAY_DEVICE_GPT_BURST", "3"))
+    GATEWAY_DEVICE_GPT_PENDING = int(os.getenv("GATEWAY_DEVICE_GPT_PENDING", "2"))  # queued GPT-4o calls per device
+    GATEWAY_GPT_TIMEOUT = float(os.getenv("GATEWAY_GPT_TIMEOUT", "25.0"))  # seconds before the gateway answers 503; below GATEWAY_CLOUD_TIMEOUT
@@ -1,17 +1,43 @@
+from ..config.config import Config
 from ..utils.logger import Logger
-from typing import Dict
+from ..utils.telemetry import telemetry
+from .spectral import SpectralEngine, parse_bands
+from typing import Dict, Optional
 
 class EEGProcessor:
     """
     Processes raw EEG values into a structured dictionary.
-    Currently just passes them through, but could be extended for:
+    Band powers reported by the headset are passed through, and when
+    EEG_SPECTRAL_ENABLED is set the raw wave is run through a SpectralEngine
+    whose features (spectral_* keys) are merged into every result.
+    Could be further extended for:
     - Filtering noise
-    - Running FFT or other signal processing
     - Detecting complex emotional or cognitive states
     """
 
     def __init__(self):
         self.logger = Logger("EEGProcessor")
+        self.spectral: Optional[SpectralEngine] = None
+        if Config.EEG_SPECTRAL_ENABLED:
+            self.spectral = SpectralEngine(bands=parse_bands(Config.EEG_SPECTRAL_BANDS))
+        self.last_eeg_data: Dict[str, float] = {}
+
+    def process_raw_sample(self, value: int) -> Optional[Dict[str, float]]:
+        """
+        Feeds one raw wave sample to the spectral engine.
+        Returns the latest EEG dictionary (headset values plus fresh spectral
+        features) whenever the engine produces an update, otherwise None.
+        """
+        if self.spectral is None:
+            return None
+        features = self.spectral.add_sample(value)
+        if features is None:
+            return None
+        merged = dict(self.last_eeg_data)
+        merged.update(features)
+        self.last_eeg_data = merged
+        telemetry.record("eeg", **merged)
+        return merged
 
     def process_eeg_data(self,
                          signal_quality: int,
@@ -36,8 +62,7 @@ class EEGProcessor:
         )
 
         # Potential expansions: scaling these values, normalizing them, or computing derived metrics.
-        # For now, just return as-is:
-        return {
+        eeg_data = {
             "signal_quality": float(signal_quality),
             "attention": float(attention),
             "meditation": float(meditation),
@@ -50,3 +75,8 @@ class EEGProcessor:
             "lowgamma": float(lowgamma),
             "middlegamma": float(middlegamma)
         }
+        if self.spectral is not None:
+            eeg_data.update(self.spectral.features())
+        self.last_eeg_data = eeg_data
+        telemetry.record("eeg", **eeg_data)
+        return eeg_data
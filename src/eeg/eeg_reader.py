@@ -49,17 +49,23 @@ class EEGReader:
                             continue
 
                         if data3[0] == 0x04:
-                            # Poor signal quality packet
+                            # Raw wave packet (code 0x80, 2 bytes, signed 16-bit sample at 512 Hz)
                             data4 = self.ser.read(5)
                             if data4 and len(data4) == 5 and data4[0] == 0x80 and data4[1] == 0x02:
-                                # just ignore these, or could store poor signal info
                                 high = data4[2]
                                 low = data4[3]
                                 checkSum = data4[4]
                                 s = ((0x80 + 0x02 + high + low) ^ 0xffffffff) & 0xff
                                 if s != checkSum:
-                                    self.logger.warn("Checksum failed for poor signal data. Data may be noisy.")
-                                # No return here, just continue reading.
+                                    self.logger.warn("Checksum failed for raw wave data. Data may be noisy.")
+                                    continue
+                                raw_value = (high << 8) | low
+                                if raw_value >= 32768:
+                                    raw_value -= 65536
+                                # Return early whenever the spectral engine has a sub-second update.
+                                eeg_data = self.processor.process_raw_sample(raw_value)
+                                if eeg_data:
+                                    return eeg_data
 
                         elif data3[0] == 0x20:
                             # Big data packet with EEG values
@@ -0,0 +1,241 @@
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..config.config import Config
+from ..utils.logger import Logger
+
+
+class SpectralEngine:
+    """
+    Computes EEG band powers on-device from the raw wave samples (512 Hz on
+    ThinkGear headsets) instead of relying on the ASIC band powers that only
+    arrive once per second.
+
+    The engine runs a sliding-window Welch PSD:
+    - Samples are collected into overlapping segments (50% overlap, Hann window).
+    - Each segment's periodogram is computed once with NumPy's real FFT and kept
+      in a ring, so an update only transforms the newest segment(s).
+    - Segments whose peak-to-peak amplitude exceeds the artifact threshold
+      (blinks, electrode pops) are excluded from the average.
+    - Band powers and attention/relaxation-style indices are refreshed every
+      `update_interval` seconds (sub-second by default).
+
+    Methods:
+        add_samples(samples: Iterable[float]) -> Optional[Dict[str, float]]:
+            Feeds raw samples; returns a feature dict when a new update is ready.
+        features() -> Dict[str, float]:
+            Returns the most recent features.
+    """
+
+    DEFAULT_BANDS: Dict[str, Tuple[float, float]] = {
+        "delta": (0.5, 4.0),
+        "theta": (4.0, 8.0),
+        "alpha": (8.0, 13.0),
+        "beta": (13.0, 30.0),
+        "gamma": (30.0, 45.0),
+    }
+
+    def __init__(self,
+                 sample_rate: Optional[int] = None,
+                 window_seconds: Optional[float] = None,
+                 segment_length: Optional[int] = None,
+                 update_interval: Optional[float] = None,
+                 bands: Optional[Dict[str, Tuple[float, float]]] = None,
+                 artifact_threshold: Optional[float] = None):
+        self.logger = Logger("SpectralEngine")
+        self.sample_rate = sample_rate or Config.EEG_RAW_SAMPLE_RATE
+        self.segment_length = segment_length or Config.EEG_SPECTRAL_SEGMENT
+        self.step = self.segment_length // 2
+        window_seconds = window_seconds or Config.EEG_SPECTRAL_WINDOW
+        update_interval = update_interval or Config.EEG_SPECTRAL_UPDATE_INTERVAL
+        self.artifact_threshold = artifact_threshold if artifact_threshold is not None else Config.EEG_ARTIFACT_THRESHOLD
+        self.bands = bands or self.DEFAULT_BANDS
+
+        window_samples = max(self.segment_length, int(window_seconds * self.sample_rate))
+        self.num_segments = (window_samples - self.segment_length) // self.step + 1
+        self.steps_per_update = max(1, int(round(update_interval * self.sample_rate / self.step)))
+
+        # Buffers are allocated once and reused for every update.
+        self.taper = np.hanning(self.segment_length).astype(np.float64)
+        self.scale = 1.0 / (self.sample_rate * float(np.sum(self.taper ** 2)))
+        self.freqs = np.fft.rfftfreq(self.segment_length, d=1.0 / self.sample_rate)
+        self.df = self.freqs[1] - self.freqs[0]
+        self.band_masks = {name: (self.freqs >= lo) & (self.freqs < hi) for name, (lo, hi) in self.bands.items()}
+
+        self.history = np.zeros(self.segment_length, dtype=np.float64)
+        self.history_filled = 0
+        self.pending = np.zeros(self.step, dtype=np.float64)
+        self.pending_count = 0
+        self.periodograms = np.zeros((self.num_segments, self.freqs.size), dtype=np.float64)
+        self.valid = np.zeros(self.num_segments, dtype=bool)
+        self.ring_index = 0
+        self.steps_since_update = 0
+        self.segments_seen = 0
+        self.segments_rejected = 0
+        self._features: Dict[str, float] = {}
+
+    def reset(self):
+        """
+        Clears all buffered samples and periodograms, e.g. after the headset reconnects.
+        """
+        self.history.fill(0.0)
+        self.history_filled = 0
+        self.pending_count = 0
+        self.valid.fill(False)
+        self.ring_index = 0
+        self.steps_since_update = 0
+        self._features = {}
+
+    def add_sample(self, value: float) -> Optional[Dict[str, float]]:
+        """
+        Feeds a single raw sample. Returns new features if an update was produced.
+        """
+        self.pending[self.pending_count] = value
+        self.pending_count += 1
+        if self.pending_count < self.step:
+            return None
+        self.pending_count = 0
+        return self._advance(self.pending)
+
+    def add_samples(self, samples: Iterable[float]) -> Optional[Dict[str, float]]:
+        """
+        Feeds a block of raw samples. Returns the latest features if at least one
+        update was produced while consuming the block.
+        """
+        data = np.asarray(samples, dtype=np.float64).ravel()
+        updated = None
+        offset = 0
+        while offset < data.size:
+            take = min(self.step - self.pending_count, data.size - offset)
+            self.pending[self.pending_count:self.pending_count + take] = data[offset:offset + take]
+            self.pending_count += take
+            offset += take
+            if self.pending_count == self.step:
+                self.pending_count = 0
+                result = self._advance(self.pending)
+                if result is not None:
+                    updated = result
+        return updated
+
+    def _advance(self, block: np.ndarray) -> Optional[Dict[str, float]]:
+        # Shift the segment history by one step and append the new block in place.
+        self.history[:-self.step] = self.history[self.step:]
+        self.history[-self.step:] = block
+        self.history_filled = min(self.segment_length, self.history_filled + self.step)
+        if self.history_filled < self.segment_length:
+            return None
+
+        segment = self.history - self.history.mean()
+        self.segments_seen += 1
+        if np.ptp(segment) > self.artifact_threshold:
+            self.valid[self.ring_index] = False
+            self.segments_rejected += 1
+        else:
+            spectrum = np.fft.rfft(segment * self.taper)
+            np.multiply(spectrum.real, spectrum.real, out=self.periodograms[self.ring_index])
+            self.periodograms[self.ring_index] += spectrum.imag * spectrum.imag
+            self.periodograms[self.ring_index] *= self.scale
+            self.periodograms[self.ring_index, 1:-1] *= 2.0  # one-sided spectrum
+            self.valid[self.ring_index] = True
+        self.ring_index = (self.ring_index + 1) % self.num_segments
+
+        self.steps_since_update += 1
+        if self.steps_since_update < self.steps_per_update:
+            return None
+        self.steps_since_update = 0
+        return self._update_features()
+
+    def _update_features(self) -> Optional[Dict[str, float]]:
+        valid_count = int(np.count_nonzero(self.valid))
+        artifact_ratio = 1.0 - valid_count / float(self.num_segments)
+        if valid_count == 0:
+            self.logger.debug("All segments in the window rejected as artifacts, skipping update.")
+            self._features = {"spectral_artifact_ratio": artifact_ratio}
+            return None
+
+        psd = self.periodograms[self.valid].mean(axis=0)
+        powers = {name: float(psd[mask].sum() * self.df) for name, mask in self.band_masks.items()}
+
+        features = {f"spectral_{name}": value for name, value in powers.items()}
+        features["spectral_artifact_ratio"] = artifact_ratio
+
+        # Ratio-based indices mapped to 0..100 like the headset's eSense values.
+        alpha, beta, theta = powers.get("alpha", 0.0), powers.get("beta", 0.0), powers.get("theta", 0.0)
+        eps = 1e-12
+        engagement = beta / (alpha + theta + eps)
+        relaxation = alpha / (beta + theta + eps)
+        features["spectral_attention"] = 100.0 * engagement / (1.0 + engagement)
+        features["spectral_relaxation"] = 100.0 * relaxation / (1.0 + relaxation)
+
+        self._features = features
+        return features
+
+    def features(self) -> Dict[str, float]:
+        """
+        Returns the most recent spectral features (empty until the first window is full).
+        """
+        return dict(self._features)
+
+    def benchmark(self, seconds: float = 60.0, block_size: int = 1) -> Dict[str, float]:
+        """
+        Feeds `seconds` of synthetic EEG (alpha rhythm plus noise and occasional
+        blinks) and measures the CPU cost. `cpu_fraction` is the share of one core
+        needed to keep up with the real-time sample rate.
+        """
+        n = int(seconds * self.sample_rate)
+        t = np.arange(n) / self.sample_rate
+        rng = np.random.default_rng(0)
+        signal = 40.0 * np.sin(2 * np.pi * 10.0 * t) + 15.0 * np.sin(2 * np.pi * 20.0 * t) + rng.normal(0, 20.0, n)
+        blink_starts = rng.integers(0, n - self.sample_rate // 4, size=max(1, int(seconds / 5)))
+        for start in blink_starts:
+            signal[start:start + self.sample_rate // 4] += 2.0 * self.artifact_threshold
+        self.reset()
+
+        updates = 0
+        cpu_start = time.process_time()
+        if block_size <= 1:
+            for value in signal.tolist():
+                if self.add_sample(value) is not None:
+                    updates += 1
+        else:
+            for start in range(0, n, block_size):
+                if self.add_samples(signal[start:start + block_size]) is not None:
+                    updates += 1
+        cpu_elapsed = time.process_time() - cpu_start
+
+        result = {
+            "seconds_of_eeg": seconds,
+            "cpu_seconds": cpu_elapsed,
+            "cpu_fraction": cpu_elapsed / seconds,
+            "updates": float(updates),
+            "update_latency_s": self.steps_per_update * self.step / float(self.sample_rate),
+        }
+        self.logger.info(
+            f"Spectral benchmark: {seconds:.0f}s of EEG in {cpu_elapsed:.3f}s CPU "
+            f"({result['cpu_fraction'] * 100:.2f}% of one core), {updates} updates."
+        )
+        return result
+
+
+def parse_bands(spec: str) -> Dict[str, Tuple[float, float]]:
+    """
+    Parses a band definition string such as "delta:0.5-4,theta:4-8,alpha:8-13".
+    Returns SpectralEngine.DEFAULT_BANDS if the string is empty.
+    """
+    if not spec or not spec.strip():
+        return dict(SpectralEngine.DEFAULT_BANDS)
+    bands: Dict[str, Tuple[float, float]] = {}
+    entries: List[str] = [entry.strip() for entry in spec.split(",") if entry.strip()]
+    for entry in entries:
+        name, limits = entry.split(":")
+        low, high = limits.split("-")
+        bands[name.strip()] = (float(low), float(high))
+    return bands
+
+
+if __name__ == "__main__":
+    engine = SpectralEngine(bands=parse_bands(Config.EEG_SPECTRAL_BANDS))
+    engine.benchmark(block_size=1)
+    engine.benchmark(block_size=Config.EEG_RAW_SAMPLE_RATE // 8)
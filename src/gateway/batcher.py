@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config.config import Config
+from ..utils.logger import Logger
+
+
+class Superseded(Exception):
+    """
+    Set on a queued frame's Future when a newer frame from the same device replaced it.
+    """
+
+
+class DetectionBatcher:
+    """
+    Collects frames from all devices and runs them through ObjectDetector.detect_batch
+    in a single background thread, so one interpreter serves the whole fleet and
+    frames arriving together share an invoke.
+
+    A batch starts when the first frame arrives and is run once GATEWAY_BATCH_SIZE
+    frames are waiting or GATEWAY_BATCH_WAIT_MS has passed. Batches take one frame
+    per device in round-robin order, and each device keeps at most
+    GATEWAY_DEVICE_QUEUE frames waiting: proximity warnings need the newest frame,
+    so the oldest one is dropped (its Future fails with Superseded).
+    """
+
+    def __init__(self, detector, max_batch: Optional[int] = None, max_wait: Optional[float] = None, max_queue: Optional[int] = None):
+        self.logger = Logger("DetectionBatcher")
+        self.detector = detector
+        self.max_batch = max(1, max_batch or Config.GATEWAY_BATCH_SIZE)
+        self.max_wait = Config.GATEWAY_BATCH_WAIT_MS / 1000.0 if max_wait is None else max_wait
+        self.max_queue = max(1, max_queue or Config.GATEWAY_DEVICE_QUEUE)
+        self.cond = threading.Condition()
+        self.queues: Dict[str, Deque[Tuple[np.ndarray, Future]]] = {}
+        self.ring: Deque[str] = deque()
+        self.waiting = 0
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.frames = 0
+        self.superseded = 0
+        self.infer_seconds = 0.0
+
+    def start(self) -> "DetectionBatcher":
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="gateway-detector", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.thread:
+            self.thread.join(timeout=5.0)
+
+    def submit(self, device: str, frame: np.ndarray) -> Future:
+        """
+        Queues a frame and returns a Future with its detections.
+        """
+        future: Future = Future()
+        with self.cond:
+            queue = self.queues.setdefault(device, deque())
+            if len(queue) >= self.max_queue:
+                _, stale = queue.popleft()
+                stale.set_exception(Superseded(f"Frame from {device} superseded by a newer one."))
+                self.superseded += 1
+                self.waiting -= 1
+            if not queue:
+                self.ring.append(device)
+            queue.append((frame, future))
+            self.waiting += 1
+            self.cond.notify()
+        return future
+
+    def _take_batch(self) -> List[Tuple[np.ndarray, Future]]:
+        batch = []
+        while self.ring and len(batch) < self.max_batch:
+            device = self.ring.popleft()
+            queue = self.queues[device]
+            batch.append(queue.popleft())
+            if queue:
+                self.ring.append(device)
+        self.waiting -= len(batch)
+        return batch
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.running and not self.waiting:
+                    self.cond.wait()
+                if not self.running:
+                    break
+                deadline = time.monotonic() + self.max_wait
+                while self.running and self.waiting < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.cond.wait(remaining)
+                batch = self._take_batch()
+
+            start = time.perf_counter()
+            try:
+                results = self.detector.detect_batch([frame for frame, _ in batch])
+            except Exception as e:
+                self.logger.error(f"Batched detection of {len(batch)} frame(s) failed: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.infer_seconds += time.perf_counter() - start
+            self.batches += 1
+            self.frames += len(batch)
+            for (_, future), objects in zip(batch, results):
+                future.set_result(objects)
+
+        with self.cond:
+            for queue in self.queues.values():
+                for _, future in queue:
+                    future.set_exception(Superseded("Gateway shutting down."))
+                queue.clear()
+            self.ring.clear()
+            self.waiting = 0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "frames": self.frames,
+            "superseded": self.superseded,
+            "mean_batch": self.frames / self.batches if self.batches else 0.0,
+            "infer_ms_per_frame": 1000.0 * self.infer_seconds / self.frames if self.frames else 0.0,
+        }
@@ -0,0 +1,163 @@
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import requests
+
+from ..ai.reassuring_messages import ReassuringMessages
+from ..config.config import Config
+from ..utils.imaging import encode_jpeg
+from ..utils.logger import Logger
+from ..vision.cascade import ProximityScreener
+from ..vision.object_detection import ObjectDetector
+from ..vision.openai_vision import OpenAIVision, VisionOutput
+
+
+class GatewayClient:
+    """
+    Thin-client side of the gateway (GATEWAY_URL). Keeps one keep-alive
+    connection to the gateway and tags every request with GATEWAY_DEVICE_ID.
+
+    Detection frames are downscaled to GATEWAY_FRAME_WIDTH and encoded at
+    GATEWAY_JPEG_QUALITY, since the detector input is much smaller than the
+    camera frame; GPT-4o uploads use the same JPEG settings as direct calls.
+    Failed or rate-limited requests return None so callers can fall back.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, device_id: Optional[str] = None):
+        self.logger = Logger("GatewayClient")
+        self.base_url = (base_url or Config.GATEWAY_URL).rstrip("/")
+        self.device_id = device_id or Config.GATEWAY_DEVICE_ID
+        self.session = requests.Session()
+        self.session.headers["X-Device-Id"] = self.device_id
+        self.last_eeg = float("-inf")
+        self.rate_limited_until = 0.0
+        self.last_status = 0  # HTTP status of the last request, 0 if it did not complete
+
+    def _post(self, path: str, data: Optional[bytes], timeout: float, content_type: str = "image/jpeg") -> Optional[Dict[str, Any]]:
+        self.last_status = 0
+        try:
+            response = self.session.post(f"{self.base_url}{path}", data=data or b"",
+                                         headers={"Content-Type": content_type}, timeout=timeout)
+        except requests.RequestException as e:
+            self.logger.warn(f"Gateway request {path} failed: {e}")
+            return None
+        self.last_status = response.status_code
+        if response.status_code == 429:
+            retry_after = float(response.headers.get("Retry-After", "1"))
+            self.rate_limited_until = time.monotonic() + retry_after
+            self.logger.warn(f"Gateway rate limited {path}, retry after {retry_after:g}s.")
+            return None
+        if response.status_code != 200:
+            self.logger.debug(f"Gateway answered {response.status_code} to {path}: {response.text[:200]}")
+            return None
+        return response.json()
+
+    def detect(self, frame: np.ndarray) -> Optional[Tuple[List[Tuple[str, float, List[float]]], bool]]:
+        """
+        Returns (objects, too_close) from the gateway's detector, or None.
+        """
+        encoded = encode_jpeg(frame, Config.GATEWAY_JPEG_QUALITY, Config.GATEWAY_FRAME_WIDTH)
+        if encoded is None:
+            return None
+        payload = self._post("/v1/detect", encoded.tobytes(), Config.GATEWAY_TIMEOUT)
+        if payload is None:
+            return None
+        objects = [(label, score, box) for label, score, box in payload["objects"]]
+        return objects, bool(payload["too_close"])
+
+    def _cloud_image(self, frame) -> Optional[bytes]:
+        if time.monotonic() < self.rate_limited_until:
+            self.logger.debug("Still rate limited by the gateway, skipping GPT-4o request.")
+            return None
+        encoded = encode_jpeg(frame)
+        return encoded.tobytes() if encoded is not None else None
+
+    def describe(self, frame) -> Optional[VisionOutput]:
+        image = self._cloud_image(frame)
+        if image is None:
+            return None
+        payload = self._post("/v1/describe", image, Config.GATEWAY_CLOUD_TIMEOUT)
+        if not payload or not payload.get("vision"):
+            return None
+        return VisionOutput(**payload["vision"])
+
+    def reassure(self, frame) -> Optional[str]:
+        if time.monotonic() < self.rate_limited_until:
+            return None
+        payload = self._post("/v1/reassure", self._cloud_image(frame), Config.GATEWAY_CLOUD_TIMEOUT)
+        return payload.get("message") if payload else None
+
+    def send_eeg(self, eeg_data: Optional[Dict[str, float]], force: bool = False) -> Optional[bool]:
+        """
+        Sends the EEG summary at most every GATEWAY_EEG_INTERVAL seconds.
+        Returns the gateway's distress verdict, or None if nothing was sent.
+        """
+        if not eeg_data or (not force and time.monotonic() - self.last_eeg < Config.GATEWAY_EEG_INTERVAL):
+            return None
+        self.last_eeg = time.monotonic()
+        summary = {key: value for key, value in eeg_data.items() if isinstance(value, (int, float))}
+        payload = self._post("/v1/eeg", json.dumps(summary).encode("utf-8"), Config.GATEWAY_TIMEOUT, "application/json")
+        return payload.get("distressed") if payload else None
+
+    def close(self):
+        self.session.close()
+
+
+class GatewayDetector(ObjectDetector):
+    """
+    ObjectDetector whose full model runs on the gateway. The cascade's stage-one
+    screener (if CASCADE_ENABLED) still runs locally and only escalates to the gateway.
+    """
+
+    def __init__(self, client: GatewayClient):
+        self.logger = Logger("GatewayDetector")
+        self.client = client
+        self.model = None
+        self.mode = "full"
+        self.latency_target = 0.0
+        self.region_cost = None
+        self.screener = ProximityScreener() if Config.CASCADE_ENABLED else None
+        self.last_escalation = float("-inf")
+        self.frames_processed = 0
+
+    def set_num_threads(self, num_threads: int):
+        pass
+
+    def detect_objects(self, frame: np.ndarray, mode: Optional[str] = None) -> List[Tuple[str, float, List[float]]]:
+        if frame is None:
+            self.logger.warn("No frame provided to detect_objects, returning empty list.")
+            return []
+        result = self.client.detect(frame)
+        self.frames_processed += 1
+        return result[0] if result else []
+
+
+class GatewayVision(OpenAIVision):
+    """
+    OpenAIVision that asks the gateway, which makes the GPT-4o call on the device's behalf.
+    """
+
+    def __init__(self, client: GatewayClient):
+        self.logger = Logger("GatewayVision")
+        self.client = client
+
+    def analyze_frame(self, frame) -> Optional[VisionOutput]:
+        if frame is None:
+            self.logger.warn("No frame provided to analyze_frame.")
+            return None
+        return self.client.describe(frame)
+
+
+class GatewayReassurance(ReassuringMessages):
+    """
+    ReassuringMessages that asks the gateway, falling back to the canned message.
+    """
+
+    def __init__(self, client: GatewayClient):
+        self.logger = Logger("GatewayReassurance")
+        self.client = client
+
+    def generate_message(self, frame) -> str:
+        return self.client.reassure(frame) or (self.FALLBACK_MESSAGE if frame is not None else self.FALLBACK_MESSAGE_NO_IMAGE)
@@ -0,0 +1,186 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import openai
+import requests
+
+from ..config.config import Config
+from ..utils.logger import Logger
+
+
+class RateLimited(Exception):
+    """
+    Raised when a device is over its GPT-4o budget or has too many calls queued.
+    The gateway answers 429 with `retry_after` as the Retry-After header.
+    """
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Allows `rate` calls per second on average with bursts of up to `burst` calls.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """
+        Takes a token. Returns 0.0 on success, otherwise the seconds until one is available.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+
+def pooled_session(pool_size: int) -> requests.Session:
+    """
+    A requests session with `pool_size` keep-alive connections per host, shared by all
+    gateway workers through `openai.requestssession` (the client otherwise opens one
+    session per thread).
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class FairScheduler:
+    """
+    Runs GPT-4o calls for many devices on a bounded worker pool.
+
+    Every device gets its own queue and workers take from the devices in
+    round-robin order, so a chatty device cannot starve the others. Urgent calls
+    (reassurance for a distressed user) are served before regular ones. Each
+    device is limited to GATEWAY_DEVICE_GPT_PER_MINUTE calls (token bucket with
+    GATEWAY_DEVICE_GPT_BURST) and GATEWAY_DEVICE_GPT_PENDING queued calls;
+    submit() raises RateLimited beyond that instead of queueing. Calls whose
+    Future was cancelled while queued (the caller gave up) are skipped.
+    """
+
+    def __init__(self,
+                 workers: Optional[int] = None,
+                 per_minute: Optional[float] = None,
+                 burst: Optional[int] = None,
+                 max_pending: Optional[int] = None):
+        self.logger = Logger("FairScheduler")
+        self.workers = max(1, workers or Config.GATEWAY_GPT_WORKERS)
+        self.rate = (Config.GATEWAY_DEVICE_GPT_PER_MINUTE if per_minute is None else per_minute) / 60.0
+        self.burst = Config.GATEWAY_DEVICE_GPT_BURST if burst is None else burst
+        self.max_pending = Config.GATEWAY_DEVICE_GPT_PENDING if max_pending is None else max_pending
+        self.cond = threading.Condition()
+        # Per-device job queues and the round-robin order of devices with queued jobs, urgent first.
+        self.queues: Dict[bool, Dict[str, Deque[Tuple[Callable[[], object], Future, float]]]] = {True: {}, False: {}}
+        self.rings: Dict[bool, Deque[str]] = {True: deque(), False: deque()}
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.pending: Dict[str, int] = {}
+        self.device_stats: Dict[str, Dict[str, float]] = {}
+        self.running = False
+        self.threads: List[threading.Thread] = []
+
+    def start(self) -> "FairScheduler":
+        openai.requestssession = pooled_session(self.workers)
+        self.running = True
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"gateway-gpt-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        self.logger.info(f"{self.workers} GPT worker(s), {self.rate * 60:g} call(s)/min per device.")
+        return self
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        for thread in self.threads:
+            thread.join(timeout=5.0)
+        self.threads = []
+
+    def _stats(self, device: str) -> Dict[str, float]:
+        return self.device_stats.setdefault(device, {"submitted": 0, "served": 0, "rate_limited": 0, "failed": 0, "cancelled": 0, "queue_seconds": 0.0})
+
+    def submit(self, device: str, call: Callable[[], object], urgent: bool = False) -> Future:
+        """
+        Queues `call` for `device` and returns a Future with its result.
+        """
+        with self.cond:
+            stats = self._stats(device)
+            if self.pending.get(device, 0) >= self.max_pending:
+                stats["rate_limited"] += 1
+                raise RateLimited(f"Device {device} already has {self.max_pending} call(s) queued.", 1.0)
+            bucket = self.buckets.setdefault(device, TokenBucket(self.rate, self.burst))
+            wait = bucket.take()
+            if wait > 0:
+                stats["rate_limited"] += 1
+                raise RateLimited(f"Device {device} is over its GPT-4o rate limit.", wait)
+
+            future: Future = Future()
+            queue = self.queues[urgent].setdefault(device, deque())
+            if not queue:
+                self.rings[urgent].append(device)
+            queue.append((call, future, time.monotonic()))
+            self.pending[device] = self.pending.get(device, 0) + 1
+            stats["submitted"] += 1
+            self.cond.notify()
+        return future
+
+    def _next(self) -> Optional[Tuple[str, Callable[[], object], Future, float]]:
+        for urgent in (True, False):
+            ring = self.rings[urgent]
+            if ring:
+                device = ring.popleft()
+                queue = self.queues[urgent][device]
+                call, future, queued_at = queue.popleft()
+                if queue:
+                    ring.append(device)
+                return device, call, future, queued_at
+        return None
+
+    def _work(self):
+        while True:
+            with self.cond:
+                job = self._next()
+                while job is None and self.running:
+                    self.cond.wait()
+                    job = self._next()
+                if job is None:
+                    return
+            device, call, future, queued_at = job
+            if not future.set_running_or_notify_cancel():
+                with self.cond:
+                    self.pending[device] -= 1
+                    self._stats(device)["cancelled"] += 1
+                continue
+            started = time.monotonic()
+            try:
+                result = call()
+            except Exception as e:
+                self.logger.error(f"GPT call for {device} failed: {e}")
+                future.set_exception(e)
+                ok = False
+            else:
+                future.set_result(result)
+                ok = True
+            with self.cond:
+                self.pending[device] -= 1
+                stats = self._stats(device)
+                stats["served" if ok else "failed"] += 1
+                stats["queue_seconds"] += started - queued_at
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self.cond:
+            return {device: dict(values, pending=self.pending.get(device, 0)) for device, values in self.device_stats.items()}
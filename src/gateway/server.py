@@ -0,0 +1,231 @@
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+import cv2
+import numpy as np
+
+from ..ai.emotion_analysis import EmotionAnalysis
+from ..ai.reassuring_messages import ReassuringMessages
+from ..config.config import Config
+from ..utils.logger import Logger
+from ..vision.openai_vision import OpenAIVision, VisionOutput
+from .batcher import DetectionBatcher, Superseded
+from .scheduler import FairScheduler, RateLimited
+
+
+def vision_to_dict(result: VisionOutput) -> Dict[str, Any]:
+    return {
+        "objects": [{"label": obj.label, "description": obj.description} for obj in result.objects],
+        "contains_people": result.contains_people,
+        "summary": result.summary,
+    }
+
+
+class GatewayServer(ThreadingHTTPServer):
+    """
+    Serves a fleet of devices on the local network so they can run as thin clients.
+
+    Devices identify themselves with an X-Device-Id header and POST:
+    - /v1/detect: a JPEG frame; detections and the proximity verdict come back
+      from the shared, batched detector (DetectionBatcher);
+    - /v1/describe and /v1/reassure: a JPEG frame for OpenAIVision and
+      ReassuringMessages, run on FairScheduler's pooled connections under
+      per-device fairness and rate limits (429 with Retry-After beyond them,
+      503 if the call takes longer than GATEWAY_GPT_TIMEOUT);
+    - /v1/eeg: a JSON EEG summary (attention, meditation, ...), kept per device
+      and used to decide the distress state.
+    GET /v1/stats reports batching, per-device GPT and EEG state.
+    """
+
+    daemon_threads = True
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 detector=None,
+                 vision: Optional[OpenAIVision] = None,
+                 reassurance: Optional[ReassuringMessages] = None,
+                 scheduler: Optional[FairScheduler] = None):
+        super().__init__((host, port), _GatewayHandler)
+        self.logger = Logger("Gateway")
+        if detector is None:
+            from ..vision.object_detection import ObjectDetector
+            detector = ObjectDetector()
+        self.detector = detector
+        self.batcher = DetectionBatcher(detector)
+        self.scheduler = scheduler or FairScheduler()
+        self.vision = vision or OpenAIVision()
+        self.reassurance = reassurance or ReassuringMessages()
+        self.eeg_lock = threading.Lock()
+        self.eeg: Dict[str, Dict[str, float]] = {}
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "GatewayServer":
+        """
+        Serves requests from a background daemon thread.
+        """
+        self.batcher.start()
+        self.scheduler.start()
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        self.logger.info(f"Gateway listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self.batcher.stop()
+        self.scheduler.stop()
+        self.logger.info("Gateway stopped.")
+
+    def update_eeg(self, device: str, summary: Dict[str, float]) -> bool:
+        """
+        Stores a device's latest EEG summary and returns whether the user is distressed.
+        """
+        distressed = EmotionAnalysis.is_user_distressed(
+            summary,
+            Config.DISTRESS_ATTENTION_THRESHOLD,
+            Config.DISTRESS_MEDITATION_THRESHOLD
+        )
+        with self.eeg_lock:
+            self.eeg[device] = dict(summary, distressed=distressed, received_at=time.time())
+        return distressed
+
+    def stats(self) -> Dict[str, Any]:
+        with self.eeg_lock:
+            eeg = {device: dict(summary) for device, summary in self.eeg.items()}
+        return {"detector": self.batcher.stats(), "gpt": self.scheduler.stats(), "eeg": eeg}
+
+
+class _GatewayHandler(BaseHTTPRequestHandler):
+    server: GatewayServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Devices post several frames per second each; access logs would flood stderr.
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _decode_frame(self, raw: bytes) -> Optional[np.ndarray]:
+        if not raw:
+            return None
+        return cv2.imdecode(np.frombuffer(raw, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/v1/stats":
+            self._send_json(200, self.server.stats())
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        raw = self.rfile.read(length) if length else b""
+        device = self.headers.get("X-Device-Id", "") or self.client_address[0]
+        route = self.path.rstrip("/")
+        try:
+            if route == "/v1/detect":
+                self._detect(device, raw)
+            elif route == "/v1/describe":
+                self._describe(device, raw)
+            elif route == "/v1/reassure":
+                self._reassure(device, raw)
+            elif route == "/v1/eeg":
+                self._eeg(device, raw)
+            else:
+                self._send_json(404, {"error": "Not found"})
+        except RateLimited as e:
+            self._send_json(429, {"error": str(e)}, {"Retry-After": f"{max(1, int(e.retry_after + 0.999))}"})
+        except Exception as e:
+            self.server.logger.error(f"Error handling {route} for {device}: {e}")
+            self._send_json(500, {"error": str(e)})
+
+    def _detect(self, device: str, raw: bytes):
+        frame = self._decode_frame(raw)
+        if frame is None:
+            self._send_json(400, {"error": "Body must be a JPEG frame."})
+            return
+        future = self.server.batcher.submit(device, frame)
+        try:
+            objects = future.result(timeout=Config.GATEWAY_TIMEOUT)
+        except Superseded as e:
+            self._send_json(409, {"error": str(e)})
+            return
+        except FutureTimeout:
+            self._send_json(503, {"error": "Detection timed out."})
+            return
+        self._send_json(200, {
+            "objects": [[label, float(score), [float(v) for v in box]] for label, score, box in objects],
+            "too_close": self.server.detector.is_object_too_close(frame, objects),
+        })
+
+    def _describe(self, device: str, raw: bytes):
+        if not raw:
+            self._send_json(400, {"error": "Body must be a JPEG frame."})
+            return
+        # The upload is already a JPEG: hand it to GPT-4o as is instead of re-encoding.
+        future = self.server.scheduler.submit(device, lambda: self.server.vision.analyze_frame(raw))
+        try:
+            result = future.result(timeout=Config.GATEWAY_GPT_TIMEOUT)
+        except FutureTimeout:
+            # A call still queued is dropped; one already running finishes unanswered.
+            future.cancel()
+            self._send_json(503, {"error": "Scene description timed out."})
+            return
+        self._send_json(200, {"vision": vision_to_dict(result) if result else None})
+
+    def _reassure(self, device: str, raw: bytes):
+        # Reassurance is only asked for when the user is distressed, so it skips the queue.
+        future = self.server.scheduler.submit(device, lambda: self.server.reassurance.generate_message(raw or None), urgent=True)
+        try:
+            message = future.result(timeout=Config.GATEWAY_GPT_TIMEOUT)
+        except FutureTimeout:
+            future.cancel()
+            self._send_json(503, {"error": "Reassurance timed out."})
+            return
+        self._send_json(200, {"message": message})
+
+    def _eeg(self, device: str, raw: bytes):
+        try:
+            summary = json.loads(raw.decode("utf-8") or "{}")
+            summary = {key: float(value) for key, value in summary.items()}
+        except (ValueError, TypeError, AttributeError):
+            self._send_json(400, {"error": "Body must be a JSON object of numbers."})
+            return
+        self._send_json(200, {"distressed": self.server.update_eeg(device, summary)})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gateway serving batched detection and GPT-4o calls to thin-client devices.")
+    parser.add_argument("--host", default=Config.GATEWAY_HOST)
+    parser.add_argument("--port", type=int, default=Config.GATEWAY_PORT)
+    cli_args = parser.parse_args()
+
+    server = GatewayServer(cli_args.host, cli_args.port).start()
+    server.logger.info(f"Point devices at it with GATEWAY_URL={server.base_url}")
+    try:
+        while True:
+            time.sleep(60)
+            server.logger.info(f"Gateway stats: {server.stats()}")
+    except KeyboardInterrupt:
+        server.logger.info("Interrupted, shutting down.")
+    finally:
+        server.stop()
@@ -1,42 +1,88 @@
-import RPi.GPIO as GPIO
 import time
 from ..utils.logger import Logger
 from ..config.config import Config
+from .fake_gpio import FakeGPIO
+from .gestures import Gesture, GestureRecognizer
 from typing import Callable, Optional
 
+try:
+    import RPi.GPIO as RPiGPIO
+    RPI_GPIO_ERROR = ""
+except (ImportError, RuntimeError) as e:
+    # Not on a Raspberry Pi (or no GPIO access). Button reports it; only GPIO_FAKE runs without it.
+    RPiGPIO = None
+    RPI_GPIO_ERROR = str(e)
+
 class Button:
     """
     Manages a physical button connected to a GPIO pin.
     Uses an internal pull-up and detects falling edges.
     Debouncing is handled via GPIO event detection and software timing.
     When pressed, triggers a callback.
+
+    With set_gesture_callback(), both edges are watched instead and fed to a
+    GestureRecognizer, which reports short, long and double presses timed from
+    the edge timestamps. Set GPIO_FAKE to use the in-process FakeGPIO backend;
+    GPIO_FAKE_SCRIPT plays scripted gestures on it. Without GPIO_FAKE a missing
+    or unusable RPi.GPIO is logged as an error and the button stays inactive.
     """
 
-    def __init__(self):
+    def __init__(self, gpio=None):
         self.logger = Logger("Button")
-        try:
-            GPIO.setmode(GPIO.BCM)
-            GPIO.setup(Config.BUTTON_GPIO_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-            self.logger.info(f"Button set up on GPIO pin {Config.BUTTON_GPIO_PIN} with internal pull-up.")
-        except RuntimeError as e:
-            self.logger.error(f"Error setting up GPIO: {e}. Make sure you run as root or in a correct environment.")
-        except Exception as ex:
-            self.logger.error(f"Unexpected error in button setup: {ex}")
+        if gpio is not None:
+            self.gpio = gpio
+        elif Config.GPIO_FAKE:
+            self.logger.info("Using fake GPIO backend.")
+            self.gpio = FakeGPIO()
+        elif RPiGPIO is None:
+            self.logger.error(f"RPi.GPIO is not available ({RPI_GPIO_ERROR}), the button will not work. "
+                              f"Set GPIO_FAKE=true to run without button hardware.")
+            self.gpio = None
+        else:
+            self.gpio = RPiGPIO
+        if self.gpio is not None:
+            try:
+                self.gpio.setmode(self.gpio.BCM)
+                self.gpio.setup(Config.BUTTON_GPIO_PIN, self.gpio.IN, pull_up_down=self.gpio.PUD_UP)
+                self.logger.info(f"Button set up on GPIO pin {Config.BUTTON_GPIO_PIN} with internal pull-up.")
+            except RuntimeError as e:
+                self.logger.error(f"Error setting up GPIO: {e}. Make sure you run as root or in a correct environment.")
+            except Exception as ex:
+                self.logger.error(f"Unexpected error in button setup: {ex}")
 
         self.last_press_time = 0.0
         self.callback: Optional[Callable[[], None]] = None
+        self.recognizer: Optional[GestureRecognizer] = None
 
     def set_callback(self, callback: Callable[[], None]):
         """
         Registers a callback function to be called when the button is pressed.
         """
         self.callback = callback
+        if self.gpio is None:
+            return
         try:
-            GPIO.add_event_detect(Config.BUTTON_GPIO_PIN, GPIO.FALLING, callback=self._handle_press, bouncetime=Config.BUTTON_DEBOUNCE_TIME)
+            self.gpio.add_event_detect(Config.BUTTON_GPIO_PIN, self.gpio.FALLING, callback=self._handle_press, bouncetime=Config.BUTTON_DEBOUNCE_TIME)
             self.logger.info("Button callback registered.")
         except Exception as e:
             self.logger.error(f"Failed to set button event detect: {e}")
 
+    def set_gesture_callback(self, callback: Callable[[Gesture], None]):
+        """
+        Registers a callback receiving a Gesture for every short, long or double press.
+        """
+        self.recognizer = GestureRecognizer(callback)
+        if self.gpio is None:
+            return
+        try:
+            # No hardware bouncetime: it would swallow the release edge of short presses.
+            self.gpio.add_event_detect(Config.BUTTON_GPIO_PIN, self.gpio.BOTH, callback=self._handle_edge)
+            self.logger.info("Button gesture callback registered.")
+        except Exception as e:
+            self.logger.error(f"Failed to set button event detect: {e}")
+        if isinstance(self.gpio, FakeGPIO) and Config.GPIO_FAKE_SCRIPT:
+            self.gpio.run_script(Config.BUTTON_GPIO_PIN, Config.GPIO_FAKE_SCRIPT)
+
     def _handle_press(self, channel: int):
         now = time.time()
         if (now - self.last_press_time) * 1000 > Config.BUTTON_DEBOUNCE_TIME:
@@ -48,14 +94,25 @@ class Button:
                 except Exception as e:
                     self.logger.error(f"Error in button callback: {e}")
 
+    def _handle_edge(self, channel: int):
+        timestamp = time.monotonic()
+        # Active low: the pull-up holds the pin HIGH until the button shorts it to ground.
+        pressed = self.gpio.input(channel) == self.gpio.LOW
+        if self.recognizer:
+            self.recognizer.edge(pressed, timestamp)
+
     def cleanup(self):
         """
         Cleans up GPIO event detect and resets GPIO mode.
         Should be called before exiting the program.
         """
+        if self.recognizer:
+            self.recognizer.reset()
+        if self.gpio is None:
+            return
         try:
-            GPIO.remove_event_detect(Config.BUTTON_GPIO_PIN)
-            GPIO.cleanup()
+            self.gpio.remove_event_detect(Config.BUTTON_GPIO_PIN)
+            self.gpio.cleanup()
             self.logger.info("Button GPIO cleaned up.")
         except Exception as e:
             self.logger.warn(f"Error during GPIO cleanup: {e}")
@@ -0,0 +1,111 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..utils.logger import Logger
+
+
+class FakeGPIO:
+    """
+    An in-process stand-in for the RPi.GPIO module so the button and gesture
+    logic can run off-device.
+
+    Implements the subset Button uses (setmode, setup, input, add_event_detect,
+    remove_event_detect, cleanup and the constants). Pins idle HIGH, as with the
+    internal pull-up; press()/release() drive a pin LOW/HIGH and fire the
+    registered edge callbacks synchronously, like RPi.GPIO's callback thread.
+
+    run_script() plays a sequence of gestures in a background thread, e.g.
+    "2:short,6:long,10:double" (seconds after start), for end-to-end runs.
+    """
+
+    BCM = 11
+    BOARD = 10
+    IN = 1
+    OUT = 0
+    PUD_UP = 22
+    PUD_DOWN = 21
+    HIGH = 1
+    LOW = 0
+    RISING = 31
+    FALLING = 32
+    BOTH = 33
+
+    SHORT_HOLD = 0.08
+    LONG_HOLD = 1.2
+    DOUBLE_GAP = 0.12
+
+    def __init__(self):
+        self.logger = Logger("FakeGPIO")
+        self.levels: Dict[int, int] = {}
+        self.callbacks: Dict[int, Tuple[int, Callable[[int], None]]] = {}
+        self.lock = threading.Lock()
+
+    def setmode(self, mode: int):
+        pass
+
+    def setup(self, pin: int, direction: int, pull_up_down: Optional[int] = None):
+        self.levels[pin] = self.LOW if pull_up_down == self.PUD_DOWN else self.HIGH
+
+    def input(self, pin: int) -> int:
+        return self.levels.get(pin, self.HIGH)
+
+    def add_event_detect(self, pin: int, edge: int, callback: Optional[Callable[[int], None]] = None, bouncetime: Optional[int] = None):
+        if pin in self.callbacks:
+            raise RuntimeError("Conflicting edge detection already enabled for this GPIO channel")
+        self.callbacks[pin] = (edge, callback)
+
+    def remove_event_detect(self, pin: int):
+        self.callbacks.pop(pin, None)
+
+    def cleanup(self):
+        self.callbacks.clear()
+        self.levels.clear()
+
+    def set_level(self, pin: int, level: int):
+        with self.lock:
+            previous = self.levels.get(pin, self.HIGH)
+            self.levels[pin] = level
+            edge, callback = self.callbacks.get(pin, (None, None))
+        if previous == level or callback is None:
+            return
+        rising = level == self.HIGH
+        if edge == self.BOTH or (edge == self.RISING and rising) or (edge == self.FALLING and not rising):
+            callback(pin)
+
+    def press(self, pin: int):
+        self.set_level(pin, self.LOW)
+
+    def release(self, pin: int):
+        self.set_level(pin, self.HIGH)
+
+    def gesture(self, pin: int, kind: str):
+        """
+        Performs a short, long or double press on the pin (blocking).
+        """
+        presses: List[float] = {"short": [self.SHORT_HOLD], "long": [self.LONG_HOLD],
+                                "double": [self.SHORT_HOLD, self.SHORT_HOLD]}[kind]
+        for i, hold in enumerate(presses):
+            if i:
+                time.sleep(self.DOUBLE_GAP)
+            self.press(pin)
+            time.sleep(hold)
+            self.release(pin)
+
+    def run_script(self, pin: int, script: str) -> threading.Thread:
+        steps = []
+        for entry in script.split(","):
+            if entry.strip():
+                at, kind = entry.split(":")
+                steps.append((float(at), kind.strip()))
+
+        def play():
+            start = time.monotonic()
+            for at, kind in sorted(steps):
+                time.sleep(max(0.0, start + at - time.monotonic()))
+                self.logger.info(f"Simulating {kind} press on pin {pin}.")
+                self.gesture(pin, kind)
+
+        thread = threading.Thread(target=play, name="fake-gpio-script", daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+
+import numpy as np
+
+from ..config.config import Config
+from ..utils.logger import Logger
+
+
+class Gesture:
+    """
+    A recognized button gesture. Timestamps are time.monotonic() seconds taken
+    from the GPIO edge callbacks.
+    """
+
+    SHORT = "short"
+    LONG = "long"
+    DOUBLE = "double"
+
+    def __init__(self, kind: str, pressed_at: float, recognized_at: float, duration: float):
+        self.kind = kind
+        self.pressed_at = pressed_at
+        self.recognized_at = recognized_at
+        self.duration = duration
+
+    def __repr__(self) -> str:
+        return f"Gesture({self.kind}, held {self.duration:.2f}s, recognized after {self.recognized_at - self.pressed_at:.2f}s)"
+
+
+class GestureRecognizer:
+    """
+    Turns the button's edge stream into short, long and double presses.
+
+    Fed with (pressed, timestamp) pairs from GPIO BOTH-edge callbacks:
+    - long: held for BUTTON_LONG_PRESS seconds (recognized while still held);
+    - double: a second press starting within BUTTON_DOUBLE_PRESS_WINDOW seconds
+      of the first release (recognized on the second press);
+    - short: released before BUTTON_LONG_PRESS and no second press within the
+      double-press window (recognized when the window expires).
+    Edges closer than BUTTON_GESTURE_DEBOUNCE_MS to the previous accepted edge,
+    and repeated edges of the same level, are treated as contact bounce.
+    """
+
+    def __init__(self, on_gesture: Callable[[Gesture], None]):
+        self.logger = Logger("GestureRecognizer")
+        self.on_gesture = on_gesture
+        self.long_press = Config.BUTTON_LONG_PRESS
+        self.double_window = Config.BUTTON_DOUBLE_PRESS_WINDOW
+        self.debounce = Config.BUTTON_GESTURE_DEBOUNCE_MS / 1000.0
+        self.lock = threading.Lock()
+        self.pressed = False
+        self.last_edge = float("-inf")
+        self.press_time = 0.0
+        self.release_time = float("-inf")
+        self.first_press_time: Optional[float] = None  # press of a pending short, waiting for a second press
+        self.long_fired = False
+        self.suppress_release = False
+        self.long_timer: Optional[threading.Timer] = None
+        self.short_timer: Optional[threading.Timer] = None
+
+    def _emit(self, kind: str, pressed_at: float, duration: float):
+        gesture = Gesture(kind, pressed_at, time.monotonic(), duration)
+        self.logger.debug(f"Recognized {gesture}")
+        try:
+            self.on_gesture(gesture)
+        except Exception as e:
+            self.logger.error(f"Error in gesture callback: {e}")
+
+    def _cancel(self, timer: Optional[threading.Timer]):
+        if timer is not None:
+            timer.cancel()
+
+    def edge(self, pressed: bool, timestamp: Optional[float] = None):
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        with self.lock:
+            if pressed == self.pressed or timestamp - self.last_edge < self.debounce:
+                return
+            self.last_edge = timestamp
+            self.pressed = pressed
+
+            if pressed:
+                self.press_time = timestamp
+                self.long_fired = False
+                self.suppress_release = False
+                if self.first_press_time is not None and timestamp - self.release_time <= self.double_window:
+                    self._cancel(self.short_timer)
+                    first = self.first_press_time
+                    self.first_press_time = None
+                    self.suppress_release = True
+                    threading.Thread(target=self._emit, args=(Gesture.DOUBLE, first, timestamp - first), daemon=True).start()
+                    return
+                self.long_timer = threading.Timer(max(0.0, self.long_press - (time.monotonic() - timestamp)), self._long_elapsed, args=(timestamp,))
+                self.long_timer.daemon = True
+                self.long_timer.start()
+                return
+
+            # Release
+            self._cancel(self.long_timer)
+            self.release_time = timestamp
+            duration = timestamp - self.press_time
+            if self.suppress_release or self.long_fired:
+                return
+            if duration >= self.long_press:
+                # The timer did not get to run (e.g. replayed timestamps): decide from the edges.
+                threading.Thread(target=self._emit, args=(Gesture.LONG, self.press_time, duration), daemon=True).start()
+                return
+            self.first_press_time = self.press_time
+            wait = self.double_window - (time.monotonic() - timestamp)
+            self.short_timer = threading.Timer(max(0.0, wait), self._short_elapsed, args=(self.press_time, duration))
+            self.short_timer.daemon = True
+            self.short_timer.start()
+
+    def _long_elapsed(self, press_time: float):
+        with self.lock:
+            if not self.pressed or self.press_time != press_time:
+                return
+            self.long_fired = True
+        self._emit(Gesture.LONG, press_time, time.monotonic() - press_time)
+
+    def _short_elapsed(self, press_time: float, duration: float):
+        with self.lock:
+            if self.first_press_time != press_time:
+                return
+            self.first_press_time = None
+        self._emit(Gesture.SHORT, press_time, duration)
+
+    def reset(self):
+        with self.lock:
+            self._cancel(self.long_timer)
+            self._cancel(self.short_timer)
+            self.pressed = False
+            self.first_press_time = None
+
+
+class GestureLatencies:
+    """
+    Press-to-first-audio latency per gesture kind (the last `maxlen` samples of each).
+    """
+
+    def __init__(self, maxlen: int = 200):
+        self.samples: Dict[str, Deque[float]] = {}
+        self.maxlen = maxlen
+
+    def record(self, kind: str, seconds: float):
+        self.samples.setdefault(kind, deque(maxlen=self.maxlen)).append(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        report = {}
+        for kind, values in self.samples.items():
+            if not values:
+                continue
+            array = np.asarray(values) * 1000.0
+            report[kind] = {
+                "count": float(len(array)),
+                "p50_ms": float(np.percentile(array, 50)),
+                "p95_ms": float(np.percentile(array, 95)),
+                "max_ms": float(array.max()),
+            }
+        return report
@@ -3,26 +3,52 @@ import threading
 from vision.camera import Camera
 from vision.object_detection import ObjectDetector
 from vision.openai_vision import OpenAIVision
+from vision.frame_selector import FrameSelector
+from vision.autotune import AutoTuner
 from audio.tts import TextToSpeech
 from eeg.eeg_reader import EEGReader
 from utils.signal_handler import GracefulKiller
+from utils.diagnostics import stage_tracker
+from utils.governor import ThermalGovernor
+from utils.memory import format_footprint, memory_footprint
+from utils.telemetry import telemetry
 from utils.logger import Logger
 from config.config import Config
 from gpio.button import Button
+from gpio.gestures import Gesture, GestureLatencies
+from gateway.client import GatewayClient, GatewayDetector, GatewayReassurance, GatewayVision
 from ai.emotion_analysis import EmotionAnalysis
 from ai.reassuring_messages import ReassuringMessages
-from typing import Dict
+from ai.scene_prefetch import ScenePrefetcher
+from collections import deque
+from typing import Dict, Optional
 
-def eeg_loop(eeg_reader: EEGReader, shared_state: Dict):
+def eeg_loop(eeg_reader: EEGReader, shared_state: Dict, gateway: Optional[GatewayClient] = None):
     """
     Runs in a separate thread. Continuously reads EEG data and updates shared_state.
+    In thin-client mode the EEG summary is also forwarded to the gateway.
     """
     while not shared_state['killer'].kill_now:
-        eeg_data = eeg_reader.read_data_blocking()
+        with stage_tracker.stage("eeg.read"):
+            eeg_data = eeg_reader.read_data_blocking()
         if eeg_data:
             shared_state['eeg_data'] = eeg_data
+            if gateway:
+                gateway.send_eeg(eeg_data)
         time.sleep(0.1)
 
+def cloud_frame(camera: Camera, frame_selector: FrameSelector, frame):
+    """
+    Returns the frame to upload to GPT-4o: a high-resolution still in dual-stream
+    mode, otherwise the sharpest recent frame, falling back to the current `frame`.
+    """
+    if camera.dual_stream:
+        still = camera.get_still()
+        if still is not None:
+            return still
+    selected = frame_selector.select()
+    return selected if selected is not None else frame
+
 def button_callback():
     """
     Callback triggered by a button press event.
@@ -30,6 +56,12 @@ def button_callback():
     """
     shared_state['button_pressed'] = True
 
+def gesture_callback(gesture: Gesture):
+    """
+    Callback for recognized button gestures. Queued for the main loop.
+    """
+    shared_state['gestures'].append(gesture)
+
 logger = Logger("Main")
 
 if __name__ == "__main__":
@@ -38,34 +70,77 @@ if __name__ == "__main__":
     shared_state = {
         'killer': killer,
         'eeg_data': None,
-        'button_pressed': False
+        'button_pressed': False,
+        'gestures': deque(maxlen=4)
     }
 
-    camera = Camera()
-    detector = ObjectDetector()
+    # Pick threads/resolution/frame rate for this device (cached after the first calibration)
+    if Config.AUTOTUNE in ("auto", "force"):
+        try:
+            AutoTuner().run(force=(Config.AUTOTUNE == "force"))
+        except Exception as e:
+            logger.error(f"Auto-tuning failed, keeping configured settings: {e}")
+
+    # Thin-client mode: detection and GPT-4o calls are served by the gateway
+    gateway = GatewayClient() if Config.GATEWAY_URL else None
+    if gateway:
+        logger.info(f"Thin-client mode, gateway {gateway.base_url} as device '{gateway.device_id}'.")
+    detector = GatewayDetector(gateway) if gateway else ObjectDetector()
+    # The dual-stream detection stream defaults to the model's input size
+    camera = Camera(detect_size=detector.model.input_size if detector.model is not None else None)
     tts = TextToSpeech()
     eeg_reader = EEGReader()
-    vision_ai = OpenAIVision()
-    re_msgs = ReassuringMessages()
+    vision_ai = GatewayVision(gateway) if gateway else OpenAIVision()
+    re_msgs = GatewayReassurance(gateway) if gateway else ReassuringMessages()
+    frame_selector = FrameSelector(frame_source=camera.get_frame)
+    prefetcher = ScenePrefetcher(vision_ai, re_msgs)
+    governor = ThermalGovernor() if Config.GOVERNOR_ENABLED else None
+    policy = governor.current if governor else None
 
     # Start EEG reading thread
-    eeg_thread = threading.Thread(target=eeg_loop, args=(eeg_reader, shared_state), daemon=True)
+    eeg_thread = threading.Thread(target=eeg_loop, args=(eeg_reader, shared_state, gateway), daemon=True)
     eeg_thread.start()
 
     # Setup button
     button = Button()
-    button.set_callback(button_callback)
+    if Config.BUTTON_GESTURES:
+        button.set_gesture_callback(gesture_callback)
+    else:
+        button.set_callback(button_callback)
+    gesture_latencies = GestureLatencies()
 
     last_speak_time = time.time()
+    last_warning_time = 0.0
+    last_memory_report = time.monotonic()
 
     # Main loop
     try:
         while not killer.kill_now:
-            frame = camera.get_frame()
+            with stage_tracker.stage("camera.get_frame"):
+                frame = camera.get_frame()
             if frame is None:
                 # If frame is not available, just wait and try again
                 time.sleep(0.1)
                 continue
+            frame_selector.add_frame(frame)
+
+            # Scale work down when the CPU is hot or throttled
+            if governor:
+                decision = governor.update()
+                if decision:
+                    policy = decision
+                    camera.fps = camera.configure(camera.cap, camera.width, camera.height, policy.camera_fps)[2]
+                    detector.set_num_threads(policy.inference_threads)
+                    prefetcher.enabled = Config.PREFETCH_ENABLED and policy.prefetch_enabled
+
+            # Always-on proximity screening (stage one of the detector cascade)
+            if Config.CASCADE_ENABLED:
+                with stage_tracker.stage("vision.proximity"):
+                    proximity = detector.check_proximity(frame)
+                if proximity.warning and time.time() - last_warning_time > Config.PROXIMITY_WARNING_COOLDOWN:
+                    with stage_tracker.stage("tts.speak"):
+                        tts.speak("Warning: Something is very close!", kind="warning")
+                    last_warning_time = time.time()
 
             eeg_data = shared_state.get('eeg_data', {})
             attention = eeg_data.get('attention', 50.0)
@@ -76,6 +151,8 @@ if __name__ == "__main__":
                 attention_based_interval = Config.NARRATION_INTERVAL * 2
             else:
                 attention_based_interval = Config.NARRATION_INTERVAL
+            if policy:
+                attention_based_interval *= policy.narration_multiplier
 
             # Check if user is distressed
             distressed = EmotionAnalysis.is_user_distressed(
@@ -84,15 +161,45 @@ if __name__ == "__main__":
                 Config.DISTRESS_MEDITATION_THRESHOLD
             )
 
-            if distressed:
-                # Provide a personalized reassuring message that references the current scene
-                reassure_msg = re_msgs.generate_message(frame)
-                tts.speak(reassure_msg)
+            # Speculatively prefetch GPT-4o answers when the scene changes (no-op unless PREFETCH_ENABLED)
+            prefetcher.observe(
+                frame_selector.select(wait=0.0),
+                want_reassurance=(attention < Config.ATTENTION_THRESHOLD or meditation < Config.MEDITATION_THRESHOLD)
+            )
+
+            # Button gestures: short press = instant local summary, long press = GPT-4o
+            # description, double press = repeat the last utterance. Handled before the
+            # distress reassurance so a press is not held up by its GPT-4o call.
+            gesture = shared_state['gestures'].popleft() if shared_state['gestures'] else None
+            gesture_audio_start = None  # first audio of this gesture's own answer
+            local_answer = gesture is not None and gesture.kind == Gesture.SHORT
+            if gesture is not None and gesture.kind == Gesture.DOUBLE:
+                with stage_tracker.stage("tts.speak"):
+                    tts.repeat_last()
+                gesture_audio_start = tts.last_audio_start
+            elif gesture is not None and gesture.kind == Gesture.LONG:
+                shared_state['button_pressed'] = True
 
             # If the button was pressed, perform a scene analysis via GPT-4o
+            # (when the governor has shed cloud features, fall back to the local detector)
+            if shared_state['button_pressed'] and policy and not policy.cloud_enabled:
+                shared_state['button_pressed'] = False
+                local_answer = True
+            if local_answer:
+                with stage_tracker.stage("vision.detect"):
+                    local_objects = detector.detect_objects(frame)
+                labels = ", ".join(obj[0] for obj in local_objects)
+                summary = f"I see: {labels}." if labels else "I don't see anything particular right now."
+                if detector.is_object_too_close(frame, local_objects):
+                    summary += " Warning: An object is very close!"
+                with stage_tracker.stage("tts.speak"):
+                    tts.speak(summary, kind="answer")
+                gesture_audio_start = tts.last_audio_start
+
             if shared_state['button_pressed']:
                 shared_state['button_pressed'] = False
-                vision_result = vision_ai.analyze_frame(frame)
+                with stage_tracker.stage("vision.analyze_frame"):
+                    vision_result = prefetcher.take_vision(frame) or vision_ai.analyze_frame(cloud_frame(camera, frame_selector, frame))
                 if vision_result:
                     summary = vision_result.summary
                     if vision_result.contains_people:
@@ -107,20 +214,43 @@ if __name__ == "__main__":
                         summary += " Try to remain calm."
 
                     # Check proximity of objects
-                    local_objects = detector.detect_objects(frame)
+                    with stage_tracker.stage("vision.detect"):
+                        local_objects = detector.detect_objects(frame)
                     if detector.is_object_too_close(frame, local_objects):
                         summary += " Warning: An object is very close!"
 
-                    tts.speak(summary)
+                    with stage_tracker.stage("tts.speak"):
+                        tts.speak(summary, kind="answer")
                 else:
-                    tts.speak("I couldn't analyze the surroundings at this moment. Please try again.")
+                    with stage_tracker.stage("tts.speak"):
+                        tts.speak("I couldn't analyze the surroundings at this moment. Please try again.", kind="answer")
+                gesture_audio_start = tts.last_audio_start
+
+            if gesture is not None and gesture_audio_start is not None and gesture_audio_start >= gesture.pressed_at:
+                latency = gesture_audio_start - gesture.pressed_at
+                gesture_latencies.record(gesture.kind, latency)
+                telemetry.record("latency", stage=f"button.{gesture.kind}", seconds=latency)
+                logger.debug(f"{gesture.kind} press answered, first audio after {latency * 1000:.0f} ms")
+
+            if distressed:
+                # Provide a personalized reassuring message that references the current scene
+                # (a canned one when the governor has shed cloud features)
+                with stage_tracker.stage("ai.reassure"):
+                    if policy and not policy.cloud_enabled:
+                        reassure_msg = ReassuringMessages.FALLBACK_MESSAGE_NO_IMAGE
+                    else:
+                        reassure_msg = prefetcher.take_reassurance(frame) or re_msgs.generate_message(cloud_frame(camera, frame_selector, frame))
+                with stage_tracker.stage("tts.speak"):
+                    tts.speak(reassure_msg, kind="reassurance")
 
             # Periodic narration if not distressed
             if (time.time() - last_speak_time > attention_based_interval) and not distressed:
-                local_objects = detector.detect_objects(frame)
+                with stage_tracker.stage("vision.detect"):
+                    local_objects = detector.detect_objects(frame)
                 if local_objects:
                     # Construct a narrative from detected objects
                     object_labels = [obj[0] for obj in local_objects]
+                    prefetcher.observe(frame, labels=object_labels)
                     if len(object_labels) > 0:
                         narrative = "I see: " + ", ".join(object_labels)
                     else:
@@ -136,15 +266,21 @@ if __name__ == "__main__":
                     if meditation < Config.MEDITATION_THRESHOLD:
                         narrative += " Try to stay calm."
 
-                    tts.speak(narrative)
+                    with stage_tracker.stage("tts.speak"):
+                        tts.speak(narrative, kind="narration")
                 else:
                     # No objects detected
-                    tts.speak("I don't see anything particular right now.")
+                    with stage_tracker.stage("tts.speak"):
+                        tts.speak("I don't see anything particular right now.", kind="narration")
 
                 last_speak_time = time.time()
 
+            if Config.MEMORY_REPORT_INTERVAL > 0 and time.monotonic() - last_memory_report >= Config.MEMORY_REPORT_INTERVAL:
+                logger.info(f"Memory: {format_footprint(memory_footprint())}")
+                last_memory_report = time.monotonic()
+
             # Sleep a bit before next iteration
-            time.sleep(0.1)
+            time.sleep(policy.loop_interval if policy else Config.LOOP_INTERVAL)
 
     except KeyboardInterrupt:
         logger.info("KeyboardInterrupt received, shutting down.")
@@ -154,4 +290,16 @@ if __name__ == "__main__":
         # Cleanup resources
         button.cleanup()
         camera.release()
+        if Config.PREFETCH_ENABLED:
+            logger.info(f"Prefetch stats: {prefetcher.stats()}")
+        if governor:
+            logger.info(f"Governor metrics: {governor.metrics()}")
+        logger.info(f"Memory: {format_footprint(memory_footprint())}")
+        if gesture_latencies.samples:
+            logger.info(f"Press-to-first-audio latency: {gesture_latencies.summary()}")
+        if gateway:
+            gateway.close()
+        if Config.TELEMETRY_ENABLED:
+            telemetry.close()
+            logger.info(f"Telemetry: {telemetry.stats()}")
         logger.info("System shutting down gracefully.")
@@ -0,0 +1,254 @@
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..config.config import Config
+from ..utils.logger import Logger
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+# Per-process detector, created once by the pool initializer.
+_detector = None
+_batch_size = 1
+_mode = "full"
+
+
+def plan_chunks(paths: List[str], chunk_frames: int, stride: int) -> List[Tuple[int, str, int, int, Optional[List[str]]]]:
+    """
+    Splits the inputs into work units of about `chunk_frames` analyzed frames:
+    (source index, path, first frame, frame count, image files or None for video).
+    """
+    chunks = []
+    for source, path in enumerate(paths):
+        if os.path.isdir(path):
+            files = sorted(f for f in glob.glob(os.path.join(path, "*")) if f.lower().endswith(IMAGE_EXTENSIONS))[::stride]
+            for start in range(0, len(files), chunk_frames):
+                chunks.append((source, path, start, len(files[start:start + chunk_frames]), files[start:start + chunk_frames]))
+            continue
+        cap = cv2.VideoCapture(path)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        if total <= 0:
+            # Unknown length (some containers): one unit for the whole file.
+            chunks.append((source, path, 0, -1, None))
+            continue
+        span = chunk_frames * stride
+        for start in range(0, total, span):
+            chunks.append((source, path, start, min(span, total - start), None))
+    return chunks
+
+
+def _init_worker(min_confidence: float, batch_size: int, mode: str):
+    global _detector, _batch_size, _mode
+    # One single-threaded interpreter per process; the pool provides the parallelism.
+    cv2.setNumThreads(1)
+    Config.INFERENCE_THREADS = 1
+    Config.CASCADE_ENABLED = False
+    Config.TELEMETRY_ENABLED = False
+    from ..vision.object_detection import ObjectDetector
+    _detector = ObjectDetector()
+    _detector.model.min_confidence = min_confidence
+    _detector.latency_target = 0.0  # offline: always run every region
+    _batch_size = batch_size
+    _mode = mode
+
+
+def _frames(path: str, start: int, count: int, files: Optional[List[str]], stride: int):
+    """
+    Yields (frame number, timestamp in seconds, frame) for one work unit, decoding lazily.
+    """
+    if files is not None:
+        for i, file in enumerate(files):
+            frame = cv2.imread(file)
+            if frame is not None:
+                yield (start + i) * stride, float("nan"), frame
+        return
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    index = start
+    try:
+        while count < 0 or index < start + count:
+            if (index - start) % stride:
+                if not cap.grab():  # skip without decoding
+                    break
+            else:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield index, index / fps if fps > 0 else float("nan"), frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def analyze_chunk(source: int, path: str, start: int, count: int, files: Optional[List[str]], stride: int) -> Dict[str, np.ndarray]:
+    """
+    Runs detection and the proximity check on one work unit inside a worker.
+    Returns compact per-frame and per-detection arrays.
+    """
+    frame_numbers, timestamps, too_close = [], [], []
+    det_frame, det_label, det_score, det_box = [], [], [], []
+    started = time.perf_counter()
+    failures_before = _detector.model.inference_failures
+
+    def flush(batch):
+        results = _detector.detect_batch([frame for _, _, frame in batch], _mode)
+        for (number, timestamp, frame), objects in zip(batch, results):
+            row = len(frame_numbers)
+            frame_numbers.append(number)
+            timestamps.append(timestamp)
+            # The live proximity check only sees detections above MIN_CONFIDENCE.
+            live_objects = [obj for obj in objects if obj[1] > Config.MIN_CONFIDENCE]
+            too_close.append(_detector.is_object_too_close(frame, live_objects))
+            for label, score, box in objects:
+                det_frame.append(row)
+                det_label.append(label)
+                det_score.append(score)
+                det_box.append(box)
+
+    batch = []
+    for item in _frames(path, start, count, files, stride):
+        batch.append(item)
+        if len(batch) >= _batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    return {
+        "source": np.full(len(frame_numbers), source, dtype=np.int32),
+        "frame": np.asarray(frame_numbers, dtype=np.int64),
+        "timestamp": np.asarray(timestamps, dtype=np.float64),
+        "too_close": np.asarray(too_close, dtype=bool),
+        "det_frame": np.asarray(det_frame, dtype=np.int64),
+        "det_label": np.asarray(det_label, dtype=str),
+        "det_score": np.asarray(det_score, dtype=np.float32),
+        "det_box": np.asarray(det_box, dtype=np.float32).reshape(-1, 4),
+        "seconds": np.float64(time.perf_counter() - started),
+        "failed": np.int64(_detector.model.inference_failures - failures_before),
+    }
+
+
+def merge(parts: List[Dict[str, np.ndarray]], sources: List[str], min_confidence: float) -> Dict[str, np.ndarray]:
+    """
+    Concatenates worker results in (source, frame) order with a shared label table.
+    """
+    parts = sorted((p for p in parts if len(p["frame"])), key=lambda p: (int(p["source"][0]), int(p["frame"][0])))
+    offsets = np.cumsum([0] + [len(p["frame"]) for p in parts])[:-1]
+    labels = np.concatenate([p["det_label"] for p in parts]) if parts else np.empty(0, dtype=str)
+    label_names, label_ids = np.unique(labels, return_inverse=True)
+
+    def cat(key, dtype, shape=()):
+        return np.concatenate([p[key] for p in parts]) if parts else np.empty((0,) + shape, dtype=dtype)
+
+    return {
+        "sources": np.asarray(sources, dtype=str),
+        "labels": label_names,
+        "min_confidence": np.float32(min_confidence),
+        "object_close_threshold": np.float32(Config.OBJECT_CLOSE_THRESHOLD),
+        "frame_source": cat("source", np.int32).astype(np.uint16),
+        "frame_number": cat("frame", np.int64).astype(np.int32),
+        "frame_timestamp": cat("timestamp", np.float64).astype(np.float32),
+        "frame_too_close": cat("too_close", bool),
+        "det_frame": np.concatenate([p["det_frame"] + off for p, off in zip(parts, offsets)]).astype(np.int32) if parts else np.empty(0, np.int32),
+        "det_label": label_ids.astype(np.uint16),
+        "det_score": cat("det_score", np.float32),
+        "det_box": cat("det_box", np.float32, (4,)),
+    }
+
+
+def sweep(results: Dict[str, np.ndarray], confidences: List[float], thresholds: List[float]) -> np.ndarray:
+    """
+    Fraction of frames that would raise a proximity warning for every
+    (MIN_CONFIDENCE, OBJECT_CLOSE_THRESHOLD) pair; rows follow `confidences`.
+    """
+    frames = len(results["frame_number"])
+    box = results["det_box"]
+    areas = (box[:, 2] - box[:, 0]) * (box[:, 3] - box[:, 1])
+    rates = np.zeros((len(confidences), len(thresholds)))
+    for i, confidence in enumerate(confidences):
+        keep = results["det_score"] > confidence
+        for j, threshold in enumerate(thresholds):
+            warned = np.unique(results["det_frame"][keep & (areas > threshold)])
+            rates[i, j] = len(warned) / float(frames) if frames else 0.0
+    return rates
+
+
+def parse_floats(spec: str) -> List[float]:
+    return [float(v) for v in spec.split(",") if v.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run object detection and the proximity check over recorded video files "
+                                                 "or image folders with a process pool, for tuning MIN_CONFIDENCE and OBJECT_CLOSE_THRESHOLD.")
+    parser.add_argument("inputs", nargs="+", help="Video files and/or folders of images.")
+    parser.add_argument("--output", default="batch_results.npz", help="Compressed .npz file for per-frame results.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-frames", type=int, default=256, help="Analyzed frames per work unit.")
+    parser.add_argument("--batch-size", type=int, default=8, help="Frames per batched invoke (falls back to 1 if the model can't batch).")
+    parser.add_argument("--stride", type=int, default=1, help="Analyze every n-th frame.")
+    parser.add_argument("--mode", default=Config.INFERENCE_MODE, choices=["full", "corridor", "tiled"])
+    parser.add_argument("--min-confidence", type=float, default=min(0.1, Config.MIN_CONFIDENCE),
+                        help="Score floor for recorded detections; keep it low so thresholds can be swept afterwards.")
+    parser.add_argument("--sweep-confidence", default="0.3,0.4,0.5,0.6,0.7")
+    parser.add_argument("--sweep-close", default="0.3,0.4,0.5,0.6")
+    args = parser.parse_args()
+
+    logger = Logger("BatchAnalyze")
+    stride = max(1, args.stride)
+    chunks = plan_chunks(args.inputs, max(1, args.chunk_frames), stride)
+    logger.info(f"{len(chunks)} work units from {len(args.inputs)} input(s), {args.workers} worker(s).")
+
+    parts = []
+    worker_seconds = 0.0
+    failed_frames = 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(args.min_confidence, max(1, args.batch_size), args.mode)) as pool:
+        futures = [pool.submit(analyze_chunk, source, path, start, count, files, stride)
+                   for source, path, start, count, files in chunks]
+        done_frames = 0
+        for future in as_completed(futures):
+            try:
+                part = future.result()
+            except Exception as e:
+                logger.error(f"Work unit failed: {e}")
+                continue
+            parts.append(part)
+            worker_seconds += float(part["seconds"])
+            failed_frames += int(part["failed"])
+            done_frames += len(part["frame"])
+            elapsed = time.perf_counter() - started
+            logger.debug(f"{len(parts)}/{len(chunks)} units, {done_frames} frames, {done_frames / elapsed:.1f} fps")
+    elapsed = time.perf_counter() - started
+
+    results = merge(parts, args.inputs, args.min_confidence)
+    np.savez_compressed(args.output, **results)
+    frames = len(results["frame_number"])
+    per_worker = frames / worker_seconds if worker_seconds > 0 else 0.0
+    logger.info(
+        f"Analyzed {frames} frames ({len(results['det_score'])} detections) in {elapsed:.1f}s: {frames / elapsed:.1f} fps overall, "
+        f"{per_worker:.1f} fps per worker, parallel efficiency {(frames / elapsed) / (per_worker * args.workers) if per_worker else 0.0:.0%}. "
+        f"Results written to {args.output}"
+    )
+    # Failed invokes look like empty frames in the results, which would make every threshold look safe.
+    if failed_frames:
+        logger.error(f"Inference failed on {failed_frames} frame(s), they are recorded without detections.")
+    if frames and not len(results["det_score"]):
+        logger.warn(f"No detections above {args.min_confidence} in {frames} frames; check the model, labels and "
+                    f"--min-confidence before trusting the sweep.")
+
+    confidences, thresholds = parse_floats(args.sweep_confidence), parse_floats(args.sweep_close)
+    rates = sweep(results, confidences, thresholds)
+    print("Proximity warning rate (rows MIN_CONFIDENCE, columns OBJECT_CLOSE_THRESHOLD)")
+    print("        " + "".join(f"{t:>8.2f}" for t in thresholds))
+    for confidence, row in zip(confidences, rates):
+        print(f"{confidence:>8.2f}" + "".join(f"{r:>8.1%}" for r in row))
@@ -0,0 +1,43 @@
+import argparse
+import json
+
+import cv2
+
+from ..utils.logger import Logger
+from ..vision.object_detection import ObjectDetector
+
+
+def read_frames(video_path: str, max_frames: int, stride: int):
+    """
+    Decodes up to `max_frames` frames from a recorded video, keeping every `stride`-th frame.
+    """
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    index = 0
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if index % stride == 0:
+            frames.append(frame)
+        index += 1
+    cap.release()
+    return frames
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the two-stage detector cascade against full-model inference on replayed footage.")
+    parser.add_argument("video", help="Recorded head-camera video.")
+    parser.add_argument("--max-frames", type=int, default=600)
+    parser.add_argument("--stride", type=int, default=3, help="Keep every n-th frame (the live loop runs at roughly 10 fps).")
+    parser.add_argument("--fps", type=float, default=10.0, help="Replay rate used for the escalation cooldown.")
+    parser.add_argument("--output", default="", help="Optional JSON file for the report.")
+    args = parser.parse_args()
+
+    logger = Logger("BenchmarkCascade")
+    frames = read_frames(args.video, args.max_frames, args.stride)
+    logger.info(f"Replaying {len(frames)} frames from {args.video}.")
+    report = ObjectDetector().benchmark_cascade(frames, fps=args.fps)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,45 @@
+import argparse
+import glob
+import json
+import os
+
+import cv2
+
+from ..utils.logger import Logger
+from ..vision.object_detection import ObjectDetector
+
+
+def load_samples(image_dir: str, annotations_path: str):
+    """
+    Loads images from a folder, with optional ground truth from a JSON file of the form
+    {"image.jpg": [["person", [ymin, xmin, ymax, xmax]], ...], ...} (normalized boxes).
+    """
+    annotations = {}
+    if annotations_path:
+        with open(annotations_path) as f:
+            annotations = json.load(f)
+    samples = []
+    for path in sorted(glob.glob(os.path.join(image_dir, "*"))):
+        frame = cv2.imread(path)
+        if frame is None:
+            continue
+        truth = annotations.get(os.path.basename(path)) if annotations else None
+        samples.append((frame, [(label, box) for label, box in truth] if truth is not None else None))
+    return samples
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare full-frame, corridor and tiled inference latency and accuracy.")
+    parser.add_argument("image_dir", help="Folder of test images (e.g. frames exported from head-camera footage).")
+    parser.add_argument("--annotations", default="", help="Optional JSON ground truth keyed by image file name.")
+    parser.add_argument("--modes", default="full,corridor,tiled")
+    parser.add_argument("--output", default="", help="Optional JSON file for the report.")
+    args = parser.parse_args()
+
+    logger = Logger("BenchmarkDetection")
+    samples = load_samples(args.image_dir, args.annotations)
+    logger.info(f"Loaded {len(samples)} images from {args.image_dir}.")
+    report = ObjectDetector().benchmark_modes(samples, [m.strip() for m in args.modes.split(",") if m.strip()])
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import threading
+import time
+from typing import Dict, List
+
+# The app's Config refuses to load without a key; the stub server does not check it.
+os.environ.setdefault("OPENAI_API_KEY", "sk-local-stub")
+
+import openai
+import requests
+
+from ..config.config import Config
+from ..gateway.client import GatewayClient
+from ..gateway.server import GatewayServer
+from ..utils.logger import Logger
+from .load_test import _percentiles, _synthetic_frame
+from .openai_stub import OpenAIStubServer, add_stub_arguments, settings_from_args
+
+
+logger = Logger("GatewayLoadTest")
+
+
+class SimulatedDevice:
+    """
+    One pair of glasses in thin-client mode: streams detection frames at `fps`
+    (waiting for each answer, like the main loop) and asks for a scene
+    description every `describe_interval` seconds from a second thread.
+    """
+
+    def __init__(self, base_url: str, device_id: str, frame, fps: float, describe_interval: float):
+        self.frame = frame
+        self.fps = fps
+        self.describe_interval = describe_interval
+        self.detect_client = GatewayClient(base_url, device_id)
+        self.cloud_client = GatewayClient(base_url, device_id)
+        self.latencies: Dict[str, List[float]] = {"detect": [], "describe": []}
+        self.statuses: Dict[str, Dict[int, int]] = {"detect": {}, "describe": {}}
+
+    def _record(self, kind: str, client: GatewayClient, started: float, ok: bool):
+        statuses = self.statuses[kind]
+        statuses[client.last_status] = statuses.get(client.last_status, 0) + 1
+        if ok:
+            self.latencies[kind].append(time.perf_counter() - started)
+
+    def _detect_loop(self, until: float):
+        period = 1.0 / self.fps
+        next_frame = time.monotonic()
+        while time.monotonic() < until:
+            started = time.perf_counter()
+            self._record("detect", self.detect_client, started, self.detect_client.detect(self.frame) is not None)
+            next_frame += period
+            time.sleep(max(0.0, next_frame - time.monotonic()))
+
+    def _describe_loop(self, until: float):
+        next_call = time.monotonic()
+        while time.monotonic() < until:
+            time.sleep(max(0.0, min(next_call, until) - time.monotonic()))
+            if time.monotonic() >= until:
+                break
+            # Ignore the client's local back-off so the gateway's 429s are counted.
+            self.cloud_client.rate_limited_until = 0.0
+            started = time.perf_counter()
+            self._record("describe", self.cloud_client, started, self.cloud_client.describe(self.frame) is not None)
+            next_call += self.describe_interval
+
+    def run(self, duration: float) -> List[threading.Thread]:
+        until = time.monotonic() + duration
+        threads = [threading.Thread(target=self._detect_loop, args=(until,), daemon=True)]
+        if self.describe_interval > 0:
+            threads.append(threading.Thread(target=self._describe_loop, args=(until,), daemon=True))
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def close(self):
+        self.detect_client.close()
+        self.cloud_client.close()
+
+
+def _gateway_stats(base_url: str) -> Dict:
+    return requests.get(f"{base_url}/v1/stats", timeout=5).json()
+
+
+def run_level(base_url: str, devices: int, duration: float, frame, fps: float, describe_interval: float) -> Dict:
+    """
+    Runs `devices` simulated devices against the gateway for `duration` seconds.
+    """
+    before = _gateway_stats(base_url)
+    fleet = [SimulatedDevice(base_url, f"sim-{devices}-{i}", frame, fps, describe_interval) for i in range(devices)]
+    start = time.perf_counter()
+    threads = [thread for device in fleet for thread in device.run(duration)]
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    after = _gateway_stats(base_url)
+    for device in fleet:
+        device.close()
+
+    row = {"devices": devices, "seconds": elapsed}
+    for kind in ("detect", "describe"):
+        latencies = [value for device in fleet for value in device.latencies[kind]]
+        statuses: Dict[str, int] = {}
+        for device in fleet:
+            for status, count in device.statuses[kind].items():
+                statuses[str(status)] = statuses.get(str(status), 0) + count
+        # Per-device percentiles: the worst-served device shows whether scheduling is fair.
+        per_device_p95 = [_percentiles(device.latencies[kind])["p95"] for device in fleet if device.latencies[kind]]
+        row[kind] = {
+            "requests": sum(statuses.values()),
+            "ok": len(latencies),
+            "statuses": statuses,
+            "throughput_per_s": len(latencies) / elapsed if elapsed > 0 else 0.0,
+            "latency_s": _percentiles(latencies),
+            "worst_device_p95_s": max(per_device_p95) if per_device_p95 else 0.0,
+        }
+    batches = after["detector"]["batches"] - before["detector"]["batches"]
+    frames = after["detector"]["frames"] - before["detector"]["frames"]
+    row["mean_batch"] = frames / batches if batches else 0.0
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate a fleet of thin-client devices against the gateway and report "
+                                                 "throughput and tail latency as the number of devices grows.")
+    parser.add_argument("--gateway-url", default="", help="Use an already running gateway instead of starting one (and the OpenAI stub) in-process.")
+    parser.add_argument("--devices", default="1,2,4,8,16", help="Comma-separated fleet sizes.")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per fleet size.")
+    parser.add_argument("--fps", type=float, default=5.0, help="Detection frames per second per device.")
+    parser.add_argument("--describe-interval", type=float, default=6.0, help="Seconds between scene descriptions per device, 0 disables.")
+    parser.add_argument("--frame-size", default=f"{Config.CAMERA_WIDTH}x{Config.CAMERA_HEIGHT}")
+    parser.add_argument("--output", default="", help="Optional JSON file for the report.")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    stub = gateway = None
+    base_url = args.gateway_url.rstrip("/")
+    if not base_url:
+        stub = OpenAIStubServer(settings=settings_from_args(args)).start()
+        Config.OPENAI_API_BASE = stub.base_url
+        openai.api_base = stub.base_url
+        gateway = GatewayServer().start()
+        base_url = gateway.base_url
+
+    width, height = (int(v) for v in args.frame_size.lower().split("x"))
+    frame = _synthetic_frame(width, height)
+    report = []
+    try:
+        for devices in [int(d) for d in args.devices.split(",") if d.strip()]:
+            row = run_level(base_url, devices, args.duration, frame, args.fps, args.describe_interval)
+            report.append(row)
+            detect, describe = row["detect"], row["describe"]
+            logger.info(
+                f"devices={devices:<3d} detect {detect['throughput_per_s']:.1f}/s "
+                f"p50 {detect['latency_s']['p50'] * 1000:.0f}ms p95 {detect['latency_s']['p95'] * 1000:.0f}ms "
+                f"p99 {detect['latency_s']['p99'] * 1000:.0f}ms batch {row['mean_batch']:.1f} | "
+                f"describe ok {describe['ok']}/{describe['requests']} "
+                f"p50 {describe['latency_s']['p50']:.2f}s p95 {describe['latency_s']['p95']:.2f}s p99 {describe['latency_s']['p99']:.2f}s "
+                f"429s {describe['statuses'].get('429', 0)}"
+            )
+    finally:
+        if gateway is not None:
+            gateway.stop()
+        if stub is not None:
+            stub.stop()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+# The app's Config refuses to load without a key; the stub server does not check it.
+os.environ.setdefault("OPENAI_API_KEY", "sk-local-stub")
+
+import numpy as np
+import openai
+
+from ..ai.reassuring_messages import ReassuringMessages
+from ..config.config import Config
+from ..utils.logger import Logger
+from ..vision.openai_vision import OpenAIVision
+from .openai_stub import OpenAIStubServer, add_stub_arguments, settings_from_args
+
+
+logger = Logger("LoadTest")
+
+
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    if not latencies:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    values = np.asarray(latencies)
+    return {
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "p99": float(np.percentile(values, 99)),
+        "max": float(values.max()),
+    }
+
+
+def _server_stats(base_url: str) -> Dict[str, int]:
+    with urllib.request.urlopen(f"{base_url}/stats", timeout=5) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def _synthetic_frame(width: int, height: int) -> np.ndarray:
+    # A gradient with noise compresses like a real scene rather than a flat color.
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    noise = np.random.default_rng(0).normal(0, 12, (height, width, 3))
+    return np.clip(gradient + noise, 0, 255).astype(np.uint8)
+
+
+def build_paths(frame: np.ndarray, retry_delay: float) -> Dict[str, Callable[[], bool]]:
+    """
+    Returns the app's GPT request paths as callables that report success.
+    """
+    vision_ai = OpenAIVision()
+    re_msgs = ReassuringMessages()
+    vision_ai.retry_delay = retry_delay
+    re_msgs.retry_delay = retry_delay
+    fallbacks = (ReassuringMessages.FALLBACK_MESSAGE, ReassuringMessages.FALLBACK_MESSAGE_NO_IMAGE)
+
+    def vision() -> bool:
+        return vision_ai.analyze_frame(frame) is not None
+
+    def reassure() -> bool:
+        return re_msgs.generate_message(frame) not in fallbacks
+
+    def stream() -> bool:
+        # Time to the last streamed token; the app does not stream yet, so this
+        # exercises the raw client against the stub's slow-drip responses.
+        try:
+            chunks = openai.ChatCompletion.create(
+                model=Config.OPENAI_MODEL,
+                messages=[{"role": "user", "content": "Describe the scene briefly."}],
+                max_tokens=100,
+                stream=True
+            )
+            for _ in chunks:
+                pass
+            return True
+        except Exception as ex:
+            logger.warn(f"Streaming request failed: {ex}")
+            return False
+
+    return {"vision": vision, "reassure": reassure, "stream": stream}
+
+
+def run_level(call: Callable[[], bool], concurrency: int, total: int) -> Tuple[List[float], int, float]:
+    """
+    Runs `total` calls with `concurrency` workers.
+    Returns per-call latencies, number of successes and wall-clock duration.
+    """
+    def timed() -> Tuple[float, bool]:
+        start = time.perf_counter()
+        ok = call()
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: timed(), range(total)))
+    elapsed = time.perf_counter() - start
+    latencies = [latency for latency, _ in results]
+    successes = sum(1 for _, ok in results if ok)
+    return latencies, successes, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the app's GPT request paths against the local OpenAI stub.")
+    parser.add_argument("--base-url", default="", help="Use an already running stub instead of starting one in-process.")
+    parser.add_argument("--paths", default="vision,reassure", help="Comma-separated paths: vision, reassure, stream.")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated concurrency levels.")
+    parser.add_argument("--requests", type=int, default=40, help="Calls per path and concurrency level.")
+    parser.add_argument("--retry-delay", type=float, default=None, help="Override the clients' retry delay in seconds.")
+    parser.add_argument("--output", default="", help="Optional JSON file for the report.")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url.rstrip("/")
+    if not base_url:
+        server = OpenAIStubServer(settings=settings_from_args(args)).start()
+        base_url = server.base_url
+    Config.OPENAI_API_BASE = base_url
+    openai.api_base = base_url
+
+    frame = _synthetic_frame(Config.CAMERA_WIDTH, Config.CAMERA_HEIGHT)
+    retry_delay = args.retry_delay if args.retry_delay is not None else OpenAIVision().retry_delay
+    paths = build_paths(frame, retry_delay)
+    report = []
+
+    try:
+        for path in [p.strip() for p in args.paths.split(",") if p.strip()]:
+            for concurrency in [int(c) for c in args.concurrency.split(",") if c.strip()]:
+                before = _server_stats(base_url)
+                latencies, successes, elapsed = run_level(paths[path], concurrency, args.requests)
+                after = _server_stats(base_url)
+                server_requests = after["requests"] - before["requests"]
+
+                row = {
+                    "path": path,
+                    "concurrency": concurrency,
+                    "calls": args.requests,
+                    "successes": successes,
+                    "server_requests": server_requests,
+                    "retry_amplification": server_requests / float(args.requests),
+                    "rate_limited": after["rate_limited"] - before["rate_limited"],
+                    "server_errors": after["errors"] - before["errors"],
+                    "throughput_per_s": args.requests / elapsed if elapsed > 0 else 0.0,
+                    "latency_s": _percentiles(latencies),
+                }
+                report.append(row)
+                logger.info(
+                    f"{path:8s} c={concurrency:<3d} ok {successes}/{args.requests} "
+                    f"amp {row['retry_amplification']:.2f}x "
+                    f"tput {row['throughput_per_s']:.2f}/s "
+                    f"p50 {row['latency_s']['p50']:.2f}s p95 {row['latency_s']['p95']:.2f}s p99 {row['latency_s']['p99']:.2f}s"
+                )
+    finally:
+        if server is not None:
+            server.stop()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import json
+import sys
+
+from ..config.config import Config
+from ..utils.logger import Logger
+from ..utils.memory import buffer_pool, format_footprint, memory_footprint, steady_state_allocations
+from ..vision.camera import Camera
+from ..vision.frame_selector import FrameSelector
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that the per-frame hot path (camera read, frame scoring, detection) "
+                                                 "allocates close to nothing in memory budget mode.")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--skip-detector", action="store_true", help="Only exercise the camera and frame selector (no TFLite model needed).")
+    parser.add_argument("--max-bytes-per-frame", type=float, default=1024.0,
+                        help="Fail if more than this many bytes per frame are retained in steady state.")
+    parser.add_argument("--max-peak-bytes", type=float, default=0.0,
+                        help="Also fail if one frame's transient allocations exceed this (0 disables; "
+                             "the fake camera renders every frame, so use it with real hardware).")
+    parser.add_argument("--output", default="", help="Optional JSON file for the report.")
+    args = parser.parse_args()
+
+    logger = Logger("MemoryCheck")
+    Config.MEMORY_BUDGET_MODE = True
+    buffer_pool.enabled = True
+
+    detector = None
+    if not args.skip_detector:
+        from ..vision.object_detection import ObjectDetector
+        detector = ObjectDetector()
+    camera = Camera(detect_size=detector.model.input_size if detector is not None else None)
+    selector = FrameSelector()
+
+    def step():
+        frame = camera.get_frame()
+        selector.add_frame(frame)
+        if detector is not None:
+            detector.detect_objects(frame)
+
+    try:
+        allocations = steady_state_allocations(step, iterations=args.frames, warmup=args.warmup)
+    finally:
+        camera.release()
+
+    footprint = memory_footprint()
+    logger.info(f"Retained {allocations['retained_bytes_per_frame']:.0f} B/frame, "
+                f"peak transient {allocations['peak_bytes_per_frame']:.0f} B over {args.frames} frames.")
+    logger.info(f"Memory: {format_footprint(footprint)}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"allocations": allocations, "footprint": footprint}, f, indent=2)
+
+    # Detection results themselves (a few small tuples) are allowed; frame-sized arrays are not.
+    if allocations["retained_bytes_per_frame"] > args.max_bytes_per_frame:
+        logger.error("Steady-state allocations per frame exceed the limit.")
+        sys.exit(1)
+    if args.max_peak_bytes > 0 and allocations["peak_bytes_per_frame"] > args.max_peak_bytes:
+        logger.error("Transient allocations per frame exceed the limit.")
+        sys.exit(1)
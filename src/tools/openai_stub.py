@@ -0,0 +1,310 @@
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+from ..utils.logger import Logger
+
+
+class LatencyDistribution:
+    """
+    Samples response latencies in seconds from a simple spec string:
+    - "fixed:0.8"
+    - "uniform:0.5,2.0"
+    - "normal:1.2,0.3"        (mean, stddev, clipped at 0)
+    - "lognormal:0.0,0.5"     (mu, sigma of the underlying normal)
+    """
+
+    def __init__(self, spec: str = "fixed:0.0", seed: Optional[int] = None):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.params = [float(p) for p in params.split(",") if p.strip()]
+        self.rng = random.Random(seed)
+        if self.kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0] if self.params else 0.0
+        if self.kind == "uniform":
+            return self.rng.uniform(self.params[0], self.params[1])
+        if self.kind == "normal":
+            return max(0.0, self.rng.gauss(self.params[0], self.params[1]))
+        return self.rng.lognormvariate(self.params[0], self.params[1])
+
+
+class StubSettings:
+    """
+    Fault and latency settings for OpenAIStubServer. Can be changed while the server runs.
+    """
+
+    def __init__(self,
+                 latency: str = "fixed:0.0",
+                 error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0,
+                 retry_after: float = 1.0,
+                 stream_chunks: int = 8,
+                 stream_chunk_delay: float = 0.05,
+                 seed: Optional[int] = None):
+        self.latency = LatencyDistribution(latency, seed)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.stream_chunks = stream_chunks
+        self.stream_chunk_delay = stream_chunk_delay
+        self.rng = random.Random(seed)
+
+
+def _example_from_schema(schema: Dict[str, Any], name: str = "value") -> Any:
+    """
+    Builds a minimal instance that satisfies a (strict) JSON schema, so that
+    structured-output callers such as OpenAIVision can validate the stub's reply.
+    """
+    kind = schema.get("type")
+    if "enum" in schema:
+        return schema["enum"][0]
+    if kind == "object":
+        props = schema.get("properties", {})
+        return {key: _example_from_schema(sub, key) for key, sub in props.items()}
+    if kind == "array":
+        return [_example_from_schema(schema.get("items", {}), name) for _ in range(2)]
+    if kind == "boolean":
+        return False
+    if kind == "integer":
+        return 0
+    if kind == "number":
+        return 0.0
+    if kind == "null":
+        return None
+    return f"stub {name}"
+
+
+class OpenAIStubServer(ThreadingHTTPServer):
+    """
+    A local stand-in for the OpenAI chat-completions endpoint, used for load testing
+    OpenAIVision and ReassuringMessages without network access or an API key.
+
+    Supports:
+    - POST /v1/chat/completions with plain text or `json_schema` structured output
+    - `stream: true` responses as server-sent events, dripped chunk by chunk
+    - injected latency, 500 errors and 429 rate-limit responses (with Retry-After)
+    - GET /stats for request counters, POST /reset to clear them
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, settings: Optional[StubSettings] = None):
+        super().__init__((host, port), _StubHandler)
+        self.logger = Logger("OpenAIStub")
+        self.settings = settings or StubSettings()
+        self.stats_lock = threading.Lock()
+        self.stats: Dict[str, int] = {}
+        self.reset_stats()
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.stats = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0, "streams": 0}
+
+    def count(self, key: str):
+        with self.stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self.stats_lock:
+            return dict(self.stats)
+
+    def start(self) -> "OpenAIStubServer":
+        """
+        Serves requests from a background daemon thread.
+        """
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        self.logger.info(f"OpenAI stub listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self.logger.info("OpenAI stub stopped.")
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server: OpenAIStubServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Per-request access logs would dominate stderr during load tests.
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            self._send_json(200, self.server.snapshot())
+        else:
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        raw = self.rfile.read(length) if length else b""
+
+        if self.path.rstrip("/").endswith("/reset"):
+            self.server.reset_stats()
+            self._send_json(200, {"ok": True})
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+            return
+
+        self.server.count("requests")
+        try:
+            request = json.loads(raw.decode("utf-8") or "{}")
+        except ValueError:
+            self.server.count("errors")
+            self._send_json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+            return
+
+        settings = self.server.settings
+        time.sleep(settings.latency.sample())
+
+        roll = settings.rng.random()
+        if roll < settings.rate_limit_rate:
+            self.server.count("rate_limited")
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached (stub).", "type": "rate_limit_error", "code": "rate_limit_exceeded"}},
+                {"Retry-After": f"{settings.retry_after:g}"}
+            )
+            return
+        if roll < settings.rate_limit_rate + settings.error_rate:
+            self.server.count("errors")
+            self._send_json(500, {"error": {"message": "Injected server error (stub).", "type": "server_error"}})
+            return
+
+        content, finish_reason = self._build_content(request)
+        model = request.get("model", "stub-model")
+        if request.get("stream"):
+            self.server.count("streams")
+            self._stream(model, content, finish_reason)
+        else:
+            self._send_json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content, "refusal": None},
+                    "finish_reason": finish_reason
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(content.split()), "total_tokens": len(content.split())}
+            })
+        self.server.count("ok")
+
+    def _build_content(self, request: Dict[str, Any]) -> Tuple[str, str]:
+        response_format = request.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            schema = response_format.get("json_schema", {}).get("schema", {})
+            return json.dumps(_example_from_schema(schema)), "stop"
+        if response_format.get("type") == "json_object":
+            return "{}", "stop"
+        return "Everything is calm around you. This is a reply from the local stub server.", "stop"
+
+    def _stream(self, model: str, content: str, finish_reason: str):
+        settings = self.server.settings
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        pieces = max(1, settings.stream_chunks)
+        size = max(1, -(-len(content) // pieces))
+        deltas = [{"role": "assistant", "content": ""}] + [{"content": content[i:i + size]} for i in range(0, len(content), size)]
+        try:
+            for i, delta in enumerate(deltas):
+                chunk = {
+                    "id": chunk_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": None}]
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                if i > 0:
+                    time.sleep(settings.stream_chunk_delay)
+            final = {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}]
+            }
+            self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.logger.warn("Client disconnected during streamed response.")
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser):
+    """
+    Adds the stub's fault-injection options to an argument parser.
+    """
+    parser.add_argument("--latency", default="lognormal:0.0,0.4", help="Latency distribution, e.g. fixed:0.8, uniform:0.5,2, normal:1,0.2, lognormal:0,0.4")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 429.")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429 responses.")
+    parser.add_argument("--stream-chunks", type=int, default=8, help="Number of content chunks in streamed responses.")
+    parser.add_argument("--stream-chunk-delay", type=float, default=0.05, help="Delay in seconds between streamed chunks.")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible runs.")
+
+
+def settings_from_args(args: argparse.Namespace) -> StubSettings:
+    return StubSettings(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        stream_chunks=args.stream_chunks,
+        stream_chunk_delay=args.stream_chunk_delay,
+        seed=args.seed
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stub server with latency and fault injection.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    add_stub_arguments(parser)
+    cli_args = parser.parse_args()
+
+    server = OpenAIStubServer(cli_args.host, cli_args.port, settings_from_args(cli_args))
+    server.logger.info(f"Serving on {server.base_url}. Point the app at it with OPENAI_API_BASE={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.logger.info("Interrupted, shutting down.")
+    finally:
+        server.server_close()
@@ -0,0 +1,43 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from ..config.config import Config
+from ..utils.telemetry import TelemetryReader, eeg_narration_correlation, hourly_latency
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a telemetry store: hourly stage latencies and EEG vs. speech correlation.")
+    parser.add_argument("--dir", default=Config.TELEMETRY_DIR, help="Telemetry directory (TELEMETRY_DIR by default).")
+    parser.add_argument("--stage", default="", help="Only report this stage, e.g. vision.analyze_frame.")
+    parser.add_argument("--field", default="attention", help="EEG column to correlate, e.g. meditation or spectral_attention.")
+    parser.add_argument("--kinds", default="narration", help="Comma-separated speech kinds to correlate against (empty for all).")
+    parser.add_argument("--bin", type=float, default=1.0, help="Correlation bin size in seconds.")
+    parser.add_argument("--max-lag", type=float, default=30.0, help="Largest lag in seconds.")
+    parser.add_argument("--output", default="", help="Optional JSON file for the full report.")
+    args = parser.parse_args()
+
+    reader = TelemetryReader(args.dir)
+    latency = hourly_latency(reader, args.stage or None)
+    for stage, hours in sorted(latency.items()):
+        print(stage)
+        for hour, stats in sorted(hours.items()):
+            print(f"  {time.strftime('%Y-%m-%d %H:00', time.localtime(hour))}: n={stats['count']:.0f} "
+                  f"p50 {stats['p50_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms, max {stats['max_ms']:.1f} ms")
+
+    kinds = [k.strip() for k in args.kinds.split(",") if k.strip()]
+    correlation = eeg_narration_correlation(reader, args.field, kinds, args.bin, args.max_lag)
+    if len(correlation["correlation"]):
+        peak = int(np.argmax(np.abs(correlation["correlation"])))
+        print(f"{args.field} vs {args.kinds or 'all speech'}: {correlation['events']:.0f} events, "
+              f"peak correlation {correlation['correlation'][peak]:+.3f} at lag {correlation['peak_lag_s']:+.1f} s, "
+              f"mean {correlation['mean_before']:.1f} before / {correlation['mean_after']:.1f} after")
+    else:
+        print(f"Not enough EEG data or speech events to correlate {args.field}.")
+
+    if args.output:
+        correlation = {k: v.tolist() if isinstance(v, np.ndarray) else v for k, v in correlation.items()}
+        with open(args.output, "w") as f:
+            json.dump({"hourly_latency": latency, "eeg_speech_correlation": correlation}, f, indent=2)
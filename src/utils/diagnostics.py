@@ -0,0 +1,259 @@
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ..config.config import Config
+from .logger import Logger
+from .memory import format_footprint, memory_footprint
+from .telemetry import telemetry
+
+
+class StageTracker:
+    """
+    Records which pipeline stage each thread is in and aggregates stage timings.
+    Used by the diagnostics stack dump to show, for example, that the main thread
+    has been inside "tts.speak" for 12 seconds.
+
+    Usage:
+        with stage_tracker.stage("vision.detect"):
+            detector.detect_objects(frame)
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active: Dict[int, List[Tuple[str, float]]] = defaultdict(list)
+        self.stats: Dict[str, List[float]] = {}  # name -> [count, total, max, last]
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        thread_id = threading.get_ident()
+        start = time.monotonic()
+        with self.lock:
+            self.active[thread_id].append((name, start))
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            with self.lock:
+                stack = self.active.get(thread_id)
+                if stack:
+                    stack.pop()
+                    if not stack:
+                        del self.active[thread_id]
+                entry = self.stats.setdefault(name, [0, 0.0, 0.0, 0.0])
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] = max(entry[2], elapsed)
+                entry[3] = elapsed
+            telemetry.record("latency", stage=name, seconds=elapsed)
+
+    def active_stages(self) -> Dict[int, List[Tuple[str, float]]]:
+        """
+        Returns, per thread id, the nested stages currently running and how long each has been running.
+        """
+        now = time.monotonic()
+        with self.lock:
+            return {tid: [(name, now - start) for name, start in stack] for tid, stack in self.active.items()}
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns count, mean, max and last duration (seconds) per stage.
+        """
+        with self.lock:
+            return {
+                name: {"count": count, "mean": total / count if count else 0.0, "max": peak, "last": last}
+                for name, (count, total, peak, last) in self.stats.items()
+            }
+
+
+# Shared tracker used across the application.
+stage_tracker = StageTracker()
+
+
+class SamplingProfiler:
+    """
+    A low-overhead wall-clock sampling profiler.
+    A background thread samples every thread's Python stack at a fixed interval and
+    aggregates them into flamegraph-compatible collapsed stacks
+    ("thread;module:function;module:function count"), written to disk on stop.
+    Sampling stops automatically after `max_duration` seconds.
+    """
+
+    def __init__(self, output_dir: str, interval: float, max_duration: float):
+        self.logger = Logger("SamplingProfiler")
+        self.output_dir = output_dir
+        self.interval = interval
+        self.max_duration = max_duration
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.samples = 0
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.started_at = 0.0
+        self.lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        with self.lock:
+            if self.running:
+                return
+            self.counts = defaultdict(int)
+            self.samples = 0
+            self.stop_event.clear()
+            self.started_at = time.time()
+            self.thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+            self.thread.start()
+        self.logger.info(f"Sampling profiler started ({self.interval * 1000:.0f} ms interval, max {self.max_duration:.0f}s).")
+
+    def stop(self) -> Optional[str]:
+        """
+        Stops sampling and writes the collapsed stacks. Returns the output path.
+        """
+        with self.lock:
+            thread = self.thread
+            if thread is None:
+                return None
+            self.stop_event.set()
+        if thread is not threading.current_thread():
+            thread.join()
+        return self._write()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + self.max_duration
+        while not self.stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                parts = []
+                while frame is not None:
+                    code = frame.f_code
+                    parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                parts.append(names.get(thread_id, str(thread_id)))
+                self.counts[";".join(reversed(parts))] += 1
+            self.samples += 1
+            if time.monotonic() >= deadline:
+                self.logger.info("Sampling profiler reached its maximum duration.")
+                break
+        with self.lock:
+            self.thread = None
+        if not self.stop_event.is_set():
+            self.stop_event.set()
+            self._write()
+
+    def _write(self) -> Optional[str]:
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"profile-{time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started_at))}.folded")
+        try:
+            with open(path, "w") as f:
+                for stack, count in sorted(self.counts.items()):
+                    f.write(f"{stack} {count}\n")
+        except OSError as e:
+            self.logger.error(f"Failed to write profile: {e}")
+            return None
+        self.logger.info(f"Profile with {self.samples} samples written to {path}")
+        return path
+
+
+class DiagnosticsHandler:
+    """
+    Signal-triggered diagnostics that work without restarting the process:
+    - SIGUSR1 dumps every thread's stack together with its active stages and the
+      aggregated stage timings.
+    - SIGUSR2 toggles the sampling profiler.
+
+    The signals are blocked in all threads and consumed by a dedicated thread via
+    sigwait, so a dump still happens while the main thread is stuck in a blocking
+    call such as a serial read or `runAndWait`.
+    Must be installed from the main thread before other threads are started.
+    """
+
+    def __init__(self, output_dir: Optional[str] = None, tracker: StageTracker = stage_tracker):
+        self.logger = Logger("Diagnostics")
+        self.output_dir = output_dir or Config.DIAGNOSTICS_DIR
+        self.tracker = tracker
+        self.profiler = SamplingProfiler(self.output_dir, Config.PROFILER_INTERVAL, Config.PROFILER_MAX_DURATION)
+
+    def install(self):
+        if not (hasattr(signal, "SIGUSR1") and hasattr(signal, "SIGUSR2")):
+            self.logger.warn("SIGUSR1/SIGUSR2 not available on this platform, diagnostics disabled.")
+            return
+
+        signals = {signal.SIGUSR1, signal.SIGUSR2}
+        if hasattr(signal, "pthread_sigmask") and hasattr(signal, "sigwait"):
+            signal.pthread_sigmask(signal.SIG_BLOCK, signals)
+            threading.Thread(target=self._wait_loop, args=(signals,), name="Diagnostics", daemon=True).start()
+        else:
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.dump_stacks())
+            signal.signal(signal.SIGUSR2, lambda signum, frame: self.toggle_profiler())
+        self.logger.info(f"Diagnostics ready (pid {os.getpid()}): SIGUSR1 dumps stacks, SIGUSR2 toggles profiling.")
+
+    def _wait_loop(self, signals):
+        while True:
+            signum = signal.sigwait(signals)
+            try:
+                if signum == signal.SIGUSR1:
+                    self.dump_stacks()
+                elif signum == signal.SIGUSR2:
+                    self.toggle_profiler()
+            except Exception as e:
+                self.logger.error(f"Diagnostics handler failed: {e}")
+
+    def format_stacks(self) -> str:
+        threads = {t.ident: t for t in threading.enumerate()}
+        active = self.tracker.active_stages()
+        lines = [f"Thread dump at {time.strftime('%Y-%m-%d %H:%M:%S')} (pid {os.getpid()})", ""]
+
+        for thread_id, frame in sys._current_frames().items():
+            thread = threads.get(thread_id)
+            name = thread.name if thread else "unknown"
+            daemon = " daemon" if thread is not None and thread.daemon else ""
+            lines.append(f"--- Thread {name} ({thread_id}){daemon}")
+            for stage_name, elapsed in active.get(thread_id, []):
+                lines.append(f"    in stage '{stage_name}' for {elapsed:.3f}s")
+            lines.extend(line.rstrip("\n") for line in traceback.format_stack(frame))
+            lines.append("")
+
+        lines.append("--- Stage timings (count, mean, max, last in seconds)")
+        for stage_name, stats in sorted(self.tracker.summary().items()):
+            lines.append(
+                f"    {stage_name}: {stats['count']:.0f}, {stats['mean']:.3f}, {stats['max']:.3f}, {stats['last']:.3f}"
+            )
+        lines.append("")
+        lines.append("--- Memory")
+        lines.append(f"    {format_footprint(memory_footprint())}")
+        return "\n".join(lines) + "\n"
+
+    def dump_stacks(self) -> Optional[str]:
+        """
+        Writes the thread dump to the diagnostics directory and echoes it to stderr.
+        Returns the output path, or None if it could not be written.
+        """
+        report = self.format_stacks()
+        print(report, file=sys.stderr)
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            path = os.path.join(self.output_dir, f"stacks-{time.strftime('%Y%m%d-%H%M%S')}.txt")
+            with open(path, "w") as f:
+                f.write(report)
+        except OSError as e:
+            self.logger.error(f"Failed to write stack dump: {e}")
+            return None
+        self.logger.info(f"Stack dump written to {path}")
+        return path
+
+    def toggle_profiler(self):
+        if self.profiler.running:
+            self.profiler.stop()
+        else:
+            self.profiler.start()
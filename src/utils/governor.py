@@ -0,0 +1,185 @@
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from ..config.config import Config
+from .logger import Logger
+
+
+class GovernorDecision:
+    """
+    The settings the governor wants applied for the current thermal level.
+    """
+
+    def __init__(self, level: str, reason: str, camera_fps: int, inference_threads: int,
+                 loop_interval: float, narration_multiplier: float, cloud_enabled: bool, prefetch_enabled: bool):
+        self.level = level
+        self.reason = reason
+        self.camera_fps = camera_fps
+        self.inference_threads = inference_threads
+        self.loop_interval = loop_interval
+        self.narration_multiplier = narration_multiplier
+        self.cloud_enabled = cloud_enabled
+        self.prefetch_enabled = prefetch_enabled
+        self.timestamp = time.time()
+
+    def as_dict(self) -> Dict:
+        return dict(self.__dict__)
+
+
+class ThermalGovernor:
+    """
+    Thermal- and power-aware performance governor.
+
+    Reads CPU temperature, current/maximum/limit frequency and the firmware throttle
+    state from sysfs (rooted at SYSFS_ROOT, so tests can point it at a fake tree),
+    classifies the device as normal / warm / hot / critical with hysteresis, and
+    scales camera FPS, inference threads, narration rate, loop interval and
+    optional cloud features accordingly.
+
+    The proximity-warning path is protected: the loop interval never exceeds
+    GOVERNOR_MAX_LOOP_INTERVAL, so per-frame proximity checks keep running at a
+    bounded rate while everything optional is shed first.
+
+    Methods:
+        update() -> Optional[GovernorDecision]:
+            Samples sensors (at most every GOVERNOR_INTERVAL seconds) and returns a
+            new decision when the level changes, else None.
+        metrics() -> Dict:
+            Current readings, level, decision counters and recent decisions.
+    """
+
+    LEVELS = ("normal", "warm", "hot", "critical")
+
+    def __init__(self, sysfs_root: Optional[str] = None):
+        self.logger = Logger("ThermalGovernor")
+        root = sysfs_root or Config.SYSFS_ROOT
+        self.temp_path = os.path.join(root, "class/thermal/thermal_zone0/temp")
+        self.cur_freq_path = os.path.join(root, "devices/system/cpu/cpu0/cpufreq/scaling_cur_freq")
+        self.max_freq_path = os.path.join(root, "devices/system/cpu/cpu0/cpufreq/cpuinfo_max_freq")
+        self.limit_freq_path = os.path.join(root, "devices/system/cpu/cpu0/cpufreq/scaling_max_freq")
+        self.throttled_path = os.path.join(root, "devices/platform/soc/soc:firmware/get_throttled")
+        self.thresholds = (Config.GOVERNOR_WARM_TEMP, Config.GOVERNOR_HOT_TEMP, Config.GOVERNOR_CRITICAL_TEMP)
+
+        self.level = "normal"
+        self.readings: Dict[str, Optional[float]] = {}
+        self.last_update = 0.0
+        self.level_since = time.monotonic()
+        self.time_in_level = {level: 0.0 for level in self.LEVELS}
+        self.transitions = 0
+        self.decisions: Deque[Dict] = deque(maxlen=Config.GOVERNOR_DECISION_HISTORY)
+        self.current = self.decide(self.level, "startup")
+        self.decisions.append(self.current.as_dict())
+
+    def _read_number(self, path: str, base: int = 10) -> Optional[float]:
+        try:
+            with open(path) as f:
+                return float(int(f.read().strip(), base))
+        except (OSError, ValueError):
+            return None
+
+    def read_sensors(self) -> Dict[str, Optional[float]]:
+        """
+        Returns temperature (deg C), current, hardware maximum and policy limit
+        frequency (MHz) and throttle flags. Missing files are reported as None.
+        """
+        temp = self._read_number(self.temp_path)
+        cur = self._read_number(self.cur_freq_path)
+        peak = self._read_number(self.max_freq_path)
+        limit = self._read_number(self.limit_freq_path)
+        throttled = self._read_number(self.throttled_path, 16)
+        flags = int(throttled) if throttled is not None else 0
+        return {
+            "temp_c": temp / 1000.0 if temp is not None else None,
+            "freq_mhz": cur / 1000.0 if cur is not None else None,
+            "max_freq_mhz": peak / 1000.0 if peak is not None else None,
+            "limit_freq_mhz": limit / 1000.0 if limit is not None else None,
+            # Raspberry Pi firmware bits: 0 under-voltage, 1 freq capped, 2 throttled, 3 soft temp limit.
+            "under_voltage": float(bool(flags & 0x1)),
+            "throttled": float(bool(flags & 0x6)),
+            "soft_temp_limit": float(bool(flags & 0x8)),
+        }
+
+    def classify(self, readings: Dict[str, Optional[float]]) -> str:
+        """
+        Maps readings to a level. Stepping down requires the temperature to fall
+        GOVERNOR_HYSTERESIS degrees below the threshold to avoid oscillation.
+        """
+        temp = readings.get("temp_c")
+        current_index = self.LEVELS.index(self.level)
+        index = 0
+        if temp is not None:
+            for i, threshold in enumerate(self.thresholds, start=1):
+                # Thresholds at or below the current level only release with hysteresis.
+                limit = threshold - Config.GOVERNOR_HYSTERESIS if i <= current_index else threshold
+                if temp >= limit:
+                    index = i
+
+        # The current frequency says nothing on its own: ondemand/schedutil idle far below
+        # the maximum. A cap shows up in the firmware flags or as a lowered policy limit
+        # (thermal cooling devices reduce scaling_max_freq).
+        limit, peak = readings.get("limit_freq_mhz"), readings.get("max_freq_mhz")
+        freq_capped = limit is not None and peak and limit < Config.GOVERNOR_FREQ_CAP_RATIO * peak
+        if readings.get("throttled") or readings.get("soft_temp_limit") or readings.get("under_voltage") or freq_capped:
+            index = max(index, self.LEVELS.index("hot"))
+        return self.LEVELS[index]
+
+    def decide(self, level: str, reason: str) -> GovernorDecision:
+        """
+        Returns the settings for a level. Optional work is shed first; the loop
+        interval stays bounded so proximity warnings are never starved.
+        """
+        base_fps = Config.CAMERA_FRAMERATE
+        base_threads = Config.INFERENCE_THREADS
+        base_interval = Config.LOOP_INTERVAL
+        if level == "normal":
+            fps, threads, interval, narration, cloud, prefetch = base_fps, base_threads, base_interval, 1.0, True, True
+        elif level == "warm":
+            fps, threads, interval, narration, cloud, prefetch = min(base_fps, 15), base_threads, base_interval * 1.5, 1.5, True, False
+        elif level == "hot":
+            fps, threads, interval, narration, cloud, prefetch = min(base_fps, 10), 1, base_interval * 2.0, 2.0, True, False
+        else:
+            fps, threads, interval, narration, cloud, prefetch = min(base_fps, 5), 1, base_interval * 3.0, 3.0, False, False
+        interval = min(interval, Config.GOVERNOR_MAX_LOOP_INTERVAL)
+        return GovernorDecision(level, reason, fps, threads, interval, narration, cloud, prefetch)
+
+    def update(self, now: Optional[float] = None) -> Optional[GovernorDecision]:
+        now = time.monotonic() if now is None else now
+        if now - self.last_update < Config.GOVERNOR_INTERVAL:
+            return None
+        self.last_update = now
+        self.readings = self.read_sensors()
+
+        level = self.classify(self.readings)
+        if level == self.level:
+            return None
+
+        self.time_in_level[self.level] += now - self.level_since
+        self.level_since = now
+        reason = (f"temp {self.readings.get('temp_c')} C, freq {self.readings.get('freq_mhz')} MHz "
+                  f"(limit {self.readings.get('limit_freq_mhz')}/{self.readings.get('max_freq_mhz')} MHz), throttled {bool(self.readings.get('throttled'))}")
+        previous = self.level
+        self.level = level
+        self.transitions += 1
+        self.current = self.decide(level, reason)
+        self.decisions.append(self.current.as_dict())
+        self.logger.warn(
+            f"Level {previous} -> {level} ({reason}): camera {self.current.camera_fps} fps, "
+            f"{self.current.inference_threads or 'default'} thread(s), loop {self.current.loop_interval:.2f}s, "
+            f"narration x{self.current.narration_multiplier:g}, cloud {'on' if self.current.cloud_enabled else 'off'}, "
+            f"prefetch {'on' if self.current.prefetch_enabled else 'off'}"
+        )
+        return self.current
+
+    def metrics(self) -> Dict:
+        time_in_level = dict(self.time_in_level)
+        time_in_level[self.level] += time.monotonic() - self.level_since
+        return {
+            "level": self.level,
+            "readings": dict(self.readings),
+            "transitions": self.transitions,
+            "time_in_level_s": time_in_level,
+            "current": self.current.as_dict(),
+            "recent_decisions": list(self.decisions),
+        }
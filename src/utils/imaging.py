@@ -0,0 +1,50 @@
+import base64
+import threading
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from ..config.config import Config
+from .memory import buffer_pool
+
+# The pooled scratch buffer is shared, so concurrent encodes (main loop and prefetch) take turns.
+_encode_lock = threading.Lock()
+
+
+def encode_jpeg(frame: Optional[np.ndarray], quality: Optional[int] = None, max_width: Optional[int] = None) -> Optional[np.ndarray]:
+    """
+    Encodes a frame as JPEG (JPEG_QUALITY unless `quality` is given). Frames wider
+    than `max_width` (CLOUD_IMAGE_MAX_WIDTH by default, 0 disables) are first
+    downscaled into a pooled buffer. Returns the encoded bytes as a uint8 array,
+    or None if the frame is missing or encoding fails.
+    """
+    if frame is None or frame.size == 0:
+        return None
+    quality = Config.JPEG_QUALITY if quality is None else quality
+    max_width = Config.CLOUD_IMAGE_MAX_WIDTH if max_width is None else max_width
+    h, w = frame.shape[:2]
+    with _encode_lock:
+        if 0 < max_width < w:
+            scaled_h = max(1, int(h * max_width / w))
+            scaled = buffer_pool.buffer("encoder", (scaled_h, max_width) + frame.shape[2:], frame.dtype, tag=str(max_width))
+            cv2.resize(frame, (max_width, scaled_h), dst=scaled, interpolation=cv2.INTER_AREA)
+            frame = scaled
+        ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer if ret else None
+
+
+def encode_jpeg_base64(frame) -> str:
+    """
+    Encodes a frame as a base64 JPEG string for the GPT-4o image_url payload.
+    Already-encoded JPEG bytes (uploads relayed by the gateway) are passed
+    through without being decoded and re-encoded. Returns an empty string if
+    the frame is missing or encoding fails.
+    """
+    if isinstance(frame, (bytes, bytearray)):
+        return base64.b64encode(frame).decode('ascii') if frame else ""
+    buffer = encode_jpeg(frame)
+    if buffer is None:
+        return ""
+    # b64encode accepts the encoded array directly, avoiding an intermediate bytes copy.
+    return base64.b64encode(memoryview(buffer)).decode('ascii')
@@ -0,0 +1,176 @@
+import threading
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config.config import Config
+from .logger import Logger
+
+
+class BufferPool:
+    """
+    Reusable numpy buffers for the per-frame hot path (camera reads, detector
+    input resizes, image encoding), so steady-state operation allocates no new
+    frame-sized arrays.
+
+    Buffers are grouped per subsystem (e.g. "camera", "detector", "encoder").
+    ring() hands out the next of `slots` buffers in rotation, so a buffer stays
+    valid until `slots` further calls for the same subsystem and tag; callers
+    that retain frames (the frame selector) must keep fewer than `slots` of them.
+    A subsystem whose requested shape changes (e.g. after a resolution switch)
+    gets its ring reallocated.
+
+    Pooling is active when MEMORY_BUDGET_MODE is set; otherwise every call
+    returns a fresh array, matching the previous behaviour. Total pooled memory
+    is capped at MEMORY_POOL_MAX_MB: requests beyond the cap are served unpooled
+    and counted as overflows.
+
+    Methods:
+        ring(subsystem, shape, dtype, slots, tag) -> np.ndarray
+        buffer(subsystem, shape, dtype, tag) -> np.ndarray
+        stats() -> Dict[str, Dict[str, int]]
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, max_bytes: Optional[int] = None):
+        self.logger = Logger("BufferPool")
+        self.enabled = Config.MEMORY_BUDGET_MODE if enabled is None else enabled
+        self.max_bytes = int(Config.MEMORY_POOL_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self.lock = threading.Lock()
+        # (subsystem, tag) -> [buffers, next index]
+        self.rings: Dict[Tuple[str, str], List] = {}
+        # subsystem -> [hits, misses, overflows]
+        self.counters: Dict[str, List[int]] = {}
+
+    def _pooled_bytes(self) -> int:
+        return sum(buf.nbytes for buffers, _ in self.rings.values() for buf in buffers)
+
+    def ring(self, subsystem: str, shape: Tuple[int, ...], dtype=np.uint8, slots: int = 1, tag: str = "") -> np.ndarray:
+        """
+        Returns the next buffer of the (subsystem, tag) ring. Contents are undefined.
+        """
+        if not self.enabled:
+            return np.empty(shape, dtype=dtype)
+        shape = tuple(int(s) for s in shape)
+        dtype = np.dtype(dtype)
+        key = (subsystem, tag)
+        with self.lock:
+            counters = self.counters.setdefault(subsystem, [0, 0, 0])
+            entry = self.rings.get(key)
+            if entry is not None and len(entry[0]) == slots and entry[0][0].shape == shape and entry[0][0].dtype == dtype:
+                counters[0] += 1
+                buffers, index = entry
+                entry[1] = (index + 1) % slots
+                return buffers[index]
+
+            counters[1] += 1
+            if entry is not None:
+                del self.rings[key]
+            needed = int(np.prod(shape)) * dtype.itemsize * slots
+            if self._pooled_bytes() + needed > self.max_bytes:
+                counters[2] += 1
+                if counters[2] == 1:
+                    self.logger.warn(f"Pool cap of {self.max_bytes // (1024 * 1024)} MB reached, '{subsystem}' buffers are not pooled.")
+                return np.empty(shape, dtype=dtype)
+            buffers = [np.empty(shape, dtype=dtype) for _ in range(slots)]
+            self.rings[key] = [buffers, 1 % slots]
+            return buffers[0]
+
+    def buffer(self, subsystem: str, shape: Tuple[int, ...], dtype=np.uint8, tag: str = "") -> np.ndarray:
+        """
+        Returns a single reusable scratch buffer, valid until the next call with the same key.
+        """
+        return self.ring(subsystem, shape, dtype, 1, tag)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Per-subsystem pooled buffer count and bytes, reuse hits, allocations and cap overflows.
+        """
+        with self.lock:
+            report = {name: {"buffers": 0, "bytes": 0, "hits": c[0], "allocations": c[1], "overflows": c[2]}
+                      for name, c in self.counters.items()}
+            for (subsystem, _), (buffers, _) in self.rings.items():
+                report[subsystem]["buffers"] += len(buffers)
+                report[subsystem]["bytes"] += sum(buf.nbytes for buf in buffers)
+        return report
+
+    def clear(self):
+        with self.lock:
+            self.rings.clear()
+            self.counters.clear()
+
+
+# Shared by Camera, ObjectDetectionModel and the image encoders.
+buffer_pool = BufferPool()
+
+
+def read_proc_status() -> Dict[str, float]:
+    """
+    Returns current and peak resident set size in MB from /proc/self/status
+    (VmRSS / VmHWM). Empty on platforms without procfs.
+    """
+    values = {}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    values["rss_mb" if key == "VmRSS" else "peak_rss_mb"] = int(rest.split()[0]) / 1024.0
+    except (OSError, ValueError, IndexError):
+        pass
+    return values
+
+
+def memory_footprint() -> Dict:
+    """
+    Process RSS and peak RSS plus per-subsystem buffer pool usage.
+    """
+    footprint = dict(read_proc_status())
+    pool = buffer_pool.stats()
+    footprint["pool_mb"] = sum(s["bytes"] for s in pool.values()) / (1024.0 * 1024.0)
+    footprint["pool"] = pool
+    return footprint
+
+
+def format_footprint(footprint: Dict) -> str:
+    parts = [f"RSS {footprint.get('rss_mb', float('nan')):.1f} MB",
+             f"peak {footprint.get('peak_rss_mb', float('nan')):.1f} MB",
+             f"pool {footprint['pool_mb']:.1f} MB"]
+    for name, s in sorted(footprint["pool"].items()):
+        parts.append(f"{name}: {s['buffers']} buf/{s['bytes'] / 1024:.0f} KB, "
+                     f"{s['hits']} reused, {s['allocations']} allocated, {s['overflows']} overflow")
+    return "; ".join(parts)
+
+
+def steady_state_allocations(step: Callable[[], object], iterations: int = 50, warmup: int = 5) -> Dict[str, float]:
+    """
+    Runs `step` (one frame of work) `warmup` times, then measures with tracemalloc
+    how much memory `iterations` further calls allocate and keep, and the peak
+    transient allocation above the starting point. numpy and OpenCV arrays are
+    traced, so per-frame frame copies show up in `peak_bytes_per_frame`.
+    """
+    for _ in range(warmup):
+        step()
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    # reset_peak() is Python 3.9+; without it the peak covers the whole run.
+    reset_peak = getattr(tracemalloc, "reset_peak", lambda: None)
+    try:
+        reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        peak_above = 0
+        for _ in range(iterations):
+            step()
+            _, peak = tracemalloc.get_traced_memory()
+            peak_above = max(peak_above, peak - start)
+            reset_peak()
+        end, _ = tracemalloc.get_traced_memory()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return {
+        "iterations": float(iterations),
+        "retained_bytes_per_frame": max(0, end - start) / float(iterations),
+        "peak_bytes_per_frame": float(peak_above),
+    }
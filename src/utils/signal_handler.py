@@ -1,12 +1,17 @@
 import signal
 import sys
 from .logger import Logger
+from .diagnostics import DiagnosticsHandler
+from ..config.config import Config
 
 class GracefulKiller:
     """
     GracefulKiller sets up signal handlers for SIGINT and SIGTERM,
     allowing the program to shut down gracefully.
     When triggered, sets kill_now to True so that the main loop can end safely.
+
+    If DIAGNOSTICS_ENABLED is set, also installs the SIGUSR1 (stack dump) and
+    SIGUSR2 (sampling profiler) handlers. Create it before starting any threads.
     """
 
     def __init__(self):
@@ -14,6 +19,10 @@ class GracefulKiller:
         self.kill_now = False
         signal.signal(signal.SIGINT, self.exit_gracefully)
         signal.signal(signal.SIGTERM, self.exit_gracefully)
+        self.diagnostics = None
+        if Config.DIAGNOSTICS_ENABLED:
+            self.diagnostics = DiagnosticsHandler()
+            self.diagnostics.install()
 
     def exit_gracefully(self, signum, frame):
         self.logger.info(f"Received termination signal ({signum}). Exiting gracefully...")
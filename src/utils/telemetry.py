@@ -0,0 +1,406 @@
+import os
+import queue
+import shutil
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..config.config import Config
+from ..eeg.spectral import parse_bands
+from .logger import Logger
+
+# SpectralEngine band powers (spectral_<band>) for the configured EEG_SPECTRAL_BANDS.
+SPECTRAL_BAND_COLUMNS = [f"spectral_{name}" for name in parse_bands(Config.EEG_SPECTRAL_BANDS)]
+
+# Fixed record schemas: stream -> [(column, dtype, per-record shape)].
+# Strings are stored as fixed-width UTF-8 bytes and truncated to fit.
+SCHEMAS: Dict[str, List[Tuple[str, str, Tuple[int, ...]]]] = {
+    "detections": [("t", "f8", ()), ("frame", "i8", ()), ("label", "S32", ()), ("score", "f4", ()), ("box", "f4", (4,))],
+    "eeg": [("t", "f8", ())] + [(name, "f4", ()) for name in (
+        "signal_quality", "attention", "meditation", "delta", "theta", "lowalpha", "highalpha",
+        "lowbeta", "highbeta", "lowgamma", "middlegamma",
+        "spectral_attention", "spectral_relaxation", "spectral_artifact_ratio", *SPECTRAL_BAND_COLUMNS)],
+    "latency": [("t", "f8", ()), ("stage", "S32", ()), ("seconds", "f4", ())],
+    "api": [("t", "f8", ()), ("client", "S16", ()), ("outcome", "S16", ()), ("attempt", "i2", ()), ("seconds", "f4", ())],
+    "speech": [("t", "f8", ()), ("kind", "S16", ()), ("chars", "i4", ()), ("seconds", "f4", ())],
+}
+
+
+def _fill_value(dtype: np.dtype):
+    if dtype.kind == "f":
+        return np.nan
+    if dtype.kind == "S":
+        return b""
+    return 0
+
+
+class _ChunkBuffer:
+    """
+    Preallocated columns for one stream, filled row by row by the writer thread.
+    """
+
+    def __init__(self, schema: List[Tuple[str, str, Tuple[int, ...]]], rows: int):
+        self.columns = {name: np.empty((rows,) + shape, dtype=dtype) for name, dtype, shape in schema}
+        self.fills = {name: _fill_value(np.dtype(dtype)) for name, dtype, _ in schema}
+        self.rows = rows
+        self.count = 0
+        self.first_t = 0.0
+        self.last_flush = time.monotonic()
+
+    def append(self, values: Dict):
+        i = self.count
+        if i == 0:
+            self.first_t = float(values.get("t", time.time()))
+        for name, column in self.columns.items():
+            value = values.get(name)
+            if value is None:
+                value = self.fills[name]
+            elif isinstance(value, str):
+                value = value.encode("utf-8", "replace")[:column.dtype.itemsize]
+            column[i] = value
+        self.count += 1
+
+
+class TelemetryRecorder:
+    """
+    Low-overhead, append-only telemetry for field sessions.
+
+    record() only timestamps the values and puts them on a bounded queue
+    (records are dropped and counted when the queue is full), so callers in the
+    hot loop never touch the disk. A background thread fills preallocated column
+    buffers per stream (see SCHEMAS) and writes a chunk every
+    TELEMETRY_CHUNK_ROWS rows or TELEMETRY_FLUSH_INTERVAL seconds.
+
+    On disk every chunk is a directory of per-column .npy files:
+        TELEMETRY_DIR/<stream>/<sequence>-<first timestamp>/<column>.npy
+    written under a temporary name and renamed into place, so readers only see
+    complete chunks and can open columns with np.load(mmap_mode="r"). Once the
+    store exceeds TELEMETRY_MAX_MB the oldest chunks (across all streams) are
+    deleted.
+
+    Methods:
+        record(stream: str, **values):
+            Queues one record; missing columns are stored as NaN / 0 / b"".
+        flush():
+            Writes all buffered rows (blocking until done).
+        close():
+            Flushes and stops the writer thread.
+    """
+
+    def __init__(self, root: Optional[str] = None, enabled: Optional[bool] = None):
+        self.logger = Logger("Telemetry")
+        self.enabled = Config.TELEMETRY_ENABLED if enabled is None else enabled
+        self.root = root or Config.TELEMETRY_DIR
+        self.chunk_rows = Config.TELEMETRY_CHUNK_ROWS
+        self.flush_interval = Config.TELEMETRY_FLUSH_INTERVAL
+        self.max_bytes = int(Config.TELEMETRY_MAX_MB * 1024 * 1024)
+        self.queue: "queue.Queue" = queue.Queue(maxsize=Config.TELEMETRY_QUEUE_SIZE)
+        self.dropped = 0
+        self.written_rows = 0
+        self.buffers: Dict[str, _ChunkBuffer] = {}
+        self.chunks: List[Tuple[int, str, int]] = []  # (sequence, path, bytes), oldest first
+        self.sequence = 0
+        self.thread: Optional[threading.Thread] = None
+        self.start_lock = threading.Lock()
+
+    def start(self):
+        with self.start_lock:
+            if self.thread is not None:
+                return
+            os.makedirs(self.root, exist_ok=True)
+            self._scan_existing()
+            self.thread = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+            self.thread.start()
+            self.logger.info(f"Recording telemetry to {self.root}")
+
+    def record(self, stream: str, **values):
+        if not self.enabled:
+            return
+        if self.thread is None:
+            self.start()
+        values.setdefault("t", time.time())
+        try:
+            self.queue.put_nowait((stream, values))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        if self.thread is None:
+            return
+        done = threading.Event()
+        self.queue.put((None, done))
+        done.wait(timeout=10.0)
+
+    def close(self):
+        if self.thread is None:
+            return
+        self.flush()
+        self.queue.put((None, None))
+        self.thread.join(timeout=10.0)
+        self.thread = None
+        if self.dropped:
+            self.logger.warn(f"Dropped {self.dropped} telemetry records (queue full).")
+
+    def _scan_existing(self):
+        chunks = []
+        for stream in SCHEMAS:
+            stream_dir = os.path.join(self.root, stream)
+            if not os.path.isdir(stream_dir):
+                continue
+            for name in os.listdir(stream_dir):
+                path = os.path.join(stream_dir, name)
+                if name.startswith(".") or not os.path.isdir(path):
+                    if name.startswith(".tmp-"):
+                        shutil.rmtree(path, ignore_errors=True)  # interrupted write
+                    continue
+                try:
+                    sequence = int(name.split("-", 1)[0])
+                except ValueError:
+                    continue
+                size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+                chunks.append((sequence, path, size))
+        chunks.sort()
+        self.chunks = chunks
+        self.sequence = chunks[-1][0] + 1 if chunks else 0
+
+    def _run(self):
+        while True:
+            try:
+                stream, values = self.queue.get(timeout=1.0)
+            except queue.Empty:
+                self._flush_stale()
+                continue
+            if stream is None:
+                if values is None:
+                    return
+                self._flush_all()
+                values.set()
+                continue
+            schema = SCHEMAS.get(stream)
+            if schema is None:
+                continue
+            buffer = self.buffers.get(stream)
+            if buffer is None:
+                buffer = self.buffers[stream] = _ChunkBuffer(schema, self.chunk_rows)
+            try:
+                buffer.append(values)
+            except (TypeError, ValueError) as e:
+                self.logger.debug(f"Skipping malformed {stream} record: {e}")
+                continue
+            if buffer.count >= buffer.rows:
+                self._write_chunk(stream, buffer)
+            self._flush_stale()
+
+    def _flush_stale(self):
+        now = time.monotonic()
+        for stream, buffer in self.buffers.items():
+            if buffer.count and now - buffer.last_flush >= self.flush_interval:
+                self._write_chunk(stream, buffer)
+
+    def _flush_all(self):
+        for stream, buffer in self.buffers.items():
+            if buffer.count:
+                self._write_chunk(stream, buffer)
+
+    def _write_chunk(self, stream: str, buffer: _ChunkBuffer):
+        stream_dir = os.path.join(self.root, stream)
+        name = f"{self.sequence:08d}-{int(buffer.first_t)}"
+        tmp_path = os.path.join(stream_dir, f".tmp-{name}")
+        path = os.path.join(stream_dir, name)
+        try:
+            os.makedirs(tmp_path, exist_ok=True)
+            size = 0
+            for column, values in buffer.columns.items():
+                column_path = os.path.join(tmp_path, f"{column}.npy")
+                np.save(column_path, values[:buffer.count])
+                size += os.path.getsize(column_path)
+            os.rename(tmp_path, path)
+        except OSError as e:
+            self.logger.error(f"Failed to write telemetry chunk {path}: {e}")
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        else:
+            self.chunks.append((self.sequence, path, size))
+            self.sequence += 1
+            self.written_rows += buffer.count
+            self._enforce_cap()
+        buffer.count = 0
+        buffer.last_flush = time.monotonic()
+
+    def _enforce_cap(self):
+        total = sum(size for _, _, size in self.chunks)
+        while total > self.max_bytes and len(self.chunks) > 1:
+            _, path, size = self.chunks.pop(0)
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            self.logger.debug(f"Rotated out telemetry chunk {path}")
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "queued": float(self.queue.qsize()),
+            "dropped": float(self.dropped),
+            "written_rows": float(self.written_rows),
+            "chunks": float(len(self.chunks)),
+            "bytes": float(sum(size for _, _, size in self.chunks)),
+        }
+
+
+# Shared by the detector, EEG processor, GPT clients, TTS and the stage tracker.
+telemetry = TelemetryRecorder()
+
+
+class TelemetryReader:
+    """
+    Reads a telemetry store written by TelemetryRecorder. Columns are opened with
+    np.load(mmap_mode="r"), so only the rows actually touched are paged in.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or Config.TELEMETRY_DIR
+
+    def chunk_paths(self, stream: str) -> List[str]:
+        stream_dir = os.path.join(self.root, stream)
+        if not os.path.isdir(stream_dir):
+            return []
+        names = sorted(n for n in os.listdir(stream_dir) if not n.startswith(".") and n.split("-", 1)[0].isdigit())
+        return [os.path.join(stream_dir, n) for n in names]
+
+    def iter_chunks(self, stream: str, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Yields one dict of memory-mapped column arrays per chunk, oldest first.
+        Chunks rotated out while iterating are skipped. Columns a chunk lacks (e.g.
+        spectral bands added by a later EEG_SPECTRAL_BANDS) are filled with NaN / 0 / b"".
+        """
+        columns = columns or [name for name, _, _ in SCHEMAS[stream]]
+        schema = {name: (dtype, shape) for name, dtype, shape in SCHEMAS[stream]}
+        for path in self.chunk_paths(stream):
+            try:
+                chunk, missing = {}, []
+                for name in columns:
+                    column_path = os.path.join(path, f"{name}.npy")
+                    if os.path.exists(column_path) or name not in schema:
+                        chunk[name] = np.load(column_path, mmap_mode="r")
+                    else:
+                        missing.append(name)
+                if missing:
+                    rows = len(np.load(os.path.join(path, "t.npy"), mmap_mode="r"))
+                    for name in missing:
+                        dtype, shape = schema[name]
+                        chunk[name] = np.full((rows,) + shape, _fill_value(np.dtype(dtype)), dtype=dtype)
+            except (OSError, ValueError):
+                continue
+            yield chunk
+
+    def load(self, stream: str, columns: Optional[Sequence[str]] = None,
+             start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Concatenates the requested columns over all chunks, keeping rows with start <= t < end.
+        """
+        columns = list(columns or [name for name, _, _ in SCHEMAS[stream]])
+        wanted = columns if "t" in columns else columns + ["t"]
+        parts: Dict[str, List[np.ndarray]] = {name: [] for name in wanted}
+        for chunk in self.iter_chunks(stream, wanted):
+            t = chunk["t"]
+            mask = np.ones(len(t), dtype=bool)
+            if start is not None:
+                mask &= t >= start
+            if end is not None:
+                mask &= t < end
+            if not mask.any():
+                continue
+            for name in wanted:
+                parts[name].append(np.asarray(chunk[name][mask]))
+        result = {}
+        for name, dtype, shape in SCHEMAS[stream]:
+            if name in parts:
+                result[name] = np.concatenate(parts[name]) if parts[name] else np.empty((0,) + shape, dtype=dtype)
+        return result
+
+
+def hourly_latency(reader: TelemetryReader, stage: Optional[str] = None) -> Dict[str, Dict[int, Dict[str, float]]]:
+    """
+    Latency distribution per stage and wall-clock hour (epoch seconds of the hour start):
+    count, mean, p50, p95, p99 and max in milliseconds.
+    """
+    data = reader.load("latency", ["t", "stage", "seconds"])
+    stages = data["stage"]
+    report: Dict[str, Dict[int, Dict[str, float]]] = {}
+    names = [stage.encode("utf-8")] if stage else np.unique(stages)
+    for name in names:
+        rows = stages == name
+        if not rows.any():
+            continue
+        hours = (data["t"][rows] // 3600).astype(np.int64) * 3600
+        millis = data["seconds"][rows].astype(np.float64) * 1000.0
+        per_hour = {}
+        for hour in np.unique(hours):
+            values = millis[hours == hour]
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            per_hour[int(hour)] = {"count": float(len(values)), "mean_ms": float(values.mean()), "p50_ms": float(p50),
+                                   "p95_ms": float(p95), "p99_ms": float(p99), "max_ms": float(values.max())}
+        report[name.decode("utf-8", "replace")] = per_hour
+    return report
+
+
+def eeg_narration_correlation(reader: TelemetryReader, field: str = "attention", kinds: Optional[Sequence[str]] = None,
+                              bin_seconds: float = 1.0, max_lag: float = 30.0) -> Dict:
+    """
+    Cross-correlates an EEG field with speech events. Both are binned at
+    `bin_seconds`; the EEG series is the per-bin mean (gaps interpolated) and the
+    event series counts utterances (optionally only `kinds`, e.g. "narration").
+    Positive lags mean EEG changes follow speech. Also returns the mean EEG value
+    in the `max_lag` seconds before and after events.
+    """
+    eeg = reader.load("eeg", ["t", field])
+    speech = reader.load("speech", ["t", "kind"])
+    events = speech["t"]
+    if kinds:
+        events = events[np.isin(speech["kind"], [k.encode("utf-8") for k in kinds])]
+    valid = np.isfinite(eeg[field])
+    eeg_t, eeg_v = eeg["t"][valid], eeg[field][valid].astype(np.float64)
+    if len(eeg_t) < 2 or len(events) == 0:
+        return {"lags_s": np.empty(0), "correlation": np.empty(0), "peak_lag_s": float("nan"), "events": float(len(events))}
+
+    start, end = eeg_t.min(), eeg_t.max()
+    n_bins = int((end - start) // bin_seconds) + 1
+    eeg_bins = ((eeg_t - start) // bin_seconds).astype(np.int64)
+    sums = np.bincount(eeg_bins, weights=eeg_v, minlength=n_bins)
+    counts = np.bincount(eeg_bins, minlength=n_bins)
+    filled = counts > 0
+    centers = np.arange(n_bins)
+    series = np.interp(centers, centers[filled], sums[filled] / counts[filled])
+
+    events = events[(events >= start) & (events <= end)]
+    event_series = np.bincount(((events - start) // bin_seconds).astype(np.int64), minlength=n_bins)[:n_bins].astype(np.float64)
+
+    x = series - series.mean()
+    y = event_series - event_series.mean()
+    denom = np.sqrt((x * x).sum() * (y * y).sum())
+    max_shift = min(int(max_lag / bin_seconds), n_bins - 1)
+    lags = np.arange(-max_shift, max_shift + 1)
+    correlation = np.zeros(len(lags))
+    if denom > 0:
+        for i, lag in enumerate(lags):
+            # corr(lag) = sum_k y[k] * x[k + lag]: EEG `lag` bins after the event.
+            if lag >= 0:
+                correlation[i] = (y[:n_bins - lag] * x[lag:]).sum() / denom
+            else:
+                correlation[i] = (y[-lag:] * x[:n_bins + lag]).sum() / denom
+
+    before, after = [], []
+    for t in events:
+        window_before = (eeg_t >= t - max_lag) & (eeg_t < t)
+        window_after = (eeg_t >= t) & (eeg_t < t + max_lag)
+        if window_before.any():
+            before.append(eeg_v[window_before].mean())
+        if window_after.any():
+            after.append(eeg_v[window_after].mean())
+    return {
+        "lags_s": lags * bin_seconds,
+        "correlation": correlation,
+        "peak_lag_s": float(lags[int(np.argmax(np.abs(correlation)))] * bin_seconds),
+        "events": float(len(events)),
+        "mean_before": float(np.mean(before)) if before else float("nan"),
+        "mean_after": float(np.mean(after)) if after else float("nan"),
+    }
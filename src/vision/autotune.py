@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import platform
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config.config import Config
+from ..utils.logger import Logger
+from .camera import Camera
+from .model import ObjectDetectionModel
+
+
+class AutoTuner:
+    """
+    Picks inference threads, capture resolution and frame rate for this device.
+
+    Calibration benchmarks ObjectDetectionModel.predict for every combination of
+    AUTOTUNE_THREADS and AUTOTUNE_RESOLUTIONS, measures the camera's real delivered
+    frame rate at each resolution, and keeps the highest resolution whose estimated
+    frame-to-warning latency (frame interval + capture + p95 inference) fits within
+    AUTOTUNE_LATENCY_BUDGET_MS. The result is cached in AUTOTUNE_CACHE_PATH, keyed by
+    a device/model fingerprint, so later boots skip calibration.
+
+    Methods:
+        run(force: bool) -> Dict:
+            Loads the cached profile (or calibrates) and applies it to Config.
+    """
+
+    def __init__(self):
+        self.logger = Logger("AutoTuner")
+        self.cache_path = Config.AUTOTUNE_CACHE_PATH
+        self.budget = Config.AUTOTUNE_LATENCY_BUDGET_MS / 1000.0
+        self.threads = Config.AUTOTUNE_THREADS or [1]
+        self.resolutions = self.parse_resolutions(Config.AUTOTUNE_RESOLUTIONS)
+        self.iterations = Config.AUTOTUNE_ITERATIONS
+
+    @staticmethod
+    def parse_resolutions(spec: str) -> List[Tuple[int, int]]:
+        resolutions = []
+        for entry in spec.split(","):
+            if entry.strip():
+                width, height = entry.lower().split("x")
+                resolutions.append((int(width), int(height)))
+        return resolutions
+
+    def fingerprint(self) -> str:
+        """
+        Identifies the hardware, model file and tuning inputs the profile is valid for.
+        """
+        board = platform.machine()
+        try:
+            with open("/proc/device-tree/model") as f:
+                board = f.read().strip("\x00\n ")
+        except OSError:
+            pass
+        try:
+            stat = os.stat(Config.MODEL_PATH)
+            model = f"{os.path.basename(Config.MODEL_PATH)}:{stat.st_size}:{int(stat.st_mtime)}"
+        except OSError:
+            model = os.path.basename(Config.MODEL_PATH)
+        return "|".join([
+            board, str(os.cpu_count()), model,
+            f"budget={Config.AUTOTUNE_LATENCY_BUDGET_MS:g}",
+            f"threads={self.threads}", f"res={Config.AUTOTUNE_RESOLUTIONS}",
+            f"dual={Config.CAMERA_DUAL_STREAM}"
+        ])
+
+    def load_cached(self) -> Optional[Dict]:
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cached.get("fingerprint") != self.fingerprint():
+            self.logger.info("Cached tuning profile is for a different device or model, recalibrating.")
+            return None
+        return cached.get("profile")
+
+    def save(self, profile: Dict):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            with open(self.cache_path, "w") as f:
+                json.dump({"fingerprint": self.fingerprint(), "created": time.time(), "profile": profile}, f, indent=2)
+            self.logger.info(f"Tuning profile saved to {self.cache_path}")
+        except OSError as e:
+            self.logger.warn(f"Could not save tuning profile: {e}")
+
+    def _benchmark_predict(self, model: ObjectDetectionModel, frame: np.ndarray) -> float:
+        model.predict(frame)  # warm-up: first invoke includes allocation and caching effects
+        timings = []
+        for _ in range(self.iterations):
+            start = time.perf_counter()
+            model.predict(frame)
+            timings.append(time.perf_counter() - start)
+        return float(np.percentile(timings, 95))
+
+    def calibrate(self, camera: Optional[Camera] = None) -> Dict:
+        """
+        Runs the calibration and returns the chosen profile.
+        """
+        own_camera = camera is None
+        camera = camera or Camera()
+        candidates = []
+        try:
+            for width, height in self.resolutions:
+                actual_w, actual_h, _ = camera.configure(camera.cap, width, height, Config.CAMERA_FRAMERATE)
+                camera.width, camera.height = actual_w, actual_h
+                capture_start = time.perf_counter()
+                frame = camera.get_frame()
+                capture_time = time.perf_counter() - capture_start
+                fps = camera.measure_fps(frames=max(10, self.iterations))
+                if frame is None or fps <= 0:
+                    self.logger.warn(f"No frames at {width}x{height}, skipping.")
+                    continue
+
+                for threads in self.threads:
+                    model = ObjectDetectionModel(num_threads=threads)
+                    predict_p95 = self._benchmark_predict(model, frame)
+                    latency = 1.0 / fps + capture_time + predict_p95
+                    candidates.append({
+                        "camera_width": actual_w,
+                        "camera_height": actual_h,
+                        "camera_framerate": int(round(fps)),
+                        "inference_threads": threads,
+                        "predict_p95_ms": predict_p95 * 1000.0,
+                        "estimated_latency_ms": latency * 1000.0,
+                    })
+                    self.logger.info(
+                        f"{actual_w}x{actual_h} @ {fps:.1f} fps, {threads} thread(s): "
+                        f"predict p95 {predict_p95 * 1000:.1f} ms, est. latency {latency * 1000:.1f} ms"
+                    )
+        finally:
+            if own_camera:
+                camera.release()
+
+        if not candidates:
+            raise RuntimeError("Auto-tuning found no working camera/model configuration.")
+
+        within = [c for c in candidates if c["estimated_latency_ms"] <= self.budget * 1000.0]
+        if within:
+            # Most pixels first, then the lowest latency.
+            best = max(within, key=lambda c: (c["camera_width"] * c["camera_height"], -c["estimated_latency_ms"]))
+        else:
+            best = min(candidates, key=lambda c: c["estimated_latency_ms"])
+            self.logger.warn(f"No configuration meets the {self.budget * 1000:.0f} ms budget, using the fastest.")
+        best = dict(best)
+        best["meets_budget"] = bool(within)
+        # Spend leftover budget sleeping between iterations, but never longer than the default loop interval.
+        slack = self.budget - best["estimated_latency_ms"] / 1000.0
+        best["loop_interval"] = round(min(Config.LOOP_INTERVAL, max(0.0, slack)), 3)
+        return best
+
+    def apply(self, profile: Dict):
+        """
+        Writes the profile's settings into Config before the pipeline is constructed.
+        """
+        if Config.CAMERA_DUAL_STREAM:
+            Config.CAMERA_DETECT_WIDTH = profile["camera_width"]
+            Config.CAMERA_DETECT_HEIGHT = profile["camera_height"]
+        else:
+            Config.CAMERA_WIDTH = profile["camera_width"]
+            Config.CAMERA_HEIGHT = profile["camera_height"]
+        Config.CAMERA_FRAMERATE = profile["camera_framerate"]
+        Config.INFERENCE_THREADS = profile["inference_threads"]
+        Config.LOOP_INTERVAL = profile["loop_interval"]
+        self.logger.info(
+            f"Applied tuning profile: {profile['camera_width']}x{profile['camera_height']}@{profile['camera_framerate']}fps, "
+            f"{profile['inference_threads']} inference thread(s), loop interval {profile['loop_interval']}s "
+            f"(est. {profile['estimated_latency_ms']:.0f} ms)."
+        )
+
+    def run(self, force: bool = False) -> Dict:
+        profile = None if force else self.load_cached()
+        if profile is None:
+            self.logger.info("Running startup calibration...")
+            profile = self.calibrate()
+            self.save(profile)
+        self.apply(profile)
+        return profile
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate inference threads, capture resolution and frame rate for this device.")
+    parser.add_argument("--force", action="store_true", help="Ignore the cached profile and recalibrate.")
+    args = parser.parse_args()
+    print(json.dumps(AutoTuner().run(force=args.force), indent=2))
@@ -1,38 +1,171 @@
 import cv2
+import time
 from ..config.config import Config
 from ..utils.logger import Logger
-from typing import Optional
+from ..utils.memory import buffer_pool
+from .fake_camera import FakeCaptureSource, fourcc_code, fourcc_name
+from typing import List, Optional, Tuple
 
 class Camera:
     """
     Handles camera initialization and frame retrieval using OpenCV VideoCapture.
     Assumes a standard USB camera or Raspberry Pi camera module is available as /dev/video0.
+
+    The pixel format is negotiated from CAMERA_FORMATS (e.g. YUYV avoids JPEG decoding
+    at low resolutions). With CAMERA_DUAL_STREAM enabled, the continuous stream runs at
+    CAMERA_DETECT_WIDTH x CAMERA_DETECT_HEIGHT, by default the detector's input size
+    (`detect_size`, so frames need no resize; 320x240 if unknown), and
+    get_still() grabs a high-resolution frame on demand for GPT-4o, either from
+    CAMERA_STILL_DEVICE or by briefly switching the main stream's resolution.
+    Set CAMERA_FAKE to use a synthetic V4L2-like source instead of real hardware.
+
+    In MEMORY_BUDGET_MODE frames are read into a rotation of MEMORY_CAMERA_SLOTS
+    pooled buffers, so a returned frame is overwritten MEMORY_CAMERA_SLOTS reads
+    later; copy it if it must live longer.
     """
 
-    def __init__(self):
+    def __init__(self, capture=None, still_capture=None, detect_size: Optional[Tuple[int, int]] = None):
         self.logger = Logger("Camera")
-        self.cap = cv2.VideoCapture(0)
+        self.dual_stream = Config.CAMERA_DUAL_STREAM
+        if capture is not None:
+            self.cap = capture
+        elif Config.CAMERA_FAKE:
+            self.logger.info("Using fake capture source.")
+            self.cap = FakeCaptureSource()
+        else:
+            self.cap = cv2.VideoCapture(Config.CAMERA_DEVICE)
         if not self.cap.isOpened():
             self.logger.error("Failed to open camera. Check if camera is connected and enabled.")
         else:
             self.logger.info("Camera opened successfully.")
 
+        self.still_cap = still_capture
+        self.still_fps = Config.CAMERA_FRAMERATE
+        if self.dual_stream and self.still_cap is None and Config.CAMERA_STILL_DEVICE >= 0:
+            self.still_cap = cv2.VideoCapture(Config.CAMERA_STILL_DEVICE)
+            if not self.still_cap.isOpened():
+                self.logger.warn(f"Could not open still device {Config.CAMERA_STILL_DEVICE}, will switch resolution for stills.")
+                self.still_cap = None
+
         # Set camera properties
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, Config.CAMERA_WIDTH)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, Config.CAMERA_HEIGHT)
-        self.cap.set(cv2.CAP_PROP_FPS, Config.CAMERA_FRAMERATE)
-        self.logger.debug(f"Camera configured: {Config.CAMERA_WIDTH}x{Config.CAMERA_HEIGHT}@{Config.CAMERA_FRAMERATE}fps")
+        self.format = self.negotiate_format(self.cap, Config.CAMERA_FORMATS)
+        if self.dual_stream:
+            detect_width, detect_height = detect_size or (320, 240)
+            self.width, self.height, self.fps = self.configure(self.cap,
+                                                               Config.CAMERA_DETECT_WIDTH or detect_width,
+                                                               Config.CAMERA_DETECT_HEIGHT or detect_height,
+                                                               Config.CAMERA_FRAMERATE)
+            if self.still_cap is not None:
+                self.negotiate_format(self.still_cap, Config.CAMERA_STILL_FORMATS)
+                self.still_fps = self.configure(self.still_cap, Config.CAMERA_WIDTH, Config.CAMERA_HEIGHT, Config.CAMERA_FRAMERATE)[2]
+        else:
+            self.width, self.height, self.fps = self.configure(self.cap, Config.CAMERA_WIDTH, Config.CAMERA_HEIGHT, Config.CAMERA_FRAMERATE)
+        self.logger.debug(f"Camera configured: {self.width}x{self.height}@{self.fps}fps ({self.format})")
+
+    def negotiate_format(self, cap, formats: List[str]) -> str:
+        """
+        Requests each pixel format in order and keeps the first one the driver accepts.
+        Returns the negotiated format name (the driver default if none is accepted).
+        """
+        for fourcc in formats:
+            cap.set(cv2.CAP_PROP_FOURCC, fourcc_code(fourcc))
+            if fourcc_name(cap.get(cv2.CAP_PROP_FOURCC)) == fourcc:
+                self.logger.debug(f"Negotiated pixel format {fourcc}.")
+                return fourcc
+        actual = fourcc_name(cap.get(cv2.CAP_PROP_FOURCC)).strip("\x00") or "default"
+        self.logger.warn(f"None of the formats {formats} accepted, using {actual}.")
+        return actual
+
+    def configure(self, cap, width: int, height: int, fps: int) -> Tuple[int, int, int]:
+        """
+        Requests a frame size and rate and returns what the driver actually delivers.
+        """
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        cap.set(cv2.CAP_PROP_FPS, fps)
+        actual = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or width,
+                  int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or height,
+                  int(cap.get(cv2.CAP_PROP_FPS)) or fps)
+        if actual[:2] != (width, height):
+            self.logger.info(f"Requested {width}x{height}, camera delivers {actual[0]}x{actual[1]}.")
+        return actual
 
     def get_frame(self) -> Optional[cv2.Mat]:
         """
         Captures a frame from the camera. If unsuccessful, returns None.
         """
-        ret, frame = self.cap.read()
+        if buffer_pool.enabled:
+            image = buffer_pool.ring("camera", (self.height, self.width, 3), slots=Config.MEMORY_CAMERA_SLOTS)
+            ret, frame = self.cap.read(image=image)
+        else:
+            ret, frame = self.cap.read()
         if not ret:
             self.logger.warn("Failed to read frame from camera. Retrying next cycle.")
             return None
         return frame
 
+    def measure_fps(self, frames: int = 30) -> float:
+        """
+        Reads `frames` frames from the main stream and returns the delivered frame rate.
+        """
+        self.get_frame()  # the first read can include stream start-up
+        start = time.perf_counter()
+        delivered = 0
+        for _ in range(frames):
+            if self.get_frame() is not None:
+                delivered += 1
+        elapsed = time.perf_counter() - start
+        return delivered / elapsed if elapsed > 0 else 0.0
+
+    def drain(self, cap, fps: float):
+        """
+        Discards the frames a capture queued while nobody was reading it, so the next
+        read() returns a fresh image. Queued frames come back at once; the first grab
+        that waits for about half a frame interval means the queue is empty. At least
+        CAMERA_STILL_WARMUP_FRAMES frames are dropped, at most that plus the driver's
+        buffer count.
+        """
+        buffered = int(cap.get(cv2.CAP_PROP_BUFFERSIZE)) or 4
+        interval = 1.0 / fps if fps > 0 else 0.0
+        for i in range(buffered + Config.CAMERA_STILL_WARMUP_FRAMES):
+            start = time.perf_counter()
+            if not cap.grab():
+                break
+            if i + 1 >= Config.CAMERA_STILL_WARMUP_FRAMES and time.perf_counter() - start >= 0.5 * interval:
+                break
+
+    def get_still(self) -> Optional[cv2.Mat]:
+        """
+        Captures a high-resolution still (CAMERA_WIDTH x CAMERA_HEIGHT) for cloud analysis.
+        Without dual-stream mode this is just the next frame of the main stream.
+        Returns None if the capture fails.
+        """
+        if not self.dual_stream:
+            return self.get_frame()
+
+        if self.still_cap is not None:
+            # The still device sits idle between stills, so its queue holds old frames.
+            self.drain(self.still_cap, self.still_fps)
+            ret, frame = self.still_cap.read()
+            if not ret:
+                self.logger.warn("Failed to read still from the still device.")
+                return None
+            return frame
+
+        # Switch the main stream to still resolution, drop the frames still in flight
+        # at the old size, grab one, then switch back.
+        still_fps = self.configure(self.cap, Config.CAMERA_WIDTH, Config.CAMERA_HEIGHT, Config.CAMERA_FRAMERATE)[2]
+        frame = None
+        try:
+            self.drain(self.cap, still_fps)
+            ret, frame = self.cap.read()
+            if not ret:
+                self.logger.warn("Failed to read high-resolution still.")
+                frame = None
+        finally:
+            self.configure(self.cap, self.width, self.height, self.fps)
+        return frame
+
     def release(self):
         """
         Releases the camera resource.
@@ -40,3 +173,5 @@ class Camera:
         if self.cap:
             self.cap.release()
             self.logger.info("Camera released.")
+        if self.still_cap is not None:
+            self.still_cap.release()
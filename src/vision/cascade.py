@@ -0,0 +1,111 @@
+import os
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..config.config import Config
+from ..utils.logger import Logger
+from .model import ObjectDetectionModel
+
+
+class ProximityCheck:
+    """
+    Result of one cascade step.
+
+    Attributes:
+        score: stage-one proximity score in [0, 1].
+        warning: True if something is judged to be too close.
+        uncertain: True if stage one could not decide on its own.
+        escalated: True if the full model was run for this frame.
+        objects: full-model detections when escalated, else stage-one detections (may be empty).
+    """
+
+    def __init__(self, score: float, warning: bool, uncertain: bool, escalated: bool,
+                 objects: Optional[List[Tuple[str, float, List[float]]]] = None):
+        self.score = score
+        self.warning = warning
+        self.uncertain = uncertain
+        self.escalated = escalated
+        self.objects = objects or []
+
+
+class ProximityScreener:
+    """
+    Stage one of the detector cascade: a very cheap, always-on proximity check.
+
+    If CASCADE_STAGE1_MODEL_PATH points to a tiny TFLite detector, its detections
+    are scored by box size relative to OBJECT_CLOSE_THRESHOLD weighted by confidence.
+    Otherwise a heuristic runs on a tiny grayscale copy of the frame: edge density
+    in the lower-central walking corridor combined with how fast it is growing
+    (an approaching obstacle fills more of the corridor from frame to frame).
+
+    The heuristic is not `decisive`: edge density does not tell a close, plain
+    wall or door (few edges) from open space, nor busy carpet or foliage from an
+    obstacle. Its scores only decide when to escalate, low-texture corridors
+    (below CASCADE_LOW_TEXTURE_DENSITY) are flagged as `low_texture`, and
+    warnings always need full-model confirmation.
+
+    Methods:
+        score(frame: np.ndarray) -> Tuple[float, List]:
+            Returns a proximity score in [0, 1] and any stage-one detections.
+    """
+
+    def __init__(self):
+        self.logger = Logger("ProximityScreener")
+        self.model: Optional[ObjectDetectionModel] = None
+        model_path = Config.CASCADE_STAGE1_MODEL_PATH
+        if model_path and os.path.exists(model_path):
+            try:
+                self.model = ObjectDetectionModel(
+                    model_path=model_path,
+                    labels_path=Config.CASCADE_STAGE1_LABELS_PATH or None,
+                    min_confidence=Config.CASCADE_STAGE1_MIN_CONFIDENCE
+                )
+                self.logger.info(f"Stage-one detector loaded from {model_path}.")
+            except Exception as e:
+                self.logger.warn(f"Could not load stage-one model, using edge heuristic instead: {e}")
+        else:
+            self.logger.info("No stage-one model configured, using edge heuristic.")
+
+        self.width = Config.CASCADE_HEURISTIC_WIDTH
+        self.previous_density: Optional[float] = None
+        self.low_texture = False
+
+    @property
+    def decisive(self) -> bool:
+        """
+        True if stage-one scores may issue or suppress warnings on their own (a stage-one model).
+        """
+        return self.model is not None
+
+    def score(self, frame: np.ndarray) -> Tuple[float, List[Tuple[str, float, List[float]]]]:
+        if self.model is not None:
+            objects = self.model.predict(frame)
+            best = 0.0
+            for _, confidence, (ymin, xmin, ymax, xmax) in objects:
+                area = (ymax - ymin) * (xmax - xmin)
+                best = max(best, min(1.0, area / Config.OBJECT_CLOSE_THRESHOLD) * confidence)
+            return best, objects
+        return self._heuristic_score(frame), []
+
+    def _heuristic_score(self, frame: np.ndarray) -> float:
+        h, w = frame.shape[:2]
+        small_h = max(1, int(h * self.width / w))
+        small = cv2.resize(frame, (self.width, small_h), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+
+        # Lower-central corridor: where obstacles in the walking path appear.
+        corridor = gray[small_h // 3:, self.width // 4: 3 * self.width // 4]
+        edges = cv2.Canny(corridor, 50, 150)
+        density = float(np.count_nonzero(edges)) / edges.size
+        self.low_texture = density < Config.CASCADE_LOW_TEXTURE_DENSITY
+
+        growth = 0.0
+        if self.previous_density is not None and self.previous_density > 0:
+            growth = max(0.0, density / self.previous_density - 1.0)
+        self.previous_density = density
+
+        # Dense texture close up plus rapid growth reads as an approaching obstacle.
+        score = density / Config.CASCADE_HEURISTIC_DENSITY + 0.5 * min(1.0, growth)
+        return float(min(1.0, score))
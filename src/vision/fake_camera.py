@@ -0,0 +1,136 @@
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..utils.logger import Logger
+
+
+def fourcc_code(fourcc: str) -> int:
+    return cv2.VideoWriter_fourcc(*fourcc)
+
+
+def fourcc_name(code: float) -> str:
+    code = int(code)
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+
+
+class FakeCaptureSource:
+    """
+    A V4L2-like stand-in for cv2.VideoCapture so Camera can be exercised off-device.
+
+    Like a real driver it only supports a fixed list of formats and frame sizes,
+    snaps requested sizes to the nearest supported one, and reports the negotiated
+    values through get(). Frames are a synthetic moving pattern delivered at the
+    configured frame rate; MJPG frames are really JPEG-encoded and decoded so the
+    decode cost difference between formats shows up in benchmarks.
+
+    Implements the subset of the VideoCapture API that Camera uses:
+    isOpened, set, get, read, grab, retrieve, release.
+    """
+
+    DEFAULT_MODES: Dict[str, List[Tuple[int, int]]] = {
+        "YUYV": [(160, 120), (320, 240), (640, 480)],
+        "MJPG": [(320, 240), (640, 480), (1280, 720), (1920, 1080)],
+        "GREY": [(320, 240), (640, 480)],
+    }
+
+    def __init__(self, modes: Optional[Dict[str, List[Tuple[int, int]]]] = None, max_fps: float = 30.0, realtime: bool = True):
+        self.logger = Logger("FakeCapture")
+        self.modes = modes or self.DEFAULT_MODES
+        self.max_fps = max_fps
+        self.realtime = realtime
+        self.fourcc = next(iter(self.modes))
+        self.width, self.height = self.modes[self.fourcc][0]
+        self.fps = max_fps
+        self.opened = True
+        self.frame_index = 0
+        self.last_frame_time = 0.0
+        self.frames_delivered = 0
+        self.grabbed: Optional[np.ndarray] = None
+
+    def isOpened(self) -> bool:
+        return self.opened
+
+    def _snap_size(self, width: int, height: int) -> Tuple[int, int]:
+        sizes = self.modes[self.fourcc]
+        return min(sizes, key=lambda s: abs(s[0] - width) + abs(s[1] - height))
+
+    def set(self, prop: int, value: float) -> bool:
+        if prop == cv2.CAP_PROP_FOURCC:
+            name = fourcc_name(value)
+            if name not in self.modes:
+                return False
+            self.fourcc = name
+            self.width, self.height = self._snap_size(self.width, self.height)
+            return True
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width, self.height = self._snap_size(int(value), self.height)
+            return True
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.width, self.height = self._snap_size(self.width, int(value))
+            return True
+        if prop == cv2.CAP_PROP_FPS:
+            self.fps = min(float(value), self.max_fps)
+            return True
+        return False
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FOURCC:
+            return float(fourcc_code(self.fourcc))
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        return 0.0
+
+    def _render(self) -> np.ndarray:
+        # A diagonal gradient that scrolls a little each frame, plus a moving square.
+        x = np.arange(self.width, dtype=np.uint16)[None, :]
+        y = np.arange(self.height, dtype=np.uint16)[:, None]
+        base = ((x + y + self.frame_index * 4) % 256).astype(np.uint8)
+        frame = cv2.merge([base, np.flipud(base), np.fliplr(base)])
+        size = max(4, self.width // 8)
+        left = (self.frame_index * 8) % max(1, self.width - size)
+        top = self.height // 2 - size // 2
+        frame[top:top + size, left:left + size] = 255
+        self.frame_index += 1
+
+        if self.fourcc == "MJPG":
+            ok, buffer = cv2.imencode(".jpg", frame)
+            frame = cv2.imdecode(buffer, cv2.IMREAD_COLOR) if ok else frame
+        elif self.fourcc == "GREY":
+            frame = cv2.cvtColor(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR)
+        return frame
+
+    def grab(self) -> bool:
+        if not self.opened:
+            return False
+        if self.realtime and self.fps > 0:
+            wait = self.last_frame_time + 1.0 / self.fps - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+        self.last_frame_time = time.monotonic()
+        self.grabbed = self._render()
+        self.frames_delivered += 1
+        return True
+
+    def retrieve(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        if self.grabbed is None:
+            return False, None
+        frame, self.grabbed = self.grabbed, None
+        if image is not None and image.shape == frame.shape:
+            image[...] = frame
+            return True, image
+        return True, frame
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def release(self):
+        self.opened = False
@@ -0,0 +1,181 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..config.config import Config
+from ..utils.logger import Logger
+from ..utils.memory import buffer_pool
+
+
+class FrameSelector:
+    """
+    Keeps a short history of recent camera frames and picks the sharpest,
+    best-exposed one for cloud uploads (GPT-4o scene analysis and reassurance).
+
+    Each frame is scored on a downscaled grayscale copy using the variance of
+    the Laplacian (a cheap blur measure) weighted by an exposure factor that
+    penalizes very dark, very bright or clipped images.
+
+    Methods:
+        add_frame(frame: np.ndarray, timestamp: Optional[float]) -> float:
+            Scores the frame, stores it in the history and returns its score.
+        select(max_age: Optional[float], wait: Optional[float]) -> Optional[np.ndarray]:
+            Returns the best frame from the last `max_age` seconds, optionally
+            waiting up to `wait` seconds for a frame above FRAME_SELECTOR_MIN_SHARPNESS.
+    """
+
+    def __init__(self, frame_source: Optional[Callable[[], Optional[np.ndarray]]] = None):
+        self.logger = Logger("FrameSelector")
+        self.frame_source = frame_source
+        self.window = Config.FRAME_SELECTOR_WINDOW
+        self.min_sharpness = Config.FRAME_SELECTOR_MIN_SHARPNESS
+        self.scale_width = Config.FRAME_SELECTOR_SCALE_WIDTH
+        max_frames = Config.FRAME_SELECTOR_MAX_FRAMES
+        if Config.MEMORY_BUDGET_MODE:
+            # Frames are pooled camera buffers: keep fewer than the pool's rotation, leaving
+            # room for the frame currently being processed and the one being read.
+            max_frames = max(1, min(max_frames, Config.MEMORY_CAMERA_SLOTS - 2))
+        self.frames: Deque[Tuple[float, float, np.ndarray]] = deque(maxlen=max_frames)
+        self.lock = threading.Lock()
+
+    def score_frame(self, frame: np.ndarray) -> float:
+        """
+        Returns a sharpness/exposure score for the frame. Higher is better.
+        A score of 0.0 means the frame is unusable (empty, black or fully clipped).
+        """
+        if frame is None or frame.size == 0:
+            return 0.0
+
+        # Scratch images come from the buffer pool so scoring allocates nothing per frame in memory budget mode.
+        h, w = frame.shape[:2]
+        if w > self.scale_width:
+            scaled_h = max(1, int(h * self.scale_width / w))
+            small = buffer_pool.buffer("selector", (scaled_h, self.scale_width) + frame.shape[2:], frame.dtype, tag="small")
+            cv2.resize(frame, (self.scale_width, scaled_h), dst=small, interpolation=cv2.INTER_AREA)
+        else:
+            small = frame
+        if small.ndim == 3:
+            gray = buffer_pool.buffer("selector", small.shape[:2], small.dtype, tag="gray")
+            cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=gray)
+        else:
+            gray = small
+
+        laplacian = buffer_pool.buffer("selector", gray.shape, np.float32, tag="laplacian")
+        cv2.Laplacian(gray, cv2.CV_32F, dst=laplacian)
+        sharpness = float(laplacian.var())
+
+        # Exposure factor: 1.0 for a well exposed frame, falling towards 0.0 as the
+        # mean brightness drifts to either end or many pixels are clipped.
+        mean = float(gray.mean())
+        hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+        clipped = float(hist[:6].sum() + hist[250:].sum()) / gray.size
+        exposure = max(0.0, 1.0 - abs(mean - 128.0) / 128.0) * (1.0 - clipped)
+        return sharpness * exposure
+
+    def add_frame(self, frame: np.ndarray, timestamp: Optional[float] = None) -> float:
+        """
+        Scores the frame and appends it to the history.
+        Frames older than the selection window are discarded on the next selection.
+        """
+        if frame is None:
+            return 0.0
+        score = self.score_frame(frame)
+        with self.lock:
+            self.frames.append((timestamp if timestamp is not None else time.monotonic(), score, frame))
+        return score
+
+    def _best_recent(self, max_age: float) -> Tuple[float, Optional[np.ndarray]]:
+        cutoff = time.monotonic() - max_age
+        best_score, best_frame = -1.0, None
+        with self.lock:
+            # The newest frame is kept even when stale: an old image beats no image.
+            while len(self.frames) > 1 and self.frames[0][0] < cutoff:
+                self.frames.popleft()
+            for _, score, frame in self.frames:
+                if score > best_score:
+                    best_score, best_frame = score, frame
+        return best_score, best_frame
+
+    def _hold(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Returns a frame that survives further camera reads: a copy into the selector's
+        pooled buffer (valid until the next select) in memory budget mode, else the frame.
+        """
+        if not buffer_pool.enabled:
+            return frame
+        held = buffer_pool.buffer("selector", frame.shape, frame.dtype, tag="best")
+        np.copyto(held, frame)
+        return held
+
+    def select(self, max_age: Optional[float] = None, wait: Optional[float] = None) -> Optional[np.ndarray]:
+        """
+        Returns the best frame captured within the last `max_age` seconds
+        (FRAME_SELECTOR_WINDOW by default). If every buffered frame is older than
+        that (e.g. after blocking speech), the newest one is used.
+
+        If `wait` (FRAME_SELECTOR_WAIT by default) is positive and no recent frame
+        reaches FRAME_SELECTOR_MIN_SHARPNESS, new frames are pulled from the frame
+        source until a sharp one arrives or the wait expires. Returns None only if
+        no frame is available at all.
+        """
+        max_age = self.window if max_age is None else max_age
+        wait = Config.FRAME_SELECTOR_WAIT if wait is None else wait
+
+        best_score, best_frame = self._best_recent(max_age)
+        if best_score >= self.min_sharpness or wait <= 0 or self.frame_source is None:
+            if best_frame is not None:
+                self.logger.debug(f"Selected frame with score {best_score:.1f}.")
+            return best_frame
+
+        # Pooled camera buffers are recycled as frames are pulled, so in memory budget
+        # mode the best frame so far is kept in a pooled copy instead.
+        if best_frame is not None:
+            best_frame = self._hold(best_frame)
+        deadline = time.monotonic() + wait
+        while time.monotonic() < deadline:
+            frame = self.frame_source()
+            if frame is None:
+                time.sleep(0.01)
+                continue
+            score = self.add_frame(frame)
+            if score > best_score:
+                best_score, best_frame = score, self._hold(frame)
+            if score >= self.min_sharpness:
+                break
+
+        if best_score < self.min_sharpness:
+            self.logger.debug(f"No sharp frame within {wait:.2f}s, using best available (score {best_score:.1f}).")
+        return best_frame
+
+    def benchmark(self, frame: np.ndarray, iterations: int = 200) -> Dict[str, float]:
+        """
+        Measures the per-frame scoring cost on the given frame.
+        Returns mean, median and 95th percentile timings in milliseconds.
+        """
+        timings = np.empty(iterations, dtype=np.float64)
+        for i in range(iterations):
+            start = time.perf_counter()
+            self.score_frame(frame)
+            timings[i] = (time.perf_counter() - start) * 1000.0
+        result = {
+            "iterations": float(iterations),
+            "mean_ms": float(timings.mean()),
+            "median_ms": float(np.median(timings)),
+            "p95_ms": float(np.percentile(timings, 95)),
+        }
+        self.logger.info(
+            f"Frame scoring benchmark ({frame.shape[1]}x{frame.shape[0]}): "
+            f"mean {result['mean_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms over {iterations} frames."
+        )
+        return result
+
+
+if __name__ == "__main__":
+    # Benchmark scoring on a synthetic frame at the configured camera resolution.
+    selector = FrameSelector()
+    test_frame = np.random.randint(0, 256, (Config.CAMERA_HEIGHT, Config.CAMERA_WIDTH, 3), dtype=np.uint8)
+    selector.benchmark(test_frame)
@@ -3,22 +3,34 @@ import numpy as np
 import cv2
 from ..config.config import Config
 from ..utils.logger import Logger
-from typing import List, Tuple
+from ..utils.memory import buffer_pool
+from .regions import Region, crop, map_boxes_to_frame, non_max_suppression
+from typing import Dict, List, Optional, Sequence, Tuple
 
 class ObjectDetectionModel:
     """
     Loads a TFLite object detection model and performs inference on a frame.
-    Uses the model specified in Config.MODEL_PATH and Config.LABELS_PATH.
+    Uses the model specified in Config.MODEL_PATH and Config.LABELS_PATH unless
+    other paths are given (e.g. the stage-one model of the detector cascade).
 
     Methods:
         predict(frame: np.ndarray) -> List[Tuple[str, float, List[float]]]:
             Returns a list of (label, score, bbox) for detected objects.
+        predict_regions(frame: np.ndarray, regions: Sequence[Region]) -> List[Tuple[str, float, List[float]]]:
+            Runs the detector on each region crop (batched into one invoke when the
+            model allows it) and merges the results with cross-region NMS.
+        predict_batch(frames: Sequence[np.ndarray]) -> List[List[Tuple[str, float, List[float]]]]:
+            Runs several whole frames through one batched invoke (offline analysis, gateway).
     """
 
-    def __init__(self):
+    def __init__(self, model_path: Optional[str] = None, labels_path: Optional[str] = None,
+                 min_confidence: Optional[float] = None, num_threads: Optional[int] = None):
         self.logger = Logger("ObjectDetectionModel")
+        self.model_path = model_path or Config.MODEL_PATH
+        self.min_confidence = Config.MIN_CONFIDENCE if min_confidence is None else min_confidence
+        self.num_threads = num_threads or Config.INFERENCE_THREADS
         try:
-            self.interpreter = tflite.Interpreter(model_path=Config.MODEL_PATH)
+            self.interpreter = self._load_interpreter()
             self.interpreter.allocate_tensors()
         except Exception as e:
             self.logger.error(f"Failed to load TFLite model: {e}")
@@ -26,7 +38,12 @@ class ObjectDetectionModel:
 
         self.input_details = self.interpreter.get_input_details()
         self.output_details = self.interpreter.get_output_details()
-        self.labels = self.load_labels(Config.LABELS_PATH)
+        self.labels = self.load_labels(labels_path or Config.LABELS_PATH)
+        self.batching_supported = True
+        self.inference_failures = 0  # images whose invoke failed, they are reported as having no detections
+        # Batched invokes run on separate interpreters, one per batch size, so the
+        # per-frame interpreter stays at batch 1 and is never re-allocated.
+        self.batch_interpreters: Dict[int, Tuple[tflite.Interpreter, List[Dict], List[Dict]]] = {}
         self.logger.info("Object detection model loaded successfully.")
 
     def load_labels(self, label_path: str) -> List[str]:
@@ -43,6 +60,110 @@ class ObjectDetectionModel:
             self.logger.error(f"Error loading labels: {e}")
             return []
 
+    @property
+    def input_size(self) -> Tuple[int, int]:
+        """
+        Model input (width, height).
+        """
+        input_shape = self.input_details[0]['shape']
+        return int(input_shape[2]), int(input_shape[1])
+
+    def _load_interpreter(self) -> tflite.Interpreter:
+        if self.num_threads > 0:
+            return tflite.Interpreter(model_path=self.model_path, num_threads=self.num_threads)
+        return tflite.Interpreter(model_path=self.model_path)
+
+    def _disable_batching(self, reason: str):
+        self.logger.warn(f"Model does not support batched inference, falling back to sequential invokes: {reason}")
+        self.batching_supported = False
+        self.batch_interpreters.clear()
+
+    def _batch_interpreter(self, batch_size: int) -> Optional[Tuple[tflite.Interpreter, List[Dict], List[Dict]]]:
+        """
+        Returns (interpreter, input details, output details) with the input batch fixed
+        at `batch_size`, created on first use. Many SSD models with fused post-processing
+        accept the resize but keep batch-1 outputs; those are detected here and batching
+        is disabled for the lifetime of the model. Returns None if batching is unsupported.
+        """
+        if not self.batching_supported:
+            return None
+        if batch_size in self.batch_interpreters:
+            return self.batch_interpreters[batch_size]
+        width, height = self.input_size
+        try:
+            interpreter = self._load_interpreter()
+            interpreter.resize_tensor_input(self.input_details[0]['index'], [batch_size, height, width, 3])
+            interpreter.allocate_tensors()
+            output_details = interpreter.get_output_details()
+            output_batches = [int(detail['shape'][0]) for detail in output_details[:3]]
+            if any(batch != batch_size for batch in output_batches):
+                raise ValueError(f"outputs keep batch sizes {output_batches} for an input batch of {batch_size}")
+        except Exception as e:
+            self._disable_batching(str(e))
+            return None
+        self.batch_interpreters[batch_size] = (interpreter, interpreter.get_input_details(), output_details)
+        return self.batch_interpreters[batch_size]
+
+    def _invoke(self, input_data: np.ndarray, interpreter: Optional[tflite.Interpreter] = None,
+                input_details: Optional[List[Dict]] = None, output_details: Optional[List[Dict]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Runs an interpreter (the batch-1 one by default) on a (batch, height, width, 3) uint8 array.
+        Returns (boxes, classes, scores) with a leading batch dimension.
+        Raises on inference failure.
+        """
+        interpreter = interpreter or self.interpreter
+        input_details = input_details or self.input_details
+        output_details = output_details or self.output_details
+        interpreter.set_tensor(input_details[0]['index'], input_data)
+        interpreter.invoke()
+        boxes = interpreter.get_tensor(output_details[0]['index'])
+        classes = interpreter.get_tensor(output_details[1]['index'])
+        scores = interpreter.get_tensor(output_details[2]['index'])
+        return boxes, classes, scores
+
+    def _invoke_many(self, batch: np.ndarray, count: int,
+                     skip_failures: bool = False) -> List[Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]]:
+        """
+        Runs the first `count` images of `batch` (any rows after that are padding) and
+        returns (boxes, classes, scores) per image. Uses one batched invoke when the model
+        supports it; if that invoke fails or returns a different batch size, batching is
+        disabled and the images are rerun one by one. Raises if a per-image invoke fails,
+        unless `skip_failures` is set: the image's entry is then None.
+        """
+        if batch.shape[0] > 1:
+            batched = self._batch_interpreter(batch.shape[0])
+            if batched is not None:
+                try:
+                    boxes, classes, scores = self._invoke(batch, *batched)
+                    if not boxes.shape[0] == classes.shape[0] == scores.shape[0] == batch.shape[0]:
+                        raise ValueError(f"batched invoke of {batch.shape[0]} returned {boxes.shape[0]} result(s)")
+                    return [(boxes[i], classes[i], scores[i]) for i in range(count)]
+                except Exception as e:
+                    self._disable_batching(str(e))
+        outputs = []
+        for i in range(count):
+            try:
+                boxes, classes, scores = self._invoke(batch[i:i + 1])
+            except Exception as e:
+                if not skip_failures:
+                    raise
+                self.logger.error(f"Model inference failed for image {i + 1} of {count}: {e}")
+                self.inference_failures += 1
+                outputs.append(None)
+                continue
+            outputs.append((boxes[0].copy(), classes[0].copy(), scores[0].copy()))
+        return outputs
+
+    def _to_results(self, boxes: np.ndarray, classes: np.ndarray, scores: np.ndarray) -> List[Tuple[str, float, List[float]]]:
+        results = []
+        for i, score in enumerate(scores):
+            if score > self.min_confidence:
+                class_id = int(classes[i])
+                label = self.labels[class_id] if class_id < len(self.labels) else "Unknown"
+                box = boxes[i].tolist()
+                results.append((label, float(score), box))
+        return results
+
     def predict(self, frame: np.ndarray) -> List[Tuple[str, float, List[float]]]:
         """
         Perform object detection on the provided frame.
@@ -53,32 +174,87 @@ class ObjectDetectionModel:
             self.logger.warn("Received empty frame for prediction.")
             return []
 
-        input_shape = self.input_details[0]['shape']
-        height, width = input_shape[1], input_shape[2]
-
-        # Resize frame to model input size
-        frame_resized = cv2.resize(frame, (width, height))
-        input_data = np.expand_dims(frame_resized, axis=0).astype('uint8')
+        width, height = self.input_size
 
-        self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
+        # Resize frame to model input size (into a pooled buffer), unless the camera already delivers it
+        if frame.shape[0] == height and frame.shape[1] == width:
+            input_data = np.expand_dims(frame, axis=0).astype('uint8', copy=False)
+        else:
+            input_data = buffer_pool.buffer("detector", (1, height, width, 3), tag=self.model_path)
+            cv2.resize(frame, (width, height), dst=input_data[0])
 
         try:
-            self.interpreter.invoke()
+            boxes, classes, scores = self._invoke(input_data)
         except Exception as e:
             self.logger.error(f"Model inference failed: {e}")
+            self.inference_failures += 1
             return []
 
-        boxes = self.interpreter.get_tensor(self.output_details[0]['index'])[0]
-        classes = self.interpreter.get_tensor(self.output_details[1]['index'])[0]
-        scores = self.interpreter.get_tensor(self.output_details[2]['index'])[0]
+        results = self._to_results(boxes[0], classes[0], scores[0])
+        self.logger.debug(f"Detected {len(results)} objects above confidence {self.min_confidence}.")
+        return results
 
-        results = []
-        for i, score in enumerate(scores):
-            if score > Config.MIN_CONFIDENCE:
-                class_id = int(classes[i])
-                label = self.labels[class_id] if class_id < len(self.labels) else "Unknown"
-                box = boxes[i].tolist()
-                results.append((label, float(score), box))
+    def predict_batch(self, frames: Sequence[np.ndarray]) -> List[List[Tuple[str, float, List[float]]]]:
+        """
+        Perform object detection on several frames at once, batched into one invoke
+        when the model allows it. Returns one predict()-style result list per frame;
+        a frame whose invoke fails gets an empty list (see `inference_failures`).
+        """
+        if not frames:
+            return []
+        width, height = self.input_size
+        # One pooled input buffer per batch size, like the batch interpreters, so
+        # varying batch sizes (e.g. on the gateway) do not reallocate it.
+        batch = buffer_pool.buffer("detector", (len(frames), height, width, 3), tag=f"{self.model_path}:batch{len(frames)}")
+        for i, frame in enumerate(frames):
+            if frame.shape[0] == height and frame.shape[1] == width:
+                batch[i] = frame
+            else:
+                cv2.resize(frame, (width, height), dst=batch[i])
+
+        outputs = self._invoke_many(batch, len(frames), skip_failures=True)
+        return [self._to_results(*output) if output is not None else [] for output in outputs]
+
+    def predict_regions(self, frame: np.ndarray, regions: Sequence[Region]) -> List[Tuple[str, float, List[float]]]:
+        """
+        Perform object detection on several regions of the frame (e.g. a central
+        corridor crop and its tiles). Boxes are mapped back to full-frame normalized
+        coordinates and duplicates across overlapping regions are removed with NMS.
+        Returns the same format as predict().
+        """
+        if frame is None:
+            self.logger.warn("Received empty frame for prediction.")
+            return []
+        if not regions:
+            return []
+
+        width, height = self.input_size
+        batch = buffer_pool.buffer("detector", (len(regions), height, width, 3), tag=self.model_path + ":regions")
+        for i, region in enumerate(regions):
+            cv2.resize(crop(frame, region), (width, height), dst=batch[i])
 
-        self.logger.debug(f"Detected {len(results)} objects above confidence {Config.MIN_CONFIDENCE}.")
+        all_boxes, all_classes, all_scores = [], [], []
+        try:
+            outputs = self._invoke_many(batch, len(regions))
+        except Exception as e:
+            self.logger.error(f"Model inference failed: {e}")
+            self.inference_failures += 1
+            return []
+
+        for region, (boxes, classes, scores) in zip(regions, outputs):
+            mask = scores > self.min_confidence
+            if not np.any(mask):
+                continue
+            all_boxes.append(map_boxes_to_frame(boxes[mask], region))
+            all_classes.append(classes[mask])
+            all_scores.append(scores[mask])
+
+        if not all_boxes:
+            return []
+        boxes = np.concatenate(all_boxes)
+        classes = np.concatenate(all_classes)
+        scores = np.concatenate(all_scores)
+        keep = non_max_suppression(boxes, scores, classes, Config.TILE_NMS_IOU)
+        results = self._to_results(boxes[keep], classes[keep], scores[keep])
+        self.logger.debug(f"Detected {len(results)} objects across {len(regions)} regions.")
         return results
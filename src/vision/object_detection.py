@@ -1,7 +1,11 @@
 from ..utils.logger import Logger
 from .model import ObjectDetectionModel
+from .cascade import ProximityCheck, ProximityScreener
+from .regions import FULL_FRAME, Region, box_iou, make_tiles, parse_region
 from ..config.config import Config
-from typing import List, Tuple
+from ..utils.telemetry import telemetry
+from typing import Dict, List, Optional, Sequence, Tuple
+import time
 import numpy as np
 
 class ObjectDetector:
@@ -9,21 +13,106 @@ class ObjectDetector:
     Wraps around ObjectDetectionModel to provide additional logic:
     - Retrieves detected objects
     - Checks if any object is too close to the user based on bounding box area.
+
+    INFERENCE_MODE selects how the frame is fed to the model:
+    - "full": the whole frame is squeezed into the model input (default).
+    - "corridor": the central walking corridor (CORRIDOR_REGION) at full detail,
+      plus the whole frame if CORRIDOR_INCLUDE_FULL_FRAME is set.
+    - "tiled": the corridor split into TILE_ROWS x TILE_COLS overlapping tiles.
+    In region modes the number of regions per frame is trimmed (peripheral first)
+    to keep inference within INFERENCE_LATENCY_TARGET_MS.
+
+    With CASCADE_ENABLED, a cheap stage-one screener (tiny model or edge heuristic)
+    runs on every frame via check_proximity(), and the full model is only invoked
+    there when stage one is uncertain (see CASCADE_ESCALATE_SCORE/CASCADE_WARN_SCORE)
+    or has not run for CASCADE_MAX_UNCHECKED seconds.
     """
 
+    MODES = ("full", "corridor", "tiled")
+
     def __init__(self):
         self.logger = Logger("ObjectDetector")
         self.model = ObjectDetectionModel()
+        self.mode = Config.INFERENCE_MODE if Config.INFERENCE_MODE in self.MODES else "full"
+        if self.mode != Config.INFERENCE_MODE:
+            self.logger.warn(f"Unknown INFERENCE_MODE '{Config.INFERENCE_MODE}', using full-frame inference.")
+        self.corridor = parse_region(Config.CORRIDOR_REGION)
+        self.latency_target = Config.INFERENCE_LATENCY_TARGET_MS / 1000.0
+        # Exponential moving average of inference cost per region, in seconds.
+        self.region_cost: Optional[float] = None
+        self.screener = ProximityScreener() if Config.CASCADE_ENABLED else None
+        self.last_escalation = float("-inf")
+        self.frames_processed = 0
+
+    def set_num_threads(self, num_threads: int):
+        """
+        Reloads the full model with a different inference thread count (TFLite fixes it at load time).
+        """
+        if num_threads == self.model.num_threads:
+            return
+        try:
+            self.model = ObjectDetectionModel(num_threads=num_threads)
+            self.region_cost = None
+            self.logger.info(f"Detector reloaded with {num_threads} inference thread(s).")
+        except Exception as e:
+            self.logger.error(f"Failed to reload detector with {num_threads} threads: {e}")
 
-    def detect_objects(self, frame: np.ndarray) -> List[Tuple[str, float, List[float]]]:
+    def regions_for_mode(self, mode: str) -> List[Region]:
+        """
+        Returns the regions to run for a mode, highest priority first.
+        """
+        if mode == "corridor":
+            regions = [self.corridor]
+        elif mode == "tiled":
+            regions = make_tiles(self.corridor, Config.TILE_ROWS, Config.TILE_COLS, Config.TILE_OVERLAP)
+        else:
+            return [FULL_FRAME]
+        if Config.CORRIDOR_INCLUDE_FULL_FRAME:
+            regions.append(FULL_FRAME)
+        return regions
+
+    def _budgeted(self, regions: List[Region]) -> List[Region]:
+        if self.region_cost is None or self.latency_target <= 0:
+            return regions
+        allowed = max(1, int(self.latency_target / self.region_cost))
+        if allowed < len(regions):
+            self.logger.debug(f"Latency budget allows {allowed}/{len(regions)} regions.")
+        return regions[:allowed]
+
+    def detect_objects(self, frame: np.ndarray, mode: Optional[str] = None) -> List[Tuple[str, float, List[float]]]:
         """
         Detects objects in the given frame using the loaded TFLite model.
-        Returns a list of (label, score, [ymin,xmin,ymax,xmax]) normalized between 0 and 1.
+        Returns a list of (label, score, [ymin,xmin,ymax,xmax]) normalized between 0 and 1,
+        always relative to the full frame.
         """
         if frame is None:
             self.logger.warn("No frame provided to detect_objects, returning empty list.")
             return []
-        return self.model.predict(frame)
+        mode = mode or self.mode
+        if mode == "full":
+            results = self.model.predict(frame)
+        else:
+            regions = self._budgeted(self.regions_for_mode(mode))
+            start = time.perf_counter()
+            results = self.model.predict_regions(frame, regions)
+            cost = (time.perf_counter() - start) / len(regions)
+            self.region_cost = cost if self.region_cost is None else 0.8 * self.region_cost + 0.2 * cost
+
+        self.frames_processed += 1
+        for label, score, box in results:
+            telemetry.record("detections", frame=self.frames_processed, label=label, score=score, box=box)
+        return results
+
+    def detect_batch(self, frames: Sequence[np.ndarray], mode: Optional[str] = None) -> List[List[Tuple[str, float, List[float]]]]:
+        """
+        Detects objects in several frames (offline analysis, gateway). Full-frame mode
+        batches the frames into one invoke; region modes
+        batch the regions of each frame.
+        """
+        mode = mode or self.mode
+        if mode == "full":
+            return self.model.predict_batch(frames)
+        return [self.detect_objects(frame, mode) for frame in frames]
 
     def is_object_too_close(self, frame: np.ndarray, objects: List[Tuple[str, float, List[float]]]) -> bool:
         """
@@ -48,3 +137,139 @@ class ObjectDetector:
                 self.logger.debug(f"Object '{label}' too close, box area fraction: {box_area/frame_area:.2f}")
                 return True
         return False
+
+    def check_proximity(self, frame: np.ndarray, timestamp: Optional[float] = None) -> ProximityCheck:
+        """
+        Runs the cascade for proximity warnings:
+        - a stage-one model scoring >= CASCADE_WARN_SCORE warns without running the full model;
+        - the full model is run (at most once per CASCADE_ESCALATION_COOLDOWN seconds) when
+          stage one scores >= CASCADE_ESCALATE_SCORE, when the edge heuristic sees a
+          low-texture corridor, and whenever it has not run for CASCADE_MAX_UNCHECKED seconds;
+        - otherwise: clear.
+        The edge heuristic never warns on its own; its high scores are confirmed by the full model.
+        Without CASCADE_ENABLED the full model is run on every call.
+        `timestamp` (seconds) defaults to the monotonic clock; replays pass frame times.
+        """
+        if frame is None:
+            return ProximityCheck(0.0, False, False, False)
+        if self.screener is None:
+            objects = self.detect_objects(frame)
+            return ProximityCheck(1.0 if objects else 0.0, self.is_object_too_close(frame, objects), False, True, objects)
+
+        score, stage1_objects = self.screener.score(frame)
+        if self.screener.decisive and score >= Config.CASCADE_WARN_SCORE:
+            return ProximityCheck(score, True, False, False, stage1_objects)
+
+        now = time.monotonic() if timestamp is None else timestamp
+        since_escalation = now - self.last_escalation
+        uncertain = score >= Config.CASCADE_ESCALATE_SCORE or self.screener.low_texture
+        if not uncertain and since_escalation < Config.CASCADE_MAX_UNCHECKED:
+            return ProximityCheck(score, False, False, False, stage1_objects)
+        if since_escalation < Config.CASCADE_ESCALATION_COOLDOWN:
+            return ProximityCheck(score, False, uncertain, False, stage1_objects)
+        self.last_escalation = now
+        if uncertain:
+            self.logger.debug(f"Stage one uncertain (score {score:.2f}), escalating to full model.")
+        objects = self.detect_objects(frame)
+        return ProximityCheck(score, self.is_object_too_close(frame, objects), uncertain, True, objects)
+
+    def benchmark_cascade(self, frames: Sequence[np.ndarray], fps: float = 10.0) -> Dict[str, float]:
+        """
+        Replays frames through (a) the full model on every frame and (b) the cascade,
+        and reports per-frame wall-clock latency, process CPU time, the escalation
+        rate and how many of the full model's warnings the cascade also raised.
+        Frames are timestamped at `fps` so the escalation cooldown behaves as it
+        would live, however fast the replay runs.
+        """
+        if self.screener is None:
+            self.screener = ProximityScreener()
+
+        baseline_warnings = []
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        for frame in frames:
+            baseline_warnings.append(self.is_object_too_close(frame, self.detect_objects(frame)))
+        baseline_wall = time.perf_counter() - wall_start
+        baseline_cpu = time.process_time() - cpu_start
+
+        self.screener.previous_density = None
+        self.last_escalation = float("-inf")
+        escalations = caught = 0
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        for i, (frame, expected) in enumerate(zip(frames, baseline_warnings)):
+            check = self.check_proximity(frame, timestamp=i / fps)
+            escalations += int(check.escalated)
+            caught += int(expected and check.warning)
+        cascade_wall = time.perf_counter() - wall_start
+        cascade_cpu = time.process_time() - cpu_start
+
+        n = float(max(1, len(frames)))
+        expected_total = sum(baseline_warnings)
+        report = {
+            "frames": float(len(frames)),
+            "full_ms_per_frame": baseline_wall * 1000.0 / n,
+            "full_cpu_ms_per_frame": baseline_cpu * 1000.0 / n,
+            "cascade_ms_per_frame": cascade_wall * 1000.0 / n,
+            "cascade_cpu_ms_per_frame": cascade_cpu * 1000.0 / n,
+            "escalation_rate": escalations / n,
+            "warning_recall": caught / float(expected_total) if expected_total else float("nan"),
+        }
+        self.logger.info(
+            f"Cascade: {report['cascade_ms_per_frame']:.1f} ms/frame ({report['cascade_cpu_ms_per_frame']:.1f} ms CPU) vs "
+            f"full model {report['full_ms_per_frame']:.1f} ms/frame ({report['full_cpu_ms_per_frame']:.1f} ms CPU); "
+            f"escalation rate {report['escalation_rate']:.2f}, warning recall {report['warning_recall']:.2f}"
+        )
+        return report
+
+    def benchmark_modes(self,
+                        samples: Sequence[Tuple[np.ndarray, Optional[List[Tuple[str, List[float]]]]]],
+                        modes: Sequence[str] = MODES,
+                        iou_threshold: float = 0.5) -> Dict[str, Dict[str, float]]:
+        """
+        Compares inference modes on a list of (frame, ground_truth) samples, where
+        ground_truth is a list of (label, [ymin, xmin, ymax, xmax]) or None.
+        Reports latency (mean/p95 ms) and, when ground truth is given, recall and
+        precision at the IoU threshold. The latency budget is ignored so every
+        mode runs all of its regions.
+        """
+        report = {}
+        saved_target = self.latency_target
+        self.latency_target = 0.0
+        try:
+            for mode in modes:
+                timings = []
+                true_pos = false_pos = total_truth = 0
+                for frame, truth in samples:
+                    start = time.perf_counter()
+                    detections = self.detect_objects(frame, mode)
+                    timings.append((time.perf_counter() - start) * 1000.0)
+                    if truth is None:
+                        continue
+                    total_truth += len(truth)
+                    matched = np.zeros(len(truth), dtype=bool)
+                    truth_boxes = np.array([box for _, box in truth], dtype=np.float32).reshape(-1, 4)
+                    for label, _, box in detections:
+                        candidates = np.array([t_label == label for t_label, _ in truth], dtype=bool) & ~matched
+                        if not np.any(candidates):
+                            false_pos += 1
+                            continue
+                        ious = np.where(candidates, box_iou(np.asarray(box, dtype=np.float32), truth_boxes), 0.0)
+                        best = int(np.argmax(ious))
+                        if ious[best] >= iou_threshold:
+                            matched[best] = True
+                            true_pos += 1
+                        else:
+                            false_pos += 1
+                values = np.asarray(timings) if timings else np.zeros(1)
+                report[mode] = {
+                    "mean_ms": float(values.mean()),
+                    "p95_ms": float(np.percentile(values, 95)),
+                    "recall": true_pos / float(total_truth) if total_truth else float("nan"),
+                    "precision": true_pos / float(true_pos + false_pos) if (true_pos + false_pos) else float("nan"),
+                }
+                self.logger.info(
+                    f"Mode {mode}: mean {report[mode]['mean_ms']:.1f} ms, p95 {report[mode]['p95_ms']:.1f} ms, "
+                    f"recall {report[mode]['recall']:.2f}, precision {report[mode]['precision']:.2f}"
+                )
+        finally:
+            self.latency_target = saved_target
+        return report
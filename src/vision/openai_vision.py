@@ -1,10 +1,12 @@
-import base64
-import cv2
+import json
 import openai
+import threading
 from pydantic import BaseModel, Field, ValidationError
 from typing import List, Optional, Dict, Any
 from ..config.config import Config
 from ..utils.logger import Logger
+from ..utils.imaging import encode_jpeg_base64
+from ..utils.telemetry import telemetry
 import time
 
 class DetectedObject(BaseModel):
@@ -26,18 +28,21 @@ class OpenAIVision:
     def __init__(self):
         self.logger = Logger("OpenAIVision")
         openai.api_key = Config.OPENAI_API_KEY
+        if Config.OPENAI_API_BASE:
+            openai.api_base = Config.OPENAI_API_BASE
         self.max_retries = 3
         self.retry_delay = 2.0
+        # API requests made by the current thread, retries included (read by ScenePrefetcher).
+        self.attempts = threading.local()
 
     def encode_image(self, frame) -> str:
         """
         Encodes the image frame to base64 for sending to GPT-4o.
         """
-        ret, buffer = cv2.imencode('.jpg', frame)
-        if not ret:
+        image_b64 = encode_jpeg_base64(frame)
+        if not image_b64:
             self.logger.warn("Failed to encode frame to JPEG, returning empty string.")
-            return ""
-        return base64.b64encode(buffer).decode('utf-8')
+        return image_b64
 
     def analyze_frame(self, frame) -> Optional[VisionOutput]:
         """
@@ -92,38 +97,55 @@ class OpenAIVision:
         }
 
         for attempt in range(self.max_retries):
+            start = time.perf_counter()
             try:
                 self.logger.debug("Sending image to GPT-4o.")
+                self.attempts.count = getattr(self.attempts, "count", 0) + 1
                 response = openai.ChatCompletion.create(
                     model=Config.OPENAI_MODEL,
                     messages=user_message,
                     max_tokens=500,
                     response_format={"type":"json_schema", "json_schema":{"strict":True,"schema":schema}}
                 )
+                elapsed = time.perf_counter() - start
 
                 message = response.choices[0].message
                 if message.get("refusal"):
                     self.logger.warn("Model refused the request.")
+                    telemetry.record("api", client="vision", outcome="refused", attempt=attempt + 1, seconds=elapsed)
                     return None
 
                 parsed = message.get("parsed")
+                if not parsed and message.get("content"):
+                    # The raw chat-completions response carries the structured output as JSON text.
+                    try:
+                        parsed = json.loads(message.get("content"))
+                    except ValueError:
+                        self.logger.warn("Structured output from GPT-4o was not valid JSON.")
+                        parsed = None
                 if parsed:
                     try:
                         vision_output = VisionOutput(**parsed)
                         self.logger.debug("Received valid structured output from GPT-4o.")
+                        telemetry.record("api", client="vision", outcome="ok", attempt=attempt + 1, seconds=elapsed)
                         return vision_output
                     except ValidationError as ve:
                         self.logger.error(f"Validation error in VisionOutput: {ve}")
+                        telemetry.record("api", client="vision", outcome="invalid", attempt=attempt + 1, seconds=elapsed)
                         return None
                 else:
                     self.logger.warn("No parsed structured output returned from GPT-4o.")
+                    telemetry.record("api", client="vision", outcome="invalid", attempt=attempt + 1, seconds=elapsed)
                     return None
 
             except openai.error.OpenAIError as e:
                 self.logger.warn(f"OpenAI API error on attempt {attempt+1}/{self.max_retries}: {e}")
+                outcome = "rate_limited" if isinstance(e, openai.error.RateLimitError) else "error"
+                telemetry.record("api", client="vision", outcome=outcome, attempt=attempt + 1, seconds=time.perf_counter() - start)
                 time.sleep(self.retry_delay)
             except Exception as ex:
                 self.logger.error(f"Unexpected error calling GPT-4o: {ex}")
+                telemetry.record("api", client="vision", outcome="error", attempt=attempt + 1, seconds=time.perf_counter() - start)
                 time.sleep(self.retry_delay)
 
         self.logger.error("Max retries exceeded for GPT-4o.")
@@ -0,0 +1,97 @@
+from typing import List, Tuple
+
+import numpy as np
+
+# A region is (ymin, xmin, ymax, xmax) in normalized frame coordinates,
+# matching the box layout returned by the detection model.
+Region = Tuple[float, float, float, float]
+
+FULL_FRAME: Region = (0.0, 0.0, 1.0, 1.0)
+
+
+def parse_region(spec: str) -> Region:
+    """
+    Parses "ymin,xmin,ymax,xmax" (normalized) into a clipped Region.
+    """
+    values = [float(v) for v in spec.split(",")]
+    if len(values) != 4:
+        raise ValueError(f"Region must have 4 values (ymin,xmin,ymax,xmax), got: {spec}")
+    ymin, xmin, ymax, xmax = [min(1.0, max(0.0, v)) for v in values]
+    if ymax <= ymin or xmax <= xmin:
+        raise ValueError(f"Region is empty: {spec}")
+    return (ymin, xmin, ymax, xmax)
+
+
+def make_tiles(region: Region, rows: int, cols: int, overlap: float) -> List[Region]:
+    """
+    Splits a region into rows x cols tiles that overlap by `overlap` (fraction of a tile).
+    Tiles are ordered center-first so that a latency budget drops peripheral tiles first.
+    """
+    ymin, xmin, ymax, xmax = region
+    tile_h = (ymax - ymin) / (rows - (rows - 1) * overlap)
+    tile_w = (xmax - xmin) / (cols - (cols - 1) * overlap)
+    tiles = []
+    for r in range(rows):
+        for c in range(cols):
+            top = ymin + r * tile_h * (1.0 - overlap)
+            left = xmin + c * tile_w * (1.0 - overlap)
+            tiles.append((top, left, min(ymax, top + tile_h), min(xmax, left + tile_w)))
+    cy, cx = (ymin + ymax) / 2.0, (xmin + xmax) / 2.0
+    tiles.sort(key=lambda t: ((t[0] + t[2]) / 2.0 - cy) ** 2 + ((t[1] + t[3]) / 2.0 - cx) ** 2)
+    return tiles
+
+
+def crop(frame: np.ndarray, region: Region) -> np.ndarray:
+    """
+    Returns a view of the frame covering the region (no copy).
+    """
+    h, w = frame.shape[:2]
+    ymin, xmin, ymax, xmax = region
+    top, bottom = int(round(ymin * h)), max(int(round(ymax * h)), int(round(ymin * h)) + 1)
+    left, right = int(round(xmin * w)), max(int(round(xmax * w)), int(round(xmin * w)) + 1)
+    return frame[top:bottom, left:right]
+
+
+def map_boxes_to_frame(boxes: np.ndarray, region: Region) -> np.ndarray:
+    """
+    Maps (N, 4) boxes normalized to a region crop back to full-frame normalized coordinates.
+    """
+    ymin, xmin, ymax, xmax = region
+    scale = np.array([ymax - ymin, xmax - xmin, ymax - ymin, xmax - xmin], dtype=np.float32)
+    offset = np.array([ymin, xmin, ymin, xmin], dtype=np.float32)
+    return boxes.astype(np.float32) * scale + offset
+
+
+def box_iou(box: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """
+    IoU of one (4,) box against (N, 4) boxes, all as (ymin, xmin, ymax, xmax).
+    """
+    y1 = np.maximum(box[0], boxes[:, 0])
+    x1 = np.maximum(box[1], boxes[:, 1])
+    y2 = np.minimum(box[2], boxes[:, 2])
+    x2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(y2 - y1, 0, None) * np.clip(x2 - x1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return inter / np.maximum(area + areas - inter, 1e-9)
+
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray, classes: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """
+    Class-aware NMS used to merge detections from overlapping tiles.
+    Boxes of different classes are shifted apart so a single vectorized pass
+    never suppresses across classes. Returns the indices to keep, best first.
+    """
+    if boxes.shape[0] == 0:
+        return np.empty(0, dtype=np.int64)
+    shifted = boxes + (classes.astype(np.float32) * 2.0)[:, None]
+    order = np.argsort(-scores)
+    keep = []
+    while order.size > 0:
+        best = order[0]
+        keep.append(best)
+        if order.size == 1:
+            break
+        ious = box_iou(shifted[best], shifted[order[1:]])
+        order = order[1:][ious <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Config refuses to load without a key; nothing under test talks to OpenAI.
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+# Modules are imported as src.<package>.<module>, as with `python -m src...`.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
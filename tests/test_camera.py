@@ -0,0 +1,34 @@
+import pytest
+
+from src.config.config import Config
+from src.vision.camera import Camera
+from src.vision.fake_camera import FakeCaptureSource
+
+
+MODES = {"YUYV": [(160, 120), (300, 300), (320, 240), (640, 480)], "MJPG": [(640, 480), (1280, 720)]}
+
+
+@pytest.fixture
+def dual_stream(monkeypatch):
+    monkeypatch.setattr(Config, "CAMERA_DUAL_STREAM", True)
+    monkeypatch.setattr(Config, "CAMERA_STILL_DEVICE", -1)
+    monkeypatch.setattr(Config, "CAMERA_DETECT_WIDTH", 0)
+    monkeypatch.setattr(Config, "CAMERA_DETECT_HEIGHT", 0)
+
+
+def test_detect_stream_defaults_to_model_input_size(dual_stream):
+    camera = Camera(capture=FakeCaptureSource(MODES, realtime=False), detect_size=(300, 300))
+    assert (camera.width, camera.height) == (300, 300)
+    assert camera.get_frame().shape[:2] == (300, 300)
+
+
+def test_detect_stream_size_can_be_configured(dual_stream, monkeypatch):
+    monkeypatch.setattr(Config, "CAMERA_DETECT_WIDTH", 320)
+    monkeypatch.setattr(Config, "CAMERA_DETECT_HEIGHT", 240)
+    camera = Camera(capture=FakeCaptureSource(MODES, realtime=False), detect_size=(300, 300))
+    assert (camera.width, camera.height) == (320, 240)
+
+
+def test_detect_stream_without_known_model_size(dual_stream):
+    camera = Camera(capture=FakeCaptureSource(MODES, realtime=False))
+    assert (camera.width, camera.height) == (320, 240)
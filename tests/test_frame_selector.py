@@ -0,0 +1,32 @@
+import time
+
+import numpy as np
+
+from src.vision.frame_selector import FrameSelector
+
+
+def test_select_falls_back_to_newest_frame_when_window_is_stale():
+    selector = FrameSelector()
+    older = np.full((120, 160, 3), 100, np.uint8)
+    newest = np.full((120, 160, 3), 140, np.uint8)
+    now = time.monotonic()
+    # Both frames predate the window, as after a blocking utterance.
+    selector.add_frame(older, now - 5.0)
+    selector.add_frame(newest, now - 2.0)
+
+    assert selector.select(max_age=0.5, wait=0.0) is newest
+    assert len(selector.frames) == 1
+
+
+def test_select_prefers_sharpest_recent_frame():
+    selector = FrameSelector()
+    flat = np.full((120, 160, 3), 128, np.uint8)
+    textured = np.random.default_rng(0).integers(60, 200, (120, 160, 3), dtype=np.uint8)
+    selector.add_frame(textured)
+    selector.add_frame(flat)
+
+    assert selector.select(wait=0.0) is textured
+
+
+def test_select_without_frames_returns_none():
+    assert FrameSelector().select(wait=0.0) is None
@@ -0,0 +1,79 @@
+import threading
+
+import cv2
+import numpy as np
+import pytest
+import requests
+
+from src.config.config import Config
+from src.gateway.scheduler import FairScheduler
+from src.gateway.server import GatewayServer
+
+
+class StubDetector:
+    def __init__(self):
+        self.batch_sizes = []
+
+    def detect_batch(self, frames, mode=None):
+        self.batch_sizes.append(len(frames))
+        return [[("chair", 0.9, [0.0, 0.0, 0.9, 0.9])] for _ in frames]
+
+    def is_object_too_close(self, frame, objects):
+        return bool(objects)
+
+
+class BlockingVision:
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+
+    def analyze_frame(self, frame):
+        self.calls += 1
+        self.release.wait(5.0)
+        return None
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    monkeypatch.setattr(Config, "GATEWAY_GPT_TIMEOUT", 0.3)
+    vision = BlockingVision()
+    scheduler = FairScheduler(workers=1, per_minute=600, burst=10, max_pending=5)
+    server = GatewayServer(detector=StubDetector(), vision=vision, scheduler=scheduler).start()
+    yield server, vision
+    vision.release.set()
+    server.stop()
+
+
+JPEG = cv2.imencode(".jpg", np.full((240, 320, 3), 128, np.uint8))[1].tobytes()
+
+
+def post(server, path, device):
+    return requests.post(f"{server.base_url}{path}", data=JPEG, headers={"X-Device-Id": device}, timeout=5)
+
+
+def test_lone_frame_is_not_padded_to_batch_size(gateway):
+    server, _ = gateway
+    response = post(server, "/v1/detect", "glasses-1")
+    assert response.status_code == 200
+    assert response.json()["too_close"]
+    assert server.detector.batch_sizes == [1]
+
+
+def test_slow_gpt_call_answers_503_and_queued_call_is_dropped(gateway):
+    server, vision = gateway
+    statuses = {}
+    threads = [threading.Thread(target=lambda d=device: statuses.setdefault(d, post(server, "/v1/describe", d).status_code))
+               for device in ("glasses-1", "glasses-2")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5.0)
+
+    # One call runs on the single worker, the other is still queued when both time out.
+    assert statuses == {"glasses-1": 503, "glasses-2": 503}
+    vision.release.set()
+    server.scheduler.stop()
+    assert vision.calls == 1
+    stats = server.scheduler.stats()
+    assert sum(device["cancelled"] for device in stats.values()) == 1
+    assert all(device["pending"] == 0 for device in stats.values())
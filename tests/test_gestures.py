@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from src.config.config import Config
+from src.gpio import button as button_module
+from src.gpio.button import Button
+from src.gpio.fake_gpio import FakeGPIO
+from src.gpio.gestures import Gesture, GestureRecognizer
+
+
+class Recorder:
+    def __init__(self):
+        self.gestures = []
+        self.received = threading.Event()
+
+    def __call__(self, gesture: Gesture):
+        self.gestures.append(gesture)
+        self.received.set()
+
+    def wait(self, timeout: float = 2.0) -> Gesture:
+        assert self.received.wait(timeout), "no gesture recognized"
+        # Give a wrongly pending short press the time to fire as well.
+        time.sleep(Config.BUTTON_DOUBLE_PRESS_WINDOW + 0.1)
+        return self.gestures[0]
+
+
+@pytest.fixture
+def recorder():
+    return Recorder()
+
+
+def test_short_press(recorder):
+    recognizer = GestureRecognizer(recorder)
+    t = time.monotonic()
+    recognizer.edge(True, t)
+    recognizer.edge(False, t + 0.1)
+    gesture = recorder.wait()
+    assert [g.kind for g in recorder.gestures] == [Gesture.SHORT]
+    assert gesture.pressed_at == t
+    assert gesture.duration == pytest.approx(0.1)
+
+
+def test_long_press_from_replayed_edges(recorder):
+    recognizer = GestureRecognizer(recorder)
+    t = time.monotonic() - Config.BUTTON_LONG_PRESS - 0.2
+    recognizer.edge(True, t)
+    recognizer.edge(False, t + Config.BUTTON_LONG_PRESS + 0.1)
+    recorder.wait()
+    assert [g.kind for g in recorder.gestures] == [Gesture.LONG]
+
+
+def test_double_press(recorder):
+    recognizer = GestureRecognizer(recorder)
+    t = time.monotonic()
+    recognizer.edge(True, t)
+    recognizer.edge(False, t + 0.05)
+    recognizer.edge(True, t + 0.15)
+    recognizer.edge(False, t + 0.2)
+    gesture = recorder.wait()
+    assert [g.kind for g in recorder.gestures] == [Gesture.DOUBLE]
+    assert gesture.pressed_at == t
+
+
+def test_contact_bounce_is_ignored(recorder):
+    recognizer = GestureRecognizer(recorder)
+    t = time.monotonic()
+    recognizer.edge(True, t)
+    # Bounces within BUTTON_GESTURE_DEBOUNCE_MS of the press, and a repeated level.
+    recognizer.edge(False, t + 0.005)
+    recognizer.edge(True, t + 0.01)
+    recognizer.edge(True, t + 0.05)
+    recognizer.edge(False, t + 0.1)
+    gesture = recorder.wait()
+    assert [g.kind for g in recorder.gestures] == [Gesture.SHORT]
+    assert gesture.duration == pytest.approx(0.1)
+
+
+@pytest.mark.parametrize("kind", [Gesture.SHORT, Gesture.LONG, Gesture.DOUBLE])
+def test_button_recognizes_fake_gpio_gestures(recorder, kind):
+    gpio = FakeGPIO()
+    button = Button(gpio=gpio)
+    button.set_gesture_callback(recorder)
+    try:
+        gpio.gesture(Config.BUTTON_GPIO_PIN, kind)
+        recorder.wait()
+    finally:
+        button.cleanup()
+    assert [g.kind for g in recorder.gestures] == [kind]
+
+
+def test_fake_gpio_only_when_configured(monkeypatch):
+    monkeypatch.setattr(button_module, "RPiGPIO", None)
+    monkeypatch.setattr(Config, "GPIO_FAKE", True)
+    assert isinstance(Button().gpio, FakeGPIO)
+
+    monkeypatch.setattr(Config, "GPIO_FAKE", False)
+    button = Button()
+    assert button.gpio is None
+    # An unusable button must not break the callers.
+    button.set_gesture_callback(lambda gesture: None)
+    button.cleanup()
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from src.config.config import Config
+from src.utils.memory import buffer_pool, steady_state_allocations
+from src.vision.camera import Camera
+from src.vision.fake_camera import FakeCaptureSource
+from src.vision.frame_selector import FrameSelector
+
+
+@pytest.fixture
+def memory_budget(monkeypatch):
+    monkeypatch.setattr(Config, "MEMORY_BUDGET_MODE", True)
+    monkeypatch.setattr(Config, "CAMERA_DUAL_STREAM", False)
+    monkeypatch.setattr(buffer_pool, "enabled", True)
+    buffer_pool.clear()
+    yield
+    buffer_pool.clear()
+
+
+def test_camera_and_selector_allocate_nothing_per_frame(memory_budget):
+    camera = Camera(capture=FakeCaptureSource(realtime=False))
+    selector = FrameSelector()
+
+    def step():
+        selector.add_frame(camera.get_frame())
+
+    allocations = steady_state_allocations(step, iterations=60, warmup=2 * Config.MEMORY_CAMERA_SLOTS)
+    # A few bytes of bookkeeping are tolerated; a frame-sized array is 900 KB at 640x480.
+    assert allocations["retained_bytes_per_frame"] < 1024
+    assert buffer_pool.stats()["camera"]["allocations"] == 1
+
+
+def test_select_with_wait_returns_frame_that_survives_pulls(memory_budget, monkeypatch):
+    camera = Camera(capture=FakeCaptureSource(realtime=False))
+    selector = FrameSelector(frame_source=camera.get_frame)
+    monkeypatch.setattr(selector, "min_sharpness", float("inf"))
+
+    # The first frame scores best, every pulled frame scores worse.
+    scores = iter(range(1000, 0, -1))
+    monkeypatch.setattr(selector, "score_frame", lambda frame: float(next(scores)))
+    first = camera.get_frame()
+    selector.add_frame(first)
+    expected = first.copy()
+
+    selected = selector.select(wait=0.3)
+
+    # Far more than MEMORY_CAMERA_SLOTS frames were pulled, recycling the first frame's buffer.
+    assert camera.cap.frames_delivered > 2 * Config.MEMORY_CAMERA_SLOTS
+    assert not np.shares_memory(selected, first)
+    assert np.array_equal(selected, expected)
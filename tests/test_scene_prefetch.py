@@ -0,0 +1,75 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.ai.reassuring_messages import ReassuringMessages
+from src.ai.scene_prefetch import ScenePrefetcher
+
+
+class FakeVision:
+    def __init__(self):
+        self.calls = 0
+
+    def analyze_frame(self, frame):
+        self.calls += 1
+        return "a quiet hallway"
+
+
+class FailingReassurance:
+    """
+    Behaves like ReassuringMessages against a failing endpoint: every call makes
+    max_retries API attempts and returns the canned fallback.
+    """
+
+    FALLBACK_MESSAGE = ReassuringMessages.FALLBACK_MESSAGE
+    FALLBACK_MESSAGE_NO_IMAGE = ReassuringMessages.FALLBACK_MESSAGE_NO_IMAGE
+
+    def __init__(self, max_retries: int = 3):
+        self.max_retries = max_retries
+        self.attempts = threading.local()
+        self.calls = 0
+
+    def generate_message(self, frame):
+        self.calls += 1
+        self.attempts.count = getattr(self.attempts, "count", 0) + self.max_retries
+        return self.FALLBACK_MESSAGE
+
+
+@pytest.fixture
+def prefetcher():
+    prefetcher = ScenePrefetcher(FakeVision(), FailingReassurance())
+    prefetcher.enabled = True
+    prefetcher.budget_per_hour = 60
+    prefetcher.retry_backoff = 60.0
+    return prefetcher
+
+
+def observe_for(prefetcher, seconds: float, frame: np.ndarray):
+    until = time.monotonic() + seconds
+    while time.monotonic() < until:
+        prefetcher.observe(frame, ["door"], want_reassurance=True)
+        time.sleep(0.005)
+
+
+def test_failing_reassurance_is_not_refetched_every_loop(prefetcher):
+    frame = np.full((120, 160, 3), 120, np.uint8)
+    observe_for(prefetcher, 0.5, frame)
+
+    assert prefetcher.re_msgs.calls == 1
+    assert prefetcher.take_reassurance(frame) is None
+    # One vision call plus every attempt of the failing reassurance.
+    assert prefetcher.stats()["api_calls"] == 1 + 3
+    assert len(prefetcher.call_times) == 4
+
+
+def test_reassurance_backoff_doubles_per_failure(prefetcher):
+    frame = np.full((120, 160, 3), 120, np.uint8)
+    for failures in (1, 2, 3):
+        prefetcher.reassurance_retry_at = 0.0  # skip the wait
+        prefetcher.observe(frame, ["door"], want_reassurance=True)
+        scene = prefetcher.current
+        assert scene.done.wait(2.0)
+        assert prefetcher.reassurance_retry_at == pytest.approx(scene.completed_at + 60.0 * 2 ** (failures - 1))
+    assert prefetcher.re_msgs.calls == 3
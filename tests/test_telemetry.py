@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.config.config import Config
+from src.eeg.spectral import SpectralEngine, parse_bands
+from src.utils.telemetry import SCHEMAS, SPECTRAL_BAND_COLUMNS, TelemetryReader, TelemetryRecorder
+
+
+def spectral_features() -> dict:
+    engine = SpectralEngine(bands=parse_bands(Config.EEG_SPECTRAL_BANDS))
+    t = np.arange(int(3 * engine.sample_rate)) / engine.sample_rate
+    features = engine.add_samples(40.0 * np.sin(2 * np.pi * 10.0 * t) + 10.0 * np.sin(2 * np.pi * 20.0 * t))
+    return features or engine.features()
+
+
+def test_eeg_spectral_band_powers_round_trip(tmp_path):
+    features = spectral_features()
+    bands = [key for key in features if key.startswith("spectral_")]
+    assert {f"spectral_{name}" for name in parse_bands(Config.EEG_SPECTRAL_BANDS)} <= set(bands)
+
+    recorder = TelemetryRecorder(root=str(tmp_path), enabled=True)
+    recorder.record("eeg", attention=55.0, **features)
+    recorder.close()
+
+    loaded = TelemetryReader(str(tmp_path)).load("eeg")
+    assert len(loaded["t"]) == 1
+    for key in bands:
+        assert loaded[key][0] == pytest.approx(features[key], rel=1e-6)
+    assert loaded["attention"][0] == 55.0
+
+
+def test_chunks_without_band_columns_are_still_read(tmp_path):
+    recorder = TelemetryRecorder(root=str(tmp_path), enabled=True)
+    recorder.record("eeg", attention=40.0)
+    recorder.close()
+    # A chunk written before the band columns existed.
+    chunk = TelemetryReader(str(tmp_path)).chunk_paths("eeg")[0]
+    os.remove(os.path.join(chunk, f"{SPECTRAL_BAND_COLUMNS[0]}.npy"))
+
+    loaded = TelemetryReader(str(tmp_path)).load("eeg")
+    assert loaded["attention"][0] == 40.0
+    assert np.isnan(loaded[SPECTRAL_BAND_COLUMNS[0]][0])
+    assert [name for name, _, _ in SCHEMAS["eeg"]] == list(loaded)